@@ -1,9 +1,11 @@
 import numpy as np
-from munkres import Munkres
 
-from team import Team
+from team import Team, TeamTable
 from agent import Agent
-import settings
+from physics import PhysicsEngine
+from bullet import BulletPool
+from config import Config
+import assignment
 
 
 class AbsoluteDistanceTeam(Team):
@@ -18,7 +20,11 @@ class AbsoluteDistanceTeam(Team):
         targets: np.ndarray,
         n_agents: int,
         agent_description: dict,
-        team_number: int
+        team_number: int,
+        engine: PhysicsEngine = None,
+        bullet_pool: BulletPool = None,
+        table: TeamTable = None,
+        config: Config = None
     ) -> None:
         """
         Constructor for AbsoluteDistanceTeam.
@@ -43,14 +49,26 @@ class AbsoluteDistanceTeam(Team):
         - CD_MIN
         - INIT_THROTTLE
         - INIT_V
-        :param team_number: (int) number of team, 
-        1 starts on the left, 2 starts on the right (facing left)
+        :param team_number: (int) number of team, starts at 0, see
+        `team.spawn_point()` for where the team starts
+        :param engine: (PhysicsEngine) physics engine shared by all
+        aircraft in the world, every agent gets its own if None
+        :param bullet_pool: (BulletPool) pool shared by all bullets in
+        the world, every agent gets its own if None
+        :param table: (TeamTable) state of all teams in the world, the
+        team gets its own if None
+        :param config: (Config) configuration of the match, the current
+        settings if None
         """
         super().__init__(
             targets,
             n_agents,
             agent_description,
-            team_number
+            team_number,
+            engine,
+            bullet_pool,
+            table,
+            config
         )
         
         self.assign_targets()
@@ -70,12 +88,28 @@ class AbsoluteDistanceTeam(Team):
         :return: (float) absolute distance to `target` from `agent`.
         """
         dx = min(
-            abs(agent.rot_rect.center[0] - target[0]),
-            settings.SCREEN_WIDTH - abs(agent.rot_rect.center[0] - target[0])
+            abs(agent.center[0] - target[0]),
+            self.config.SCREEN_WIDTH - abs(agent.center[0] - target[0])
         )
-        dy = abs(agent.rot_rect.center[1] - target[1])
+        dy = abs(agent.center[1] - target[1])
         return np.sqrt(dx**2 + dy**2)
         
+    def _distance_matrix(self) -> np.ndarray:
+        """
+        Calculate the absolute distance between every agent and every
+        target in one go, wrapping around the doughnut like
+        `_calculate_distance()`.
+
+        :return: (np.ndarray) distances, shape (agents, targets).
+        """
+        positions = np.array([agent.center for agent in self.agents])
+        delta = np.abs(positions[:, None, :] - self.targets[None, :, :])
+        dx = np.minimum(
+            delta[..., 0],
+            self.config.SCREEN_WIDTH - delta[..., 0]
+        )
+        return np.sqrt(dx**2 + delta[..., 1]**2)
+
     def assign_targets(self) -> None:
         """
         Bidding function for team. 
@@ -84,21 +118,18 @@ class AbsoluteDistanceTeam(Team):
 
         if there are no targets, the function returns.
         """
-        distances = np.zeros((len(self.agents), len(self.targets)))
         if len(self.targets) == 0 or len(self.agents) == 0:
             return
-        # calculate distances for bidding for agents.
-        for i, agent in enumerate(self.agents):
+        for agent in self.agents:
             agent.target = None
-            for j, target in enumerate(self.targets):
-                distances[i, j] = self._calculate_distance(agent, target)
-
-        # calculate targets
-        mukres = Munkres()
-        assigned_info = mukres.compute(distances.tolist())
+        # calculate distances for bidding for agents.
+        distances = self._distance_matrix()
 
-        # assign targets
-        for i, j in assigned_info:
+        # calculate and assign targets
+        for i, j in assignment.solve(
+            distances,
+            self.config.ASSIGNMENT_BACKEND
+        ):
             self.agents[i].target = self.targets[j]
 
     def __str__(self) -> str:
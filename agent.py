@@ -1,12 +1,13 @@
 import math
 import string
 import sys
-import time
 import numpy as np
 
 from aircraft import Aircraft
-import settings
+from physics import PhysicsEngine
 import bullet
+from config import Config
+from coverage import CoverageMap
 
 
 class Agent(Aircraft):
@@ -36,7 +37,8 @@ class Agent(Aircraft):
     + v: (tuple[float, float]) velocity vector
     + pos_real: (tuple[float, float]) aircraft position in m
     + orientation: (int) direction of lift vector
-    + flipstart: (float) timer for flip sprite
+    + flipstart: (float) `clock` at the start of the current flip,
+     negative when not flipping
     + pos_virtual: (tuple[float, float]) aircraft position on screen
     + AoA_deg: (float) angle of attack in deg
     + pitch_uv: (tuple[float, float]) unitvector corresponding to
@@ -46,23 +48,36 @@ class Agent(Aircraft):
     + f_engine: (tuple[float, float]) engine force vector
     + f_drag: (tuple[float, float]) drag force vector
     + f_lift: (tuple[float, float]) drag force vector
-    + use_gui: (bool) true if using GUI
-    + sprite: (pygame.Surface) side view sprite
-    + rot_sprite: (pygame.Surface) side view sprite, rotated
+    + plane_size: (tuple[int, int]) dimensions of aircraft on screen
+    + use_gui: (bool) true if using GUI, sprites are only loaded then
+    + atlas: (sprite_atlas.RotationAtlas) pre-rendered rotations of
+     the sprites, shared by all aircraft of the same type
+    + sprite_variant: (int) sprite shown, `sprite_atlas.SIDE`,
+     `SIDE_FLIPPED` or `TOP`
+    + rot_sprite: (pygame.Surface) shown sprite, rotated
     + rot_rect: (pygame.Rect) rectangle object for pygame
-    + flipsprite: (pygame.Surface) top view sprite
-    + spritecontainer: (pygame.Surface) temp container for `flip()`
+    + engine: (PhysicsEngine) store holding the physical state
+    + index: (int) row of this agent in `engine`
+    + center: (tuple[float, float]) agent position on screen as of
+     the previous tick
+    + clock: (float) simulated time since the aircraft was added (s)
+    + team: (int) team number of the agent
+    + config: (Config) configuration of the match
 
     + radius_fov: (int) radius of field of view
+    + r_fov: (int) radius of the area the agent explores, same as
+     `radius_fov`
     + perception_front_dims: (tuple[float, float]) dimensions of
      'danger-zone'
     + nearest_target_pos_abs: (np.ndarray) distance to nearest
      target, relative to origin
-    + timestart: (float) UNIX time at initialisation, for debug
     + action: (str) current action, for debug
-    + circle_coords: (np.ndarray) coordinates of circle for
-     `diff_overlap_circle`
-    + score: (int) score of the agent
+    + circle_coords: (np.ndarray) candidate offsets scored by
+     `explore_scores`
+    + timer: (float) `clock` at the last shot, for the fire rate
+    + bullet_pool: (bullet.BulletPool) pool the agent fires into
+    + coverage: (CoverageMap) area seen by this agent, usually shared
+     with its team
     """
     def __init__(
         self,
@@ -83,7 +98,13 @@ class Agent(Aircraft):
         init_v: tuple[float, float] = (0, 0),
         init_pos: tuple[int, int] = (0, 0),
         plane_size: tuple[int, int] = (24, 13),
-        evade_zone: tuple[int, int] = np.array((150, 30))
+        evade_zone: tuple[int, int] = np.array((150, 30)),
+        radius_fov: int = 150,
+        engine: PhysicsEngine = None,
+        bullet_pool: bullet.BulletPool = None,
+        coverage: CoverageMap = None,
+        team: int = 0,
+        config: Config = None
     ) -> None:
         """
         Initaliser for Agent
@@ -117,6 +138,16 @@ class Agent(Aircraft):
          (tuple[float, float])
         :param plane_size: aircraft sprite dimensions (tuple[int, int])
         :param evade_zone: evade things in this area (tuple[int, int])
+        :param radius_fov: radius of field of view (int)
+        :param engine: physics engine that stores the state of this
+         agent, a private one is created if None (PhysicsEngine)
+        :param bullet_pool: pool the bullets of this agent are fired
+         into, a private one is created if None (bullet.BulletPool)
+        :param coverage: map the field of view of this agent is stamped
+         into, a private one is created if None (CoverageMap)
+        :param team: team number of the agent (int)
+        :param config: configuration, the current settings if None
+         (Config)
         """
 
         super().__init__(
@@ -136,37 +167,34 @@ class Agent(Aircraft):
             init_pitch,
             init_v,
             init_pos,
-            plane_size
+            plane_size,
+            engine,
+            team,
+            config
         )
 
         # dangerzone
-        self.radius_fov = 150
+        self.radius_fov = radius_fov
         self.perception_front_dims = evade_zone
         self.nearest_target_pos_abs = []
 
         # debug
-        self.testv  = [0,0]
-        self.testv2 = [0,0]
-        self.testv3 = [0,0]
-        self.timestart = time.time()
         self.action = 'none'
 
         # internal state
-        self.bullets = []
-        self.history_scale = 10
-        self.history = np.zeros((
-            2,
-            int(window_dimensions[0]/self.history_scale),
-            int(window_dimensions[1]/self.history_scale)
-        ))
+        if bullet_pool is None:
+            bullet_pool = bullet.BulletPool(
+                self.config.GROUND["COLL_ELEVATION"],
+                self.config.BULLET["SPRITE"] if self.use_gui else None,
+                config=self.config
+            )
+        self.bullet_pool = bullet_pool
+        if coverage is None:
+            coverage = CoverageMap(window_dimensions)
+        self.coverage = coverage
         self.target = np.array([0,0])
 
-        # np wizardry
-        self.r_fov = 150
-        self.do_x, self.do_y = np.indices((
-            int(window_dimensions[0]/self.history_scale),
-            int(window_dimensions[1]/self.history_scale)
-        ))
+        self.r_fov = radius_fov
 
         circle_coords = np.array([
             [9, 0],
@@ -189,8 +217,7 @@ class Agent(Aircraft):
         circle_coords = np.concatenate([c_temp, circle_coords], 0)
         self.circle_coords = np.concatenate([-circle_coords, circle_coords], 0)
 
-        self.score = 0
-        self.timer = -1
+        self.timer = -math.inf
 
     def dangerzone(self, fov):
         rotation_matrix = np.array([[
@@ -202,19 +229,21 @@ class Agent(Aircraft):
         ]])
 
         for target in fov:
-            d = np.matmul((target[:2]-self.rot_rect.center), rotation_matrix)
+            d = np.matmul((target[:2]-self.center), rotation_matrix)
             if (0 < d[0] < 150) and (abs(d[1]) < 10) and target[2]!=2:
                 self.shoot()
 
-    def tick(self, dt: float, fov: np.ndarray) -> None:
+    def update(self, dt: float, fov: np.ndarray) -> None:
         """
-        'tick' function; updates internal state
+        'update' function; reacts to the new physical state after the
+        physics step
 
         :param dt: (float) time since last frame in s
         :param fov: (np.ndarray) targets within fov (passed from main)
         :return: None
         """
-        super().tick(dt, fov)
+        super().update(dt, fov)
+        self.coverage.stamp(self.center, self.r_fov)
         self.dangerzone(fov)
         if self.target is not None:
             self.kill_target(dt)
@@ -243,7 +272,7 @@ class Agent(Aircraft):
         evade_direction = 0
 
         for target in fov_evade:
-            d = np.matmul((target[:2]-self.rot_rect.center), rotation_matrix)
+            d = np.matmul((target[:2]-self.center), rotation_matrix)
             self.nearest_target_pos_abs = d
             if (
                 0 < d[0] < self.perception_front_dims[0]
@@ -253,7 +282,7 @@ class Agent(Aircraft):
                 if 0 < d[1] < self.perception_front_dims[1]:
                     if (
                         target[1] > (
-                            settings.GROUND["COLL_ELEVATION"] - (
+                            self.config.GROUND["COLL_ELEVATION"] - (
                                 2 * self.perception_front_dims[1]
                             )
                         )
@@ -272,7 +301,7 @@ class Agent(Aircraft):
                 elif 0 < -d[1] < self.perception_front_dims[1]:
                     if (
                         target[1] > (
-                            settings.GROUND["COLL_ELEVATION"] - (
+                            self.config.GROUND["COLL_ELEVATION"] - (
                                 2 * self.perception_front_dims[1]
                             )
                         )
@@ -303,7 +332,7 @@ class Agent(Aircraft):
                 (
                     self.pos_virtual[1] + self.v_uv[1] * self.radius_fov
                 ) > (
-                    settings.GROUND["COLL_ELEVATION"] - safe_d
+                    self.config.GROUND["COLL_ELEVATION"] - safe_d
                 )
             ) and (
                 self.v_uv[1] >= -safe_slope
@@ -325,29 +354,15 @@ class Agent(Aircraft):
                     self.adjust_pitch(dt)
             else:
                 self.action = 'explore'
-                best = 0
-                best_circle = []
-                for center in self.circle_coords:
-                    n_new = np.sum(self.diff_overlap_circle(center))
-                    if n_new == best:
-                        best = n_new
-                        best_circle.append(center)
-                    elif n_new > best:
-                        best = n_new
-                        best_circle = [center]
+                n_new = self.explore_scores()
+                best = n_new.max()
+                best_circle = self.circle_coords[n_new == best]
                 if len(best_circle) == 1:
                     best_circle = best_circle[0]
                 elif best == 0:
-                    best_circle = np.average(
-                        np.where(
-                            self.history[0][
-                                :, :int(
-                                    settings.GROUND["COLL_ELEVATION"] /
-                                    self.history_scale
-                                )
-                            ] == 0
-                        ), axis=1
-                    )*self.history_scale
+                    best_circle = self.coverage.uncovered_centroid(
+                        self.config.GROUND["COLL_ELEVATION"]
+                    )
                     best_circle -= self.pos_virtual
                     self.action = 'explore tiebreak'
                     best_circle[1] = -best_circle[1]
@@ -381,7 +396,7 @@ class Agent(Aircraft):
                 (
                         self.pos_virtual[1] + self.v_uv[1] * self.radius_fov
                 ) > (
-                        settings.GROUND["COLL_ELEVATION"] - safe_d
+                        self.config.GROUND["COLL_ELEVATION"] - safe_d
                 )
         ) and (
                 self.v_uv[1] >= -safe_slope
@@ -411,7 +426,7 @@ class Agent(Aircraft):
                 math.sin((-self.pitch) * math.pi / 180),
                 math.cos((-self.pitch) * math.pi / 180)
             ]])
-            d = np.matmul((self.target-self.rot_rect.center), rotation_matrix)
+            d = np.matmul((self.target-self.center), rotation_matrix)
             if (abs(d[0]) < 150) and (abs(d[1]) < 10):
                 self.shoot()
 
@@ -430,19 +445,15 @@ class Agent(Aircraft):
                 if self.v_uv[0] < 0:
                     sign = -1
                 target_projected = self.target + sign * np.array([1280,0])
-                self.testv3 = abs(self.rot_rect.center[0]-target_projected[0])
-                self.testv2 = abs(
-                    self.rot_rect.center[0]-self.target[0]
-                ) + turn_circle
                 self.action = 'rotate pass'
 
                 if abs(
-                    self.rot_rect.center[0]-target_projected[0]
+                    self.center[0]-target_projected[0]
                     ) > abs(
-                        self.rot_rect.center[0]-self.target[0]
+                        self.center[0]-self.target[0]
                     ) + turn_circle:
-                    if self.rot_rect.center[1] < (
-                        settings.GROUND["COLL_ELEVATION"] / 2
+                    if self.center[1] < (
+                        self.config.GROUND["COLL_ELEVATION"] / 2
                         ):
                         direction = -1
                         self.action = 'rotate right'
@@ -454,7 +465,7 @@ class Agent(Aircraft):
                         self.action += ' mirror'
                 else:
                     d2 = np.matmul(
-                        (target_projected - self.rot_rect.center), 
+                        (target_projected - self.center), 
                         rotation_matrix
                     )
                     if (abs(d2[0]) < 150) and (abs(d2[1]) < 10):
@@ -477,45 +488,46 @@ class Agent(Aircraft):
     ) -> np.ndarray:
         """
         Returns the logical and of the circle with radius `r_fov` and
-        centre `offset`, and the unexplored area. Effectively returns
-        the area that would be discovered if the agent were to move to
-        `offset`
+        centre `offset`, and the uncovered area of `coverage`.
+        Effectively returns the area that would be discovered if the
+        agent were to move to `offset`. Tests the whole grid for one
+        circle; kept as the reference for `explore_scores()`.
 
         :param offset: (tuple[int, int]) centre of circle
-        :return: (np.ndarray) new area
+        :return: (np.ndarray) new area, shaped like `coverage.cells`
         """
-        d_agent_x = (
-            self.do_x -
-            self.pos_virtual[0]/self.history_scale +
-            offset[0]/self.history_scale
-        )
-        d_agent_y = (
-            self.do_y -
-            self.pos_virtual[1]/self.history_scale +
-            offset[1]/self.history_scale
-        )
+        scale = self.coverage.scale
+        x = (self.pos_virtual[0] - offset[0]) / scale
+        y = (self.pos_virtual[1] - offset[1]) / scale
+        nx, ny = self.coverage.cells.shape
+        # the world wraps horizontally: every column at its copy
+        # nearest to the centre
+        columns = np.arange(nx)
+        columns = columns - nx * np.round((columns - x) / nx)
+        d_agent_x = columns - x
+        d_agent_y = np.arange(ny) - y
         in_fov = (
-            np.sqrt(
-                d_agent_x ** 2 + d_agent_y ** 2
-            ) < (
-                self.r_fov/self.history_scale
-            )
+            d_agent_x[:, None] ** 2 + d_agent_y[None, :] ** 2
+        ) < (self.r_fov / scale) ** 2
+        return np.logical_and(in_fov, ~self.coverage.cells).astype(int)
+
+    def explore_scores(self) -> np.ndarray:
+        """
+        Returns the area that would be discovered if the agent were to
+        move to each of the offsets in `circle_coords`, the sum of
+        `diff_overlap_circle()` for every offset at once.
+
+        :return: (np.ndarray) number of new coverage cells per offset
+        """
+        return self.coverage.revealed(
+            self.pos_virtual - self.circle_coords,
+            self.r_fov
         )
-        return np.logical_and(
-            in_fov, ~(self.history[0].astype(bool))
-        ).astype(int)
 
     def shoot(self):
-        current_time = time.time()
-        if abs(current_time - self.timer) < settings.FIRE_RATE:
+        current_time = self.clock
+        if abs(current_time - self.timer) < self.config.FIRE_RATE:
             return
         self.timer = current_time
-        self.bullets.append(
-            bullet.Bullet(
-                self.pos_virtual,
-                self.pitch,
-                settings.GROUND["COLL_ELEVATION"],
-                settings.BULLET["SPRITE"]
-            )
-        )
+        self.bullet_pool.add(self.pos_virtual, self.pitch, self.index)
     
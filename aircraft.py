@@ -1,10 +1,11 @@
 import pygame
-import math
 import string
-import time
 import numpy as np
 
-import settings
+from config import Config
+from physics import PhysicsEngine, EngineField
+from geometry import rotated_size
+import sprite_atlas
 
 
 class Aircraft:
@@ -34,7 +35,8 @@ class Aircraft:
     + v: (tuple[float, float]) velocity vector
     + pos_real: (tuple[float, float]) aircraft position in m
     + orientation: (int) direction of lift vector
-    + flipstart: (float) timer for flip sprite
+    + flipstart: (float) `clock` at the start of the current flip,
+     negative when not flipping
     + pos_virtual: (tuple[float, float]) aircraft position on screen
     + AoA_deg: (float) angle of attack in deg
     + pitch_uv: (tuple[float, float]) unitvector corresponding to
@@ -44,13 +46,48 @@ class Aircraft:
     + f_engine: (tuple[float, float]) engine force vector
     + f_drag: (tuple[float, float]) drag force vector
     + f_lift: (tuple[float, float]) drag force vector
-    + use_gui: (bool) true if using GUI
-    + sprite: (pygame.Surface) side view sprite
-    + rot_sprite: (pygame.Surface) side view sprite, rotated
+    + plane_size: (tuple[int, int]) dimensions of aircraft on screen
+    + use_gui: (bool) true if using GUI, sprites are only loaded then
+    + atlas: (sprite_atlas.RotationAtlas) pre-rendered rotations of
+     the sprites, shared by all aircraft of the same type
+    + sprite_variant: (int) sprite shown, `sprite_atlas.SIDE`,
+     `SIDE_FLIPPED` or `TOP`
+    + rot_sprite: (pygame.Surface) shown sprite, rotated
     + rot_rect: (pygame.Rect) rectangle object for pygame
-    + flipsprite: (pygame.Surface) top view sprite
-    + spritecontainer: (pygame.Surface) temp container for `flip()`
+    + engine: (PhysicsEngine) store holding the physical state
+    + index: (int) row of this aircraft in `engine`
+    + center: (tuple[float, float]) aircraft position on screen as of
+     the previous tick
+    + clock: (float) simulated time since the aircraft was added (s)
+    + team: (int) team number of the aircraft
+    + config: (Config) configuration of the match
     """
+    mass = EngineField("mass")
+    engine_force = EngineField("engine_force")
+    agility = EngineField("agility")
+    const_drag = EngineField("const_drag")
+    const_lift = EngineField("const_lift")
+    AoA_crit_low = EngineField("AoA_crit_low")
+    AoA_crit_high = EngineField("AoA_crit_high")
+    cl0 = EngineField("cl0")
+    cd_min = EngineField("cd_min")
+    throttle = EngineField("throttle")
+    pitch = EngineField("pitch")
+    v = EngineField("v")
+    pos_real = EngineField("pos_real")
+    orientation = EngineField("orientation")
+    pos_virtual = EngineField("pos_virtual")
+    center = EngineField("center")
+    AoA_deg = EngineField("AoA_deg")
+    pitch_uv = EngineField("pitch_uv")
+    v_uv = EngineField("v_uv")
+    f_gravity = EngineField("f_gravity")
+    f_engine = EngineField("f_engine")
+    f_drag = EngineField("f_drag")
+    f_lift = EngineField("f_lift")
+    clock = EngineField("clock")
+    team = EngineField("team")
+
     def __init__(
         self,
         window_dimensions: tuple[int, int],
@@ -69,7 +106,10 @@ class Aircraft:
         init_pitch: float = 0,
         init_v: tuple[float, float] = (0, 0),
         init_pos: tuple[int, int] = (0, 0),
-        plane_size: tuple[int, int] = (24, 13)
+        plane_size: tuple[int, int] = (24, 13),
+        engine: PhysicsEngine = None,
+        team: int = 0,
+        config: Config = None
     ) -> None:
         """
         Initaliser for Aircraft
@@ -102,130 +142,98 @@ class Aircraft:
         :param init_pos: real spawn location of aircraft
          (tuple[float, float])
         :param plane_size: aircraft sprite dimensions (tuple[int, int])
+        :param engine: physics engine that stores the state of this
+         aircraft, a private one is created if None (PhysicsEngine)
+        :param team: team number of the aircraft (int)
+        :param config: configuration, the current settings if None
+         (Config)
         """
         self.window_dimensions = window_dimensions
+        if config is None:
+            config = Config()
+        self.config = config
 
-        # Constants
-        self.mass = mass
-        self.engine_force = engine_force
-        self.agility = agility
-        self.const_drag = c_drag
-        self.const_lift = c_lift
-        self.AoA_crit_low = AoA_crit_low
-        self.AoA_crit_high = AoA_crit_high
-        self.cl0 = cl0
-        self.cd_min = cd_min
-
-        # Independent Variables
-        self.throttle = init_throttle
-        self.pitch = init_pitch
-        self.v = np.array(init_v)
-        self.pos_real = np.array(init_pos)
-        self.orientation = 1
-        self.flipstart = 0.0
-
-        # Dependent variables (oa Numpy containers)
-        self.pos_virtual = (
-            self.pos_real *
-            settings.PLANE_POS_SCALE %
-            self.window_dimensions
+        # State lives in the engine; the attributes below are views
+        if engine is None:
+            engine = PhysicsEngine(window_dimensions, config=config)
+        self.engine = engine
+        self.index = engine.add(
+            mass,
+            engine_force,
+            agility,
+            c_drag,
+            c_lift,
+            AoA_crit_low,
+            AoA_crit_high,
+            cl0,
+            cd_min,
+            init_throttle,
+            init_pitch,
+            init_v,
+            init_pos,
+            team
         )
-        self.AoA_deg = 0
-        self.pitch_uv = np.array([0.0, 0.0])
-        self.v_uv = np.array([0.0, 0.0])
-        self.f_gravity = np.array([0.0, 9.81*mass])
-        self.f_engine = np.array([0.0, 0.0])
-        self.f_drag = np.array([0.0, 0.0])
-        self.f_lift = np.array([0.0, 0.0])
+        self.flipstart = -1.0
+
+        # Geometry
+        self.plane_size = plane_size
 
-        # Sprite info
+        # Sprite info, never loaded when running headless
         self.use_gui = True
         if sprite == None:
             self.use_gui = False
         if self.use_gui:
-            self.sprite = pygame.image.load(sprite)
-            self.rot_sprite = pygame.transform.scale(
-                self.sprite,
-                plane_size
+            self.atlas = sprite_atlas.atlas_for(
+                sprite,
+                sprite_top,
+                plane_size,
+                config.ROTATION_STEP
             )
-            self.sprite = pygame.transform.scale(
-                self.sprite,
-                plane_size
-            )
-            self.rot_rect = self.sprite.get_rect(center=init_pos)
-
-        self.flipsprite = pygame.image.load(sprite_top)
-        self.flipsprite = pygame.transform.scale(self.flipsprite, plane_size)
-        self.spritecontainer = self.sprite
+            self.sprite_variant = sprite_atlas.SIDE
+            self.rot_sprite = self.atlas.get(self.sprite_variant, 0)
+            self.rot_rect = self.rot_sprite.get_rect(center=init_pos)
 
     def tick(self, dt: float, fov: np.ndarray) -> None:
         """
         Update internal state of aircraft over given time interval.
+        Steps only this aircraft; use `PhysicsEngine.step()` followed
+        by `update()` to advance many aircraft at once.
 
         :param dt: time since last frame (s) (float)
         :param fov: array containing objects within fov_evade 
          radius (np.ndarray)
         :return: None
         """
+        self.engine.step(dt, [self.index])
+        self.update(dt, fov)
 
-        # pitch unit vector
-        self.pitch_uv[0] = math.cos(-math.pi / 180 * self.pitch)
-        self.pitch_uv[1] = math.sin(-math.pi / 180 * self.pitch)
-
-        # velocity unit vector
-        if np.linalg.norm(self.v) != 0:
-            self.v_uv = self.v / np.linalg.norm(self.v)
-
-        # angle of attack
-        self.AoA_deg = (
-            math.atan2(self.pitch_uv[0], self.pitch_uv[1]) -
-            math.atan2(self.v[0], self.v[1])
-        ) * 180 / math.pi
-        if self.AoA_deg > 180:
-            self.AoA_deg -= 360
-        elif self.AoA_deg < -180:
-            self.AoA_deg += 360
-
-        # engine force vector
-        self.f_engine = self.throttle * 0.1 * self.engine_force * self.pitch_uv
-
-        # lift force vector
-        coef_lift = self.lift_curve(self.orientation * self.AoA_deg)
-        norm_lift = (
-            self.const_lift *
-            coef_lift *
-            np.linalg.norm(self.v)**2 *
-            self.orientation
-        )
-        self.f_lift[0] = norm_lift * self.v_uv[1]
-        self.f_lift[1] = norm_lift * -self.v_uv[0]
-
-        # drag force vector
-        coef_drag = (self.AoA_deg / (math.sqrt(40)))**2 + self.cd_min
-        norm_drag = self.const_drag * coef_drag * np.linalg.norm(self.v) ** 2
-        self.f_drag = -norm_drag * self.v_uv
+    def update(self, dt: float, fov: np.ndarray) -> None:
+        """
+        Per-aircraft work after the physics step, such as the flip
+        timer and keeping the sprite in sync with the engine state.
 
-        # resulting force vector, update velocity & position
-        f_res = self.f_engine + self.f_gravity + self.f_drag + self.f_lift
-        self.v += dt * f_res / self.mass 
-        self.pos_real += self.v * dt
+        :param dt: time since last frame (s) (float)
+        :param fov: array containing objects within fov_evade 
+         radius (np.ndarray)
+        :return: None
+        """
         if self.use_gui:
-            self.rot_rect.centerx = self.pos_virtual[0]
-            self.rot_rect.centery = self.pos_virtual[1]
+            self.rot_rect.centerx = self.center[0]
+            self.rot_rect.centery = self.center[1]
+        self.flip_update_sprite()
 
-        # induced torque (close enough)
-        if self.AoA_deg < self.AoA_crit_low[0]:
-            self.adjust_pitch(norm_drag*0.0001*dt)
-        if self.AoA_deg > self.AoA_crit_high[0]:
-            self.adjust_pitch(-norm_drag*0.0001*dt)
+    @property
+    def bottom(self) -> float:
+        """
+        Lowest point of the rotated aircraft on screen, computed from
+        `plane_size` and `pitch` rather than from the rotated sprite.
 
-        if self.use_gui:
-            self.flip_update_sprite()
-        self.pos_virtual = (
-            self.pos_real *
-            settings.PLANE_POS_SCALE %
-            self.window_dimensions
-        )
+        :return: y coordinate of the bottom of the aircraft (float)
+        """
+        return self.center[1] + rotated_size(
+            self.plane_size,
+            self.pitch
+        )[1] / 2
 
     def adjust_pitch(self, dt: float):
         """
@@ -236,10 +244,17 @@ class Aircraft:
         """
         self.pitch = (self.pitch + self.agility * dt) % 360
         if self.use_gui:
-            self.rot_sprite = pygame.transform.rotate(self.sprite, self.pitch)
-            self.rot_rect = self.rot_sprite.get_rect(
-                center=self.sprite.get_rect(center=self.rot_rect.center).center
-            )
+            self._rotate_sprite()
+
+    def _rotate_sprite(self) -> None:
+        """
+        Looks up the sprite for the current variant and pitch in the
+        atlas and centres `rot_rect` on it.
+
+        :return: None
+        """
+        self.rot_sprite = self.atlas.get(self.sprite_variant, self.pitch)
+        self.rot_rect = self.rot_sprite.get_rect(center=self.rot_rect.center)
 
     def flip(self):
         """
@@ -248,36 +263,32 @@ class Aircraft:
 
         :return: None
         """
-        if self.flipstart < 0.0000001:
+        if self.flipstart < 0:
             self.orientation = -self.orientation
-        self.flipstart = time.time()
+        self.flipstart = self.clock
 
     def flip_update_sprite(self):
         """
-        Updates aircraft sprite during orientation flip
+        Advances the orientation flip timer and, when using the GUI,
+        updates aircraft sprite during orientation flip
 
         :return: None
         """
-        if self.flipstart > 0.0000001:
+        if self.flipstart >= 0:
             # show sprite after .25s
-            if .25 < (time.time() - self.flipstart) < .5:
-                self.sprite = self.flipsprite
+            if .25 < (self.clock - self.flipstart) < .5:
+                if self.use_gui:
+                    self.sprite_variant = sprite_atlas.TOP
             # reset sprite after .5s
-            elif .5 <= (time.time() - self.flipstart):
-                if self.orientation == 1:
-                    self.sprite = self.spritecontainer
-                else:
-                    self.sprite = pygame.transform.flip(
-                        self.spritecontainer, 
-                        0, 
-                        1
-                    )
-                self.flipstart = 0.0
+            elif .5 <= (self.clock - self.flipstart):
+                if self.use_gui and self.orientation == 1:
+                    self.sprite_variant = sprite_atlas.SIDE
+                elif self.use_gui:
+                    self.sprite_variant = sprite_atlas.SIDE_FLIPPED
+                self.flipstart = -1.0
 
-        self.rot_sprite = pygame.transform.rotate(self.sprite, self.pitch)
-        self.rot_rect = self.rot_sprite.get_rect(
-            center=self.sprite.get_rect(center=self.rot_rect.center).center
-        )
+        if self.use_gui:
+            self._rotate_sprite()
 
     def lift_curve(self, AoA: float):
         """
@@ -286,22 +297,10 @@ class Aircraft:
         :param AoA: angle of attack
         :return: lift coefficient at AoA
         """
-        if AoA < self.AoA_crit_low[0] - 1:
-            return 0.0
-        elif self.AoA_crit_low[0] - 1 <= AoA < self.AoA_crit_low[0]:
-            return self.AoA_crit_low[1] * abs(self.AoA_crit_low[0] - 1 - AoA)
-        elif self.AoA_crit_low[0] <= AoA < 0.0:
-            b = self.cl0 - self.AoA_crit_low[1]
-            c = AoA / self.AoA_crit_low[0]
-            return self.cl0 - b * c
-        elif 0.0 <= AoA < self.AoA_crit_high[0]:
-            b = self.AoA_crit_high[1] - self.cl0
-            c = AoA / self.AoA_crit_high[0]
-            return self.cl0 + b * c
-        elif self.AoA_crit_high[0] <= AoA < self.AoA_crit_high[0] + 1:
-            return self.AoA_crit_high[1] * abs(self.AoA_crit_high[0] - 1 - AoA)
-        else:
-            return 0
+        return float(self.engine.lift_curve(
+            np.array([AoA], dtype=float),
+            np.array([self.index])
+        )[0])
 
 # sources:
 # https://github.com/gszabi99/War-Thunder-Datamine/tree/master/aces.vromfs.bin_u/gamedata/flightmodels
@@ -0,0 +1,89 @@
+import pygame
+
+from config import Config
+
+_surfaces = {}
+
+
+def load(
+        path: str,
+        size: tuple[int, int] = None,
+        flip: tuple[bool, bool] = (False, False)
+    ) -> pygame.Surface:
+    """
+    Returns the image at `path`, scaled to `size` and flipped, loading
+    and converting it only the first time. Surfaces are shared between
+    all callers, so draw copies instead of drawing on them.
+
+    Images loaded before the display exists are converted with
+    `convert_alpha()` the first time they are asked for afterwards.
+
+    :param path: filepath to the image (str)
+    :param size: size to scale to, original size if None
+     (tuple[int, int])
+    :param flip: flip horizontally, vertically (tuple[bool, bool])
+    :return: shared surface (pygame.Surface)
+    """
+    key = (path, None if size is None else tuple(size), tuple(flip))
+    entry = _surfaces.get(key)
+    if entry is None or (not entry[1] and pygame.display.get_surface()):
+        if key[1:] == (None, (False, False)):
+            surface = pygame.image.load(path)
+        else:
+            surface = load(path)
+            if size is not None:
+                surface = pygame.transform.scale(surface, size)
+            if any(flip):
+                surface = pygame.transform.flip(surface, *flip)
+        converted = pygame.display.get_surface() is not None
+        if converted:
+            surface = surface.convert_alpha()
+        entry = _surfaces[key] = (surface, converted)
+    return entry[0]
+
+
+def preload(config: Config = None) -> None:
+    """
+    Loads every image the simulation uses in the sizes it uses them,
+    and renders the rotations of the aircraft of the teams of `config`.
+    Call after the display has been created.
+
+    :param config: configuration to load the images of, the current
+     settings if None (Config)
+    :return: None
+    """
+    import sprite_atlas
+
+    if config is None:
+        config = Config()
+    for description in config.TEAMS:
+        plane = description["PLANE"]
+        sprite_atlas.atlas_for(
+            plane["SPRITE"],
+            plane["SPRITE_TOP"],
+            plane["SIZE"],
+            config.ROTATION_STEP
+        )
+    size = config.TARGET["SIZE"]
+    load(config.TARGET["SPRITE"], (size, size))
+    size = config.BULLET["SIZE"]
+    load(config.BULLET["SPRITE"], (size, size), (True, False))
+    load(
+        config.GROUND["SPRITE"],
+        (config.SCREEN_WIDTH, config.GROUND["HEIGHT"])
+    )
+    load("assets/background.png", config.SCREEN_RESOLUTION)
+    load(config.END_SCREEN["GAMEOVER"])
+    load(
+        config.END_SCREEN["EXPLOSION"],
+        config.END_SCREEN["EXPLOSION_SIZE"]
+    )
+
+
+def clear() -> None:
+    """
+    Forgets every loaded image.
+
+    :return: None
+    """
+    _surfaces.clear()
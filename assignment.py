@@ -0,0 +1,63 @@
+import numpy as np
+from munkres import Munkres
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+
+def solve_munkres(costs: np.ndarray) -> list[tuple[int, int]]:
+    """
+    Reference backend: pure-Python Hungarian algorithm from the
+    munkres library.
+
+    :param costs: cost matrix, rows are agents and columns are targets
+     (np.ndarray)
+    :return: assigned (row, column) pairs sorted by row
+     (list[tuple[int, int]])
+    """
+    return [
+        (int(i), int(j)) for i, j in Munkres().compute(costs.tolist())
+    ]
+
+
+def solve_scipy(costs: np.ndarray) -> list[tuple[int, int]]:
+    """
+    Fast backend: scipy's rectangular linear sum assignment solver.
+
+    :param costs: cost matrix, rows are agents and columns are targets
+     (np.ndarray)
+    :return: assigned (row, column) pairs sorted by row
+     (list[tuple[int, int]])
+    """
+    rows, columns = linear_sum_assignment(costs)
+    return list(zip(rows.tolist(), columns.tolist()))
+
+
+BACKENDS = {
+    "munkres": solve_munkres,
+}
+if linear_sum_assignment is not None:
+    BACKENDS["scipy"] = solve_scipy
+
+
+def solve(
+        costs: np.ndarray,
+        backend: str = None
+    ) -> list[tuple[int, int]]:
+    """
+    Solves the rectangular assignment problem for `costs` exactly:
+    every row is assigned a different column (or the other way around
+    when there are more rows than columns) with the lowest total cost.
+
+    :param costs: cost matrix, rows are agents and columns are targets
+     (np.ndarray)
+    :param backend: name of a backend in `BACKENDS`, the fastest
+     installed one if None (str)
+    :return: assigned (row, column) pairs sorted by row
+     (list[tuple[int, int]])
+    """
+    if backend is None:
+        backend = "scipy" if "scipy" in BACKENDS else "munkres"
+    return BACKENDS[backend](np.asarray(costs, dtype=float))
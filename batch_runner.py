@@ -0,0 +1,167 @@
+import contextlib
+import functools
+import multiprocessing
+import os
+from typing import Iterator
+
+from config import Config
+from world import World
+from replay import Recorder
+from profiler import Profiler
+
+
+def run_match(
+        seed: int,
+        team_descriptions: list[dict] = None,
+        replay_path: str = None,
+        profile: bool = False,
+        trace_path: str = None,
+        config: Config = None
+    ) -> dict:
+    """
+    Runs one headless match to the end.
+
+    :param seed: seed for the random number generator of the match,
+     the result only depends on it and the configuration (int)
+    :param team_descriptions: team descriptions passed to `World`,
+     TEAMS of the configuration if None (list[dict])
+    :param replay_path: every tick is recorded to this file if given,
+     see `replay.Recorder` (str)
+    :param profile: time the phases of every tick (bool)
+    :param trace_path: with `profile`, write a Chrome trace of the
+     match to this file (str)
+    :param config: configuration of the match, the current settings if
+     None; USE_GUI is ignored (Config)
+    :return: result of the match with the keys seed, teams (strategy
+     names), scores, summary (printable team states), time
+     (simulated seconds) and profile (the `Profiler` of the match, or
+     None) (dict)
+    """
+    profiler = None
+    if profile:
+        profiler = Profiler(trace_capacity=1 << 16 if trace_path else 0)
+    if config is None:
+        config = Config(USE_GUI=False)
+    elif config.USE_GUI:
+        config = config.replace(USE_GUI=False)
+    world = World(
+        team_descriptions,
+        seed=seed,
+        profiler=profiler,
+        config=config
+    )
+    dt = config.DT
+    with contextlib.ExitStack() as stack:
+        recorder = None
+        if replay_path is not None:
+            recorder = stack.enter_context(
+                Recorder(replay_path, world, seed=seed)
+            )
+            recorder.record()
+        while world.running:
+            world.step(dt)
+            if recorder is not None:
+                recorder.record()
+    if profiler is not None and trace_path is not None:
+        profiler.export_trace(trace_path, pid=seed)
+        profiler.clear_trace()
+
+    return {
+        "seed": seed,
+        "teams": [team.__class__.__name__ for team in world.teams],
+        "scores": world.scores,
+        "summary": [str(team) for team in world.teams],
+        "time": world.time,
+        "profile": profiler,
+    }
+
+
+def _run_seed(
+        seed: int,
+        team_descriptions: list[dict],
+        replay_dir: str,
+        profile: bool,
+        trace_dir: str,
+        config: Config
+    ) -> dict:
+    """
+    Runs the match for `seed`, recording it in `replay_dir` and writing
+    its trace to `trace_dir` if given.
+
+    :param seed: seed of the match (int)
+    :param team_descriptions: team descriptions passed to `World`
+     (list[dict])
+    :param replay_dir: directory to record replays in (str)
+    :param profile: time the phases of every tick (bool)
+    :param trace_dir: directory to write traces to (str)
+    :param config: configuration of the match (Config)
+    :return: result of the match, see `run_match()` (dict)
+    """
+    replay_path, trace_path = None, None
+    if replay_dir is not None:
+        replay_path = os.path.join(replay_dir, f"match_{seed}.replay")
+    if profile and trace_dir is not None:
+        trace_path = os.path.join(trace_dir, f"trace_{seed}.json")
+    return run_match(
+        seed,
+        team_descriptions,
+        replay_path,
+        profile,
+        trace_path,
+        config
+    )
+
+
+def run_batch(
+        n_matches: int,
+        workers: int = None,
+        base_seed: int = 0,
+        team_descriptions: list[dict] = None,
+        replay_dir: str = None,
+        profile: bool = False,
+        trace_dir: str = None,
+        config: Config = None
+    ) -> Iterator[dict]:
+    """
+    Runs `n_matches` headless matches over a pool of worker processes
+    and yields the result of every match as soon as it finishes, so in
+    completion order rather than seed order. Match i is seeded with
+    `base_seed + i`.
+
+    :param n_matches: number of matches to run (int)
+    :param workers: number of worker processes, all cores if None and
+     in-process if 1 (int)
+    :param base_seed: seed of the first match (int)
+    :param team_descriptions: team descriptions passed to `World`,
+     TEAMS of the configuration if None (list[dict])
+    :param replay_dir: directory every match is recorded to as
+     `match_<seed>.replay`, nothing is recorded if None (str)
+    :param profile: time the phases of every tick, the results then
+     hold a `Profiler` per match (bool)
+    :param trace_dir: with `profile`, directory a Chrome trace of every
+     match is written to as `trace_<seed>.json` (str)
+    :param config: configuration of every match, the current settings
+     if None (Config)
+    :return: iterator over match results, see `run_match()`
+     (Iterator[dict])
+    """
+    seeds = range(base_seed, base_seed + n_matches)
+    job = functools.partial(
+        _run_seed,
+        team_descriptions=team_descriptions,
+        replay_dir=replay_dir,
+        profile=profile,
+        trace_dir=trace_dir,
+        config=config
+    )
+    for directory in (replay_dir, trace_dir if profile else None):
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    if workers == 1:
+        yield from map(job, seeds)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(job, seeds)
+
@@ -0,0 +1,384 @@
+"""
+Benchmarks for the hot paths of the simulation.
+
+    python benchmark.py --output results.json
+    python benchmark.py --compare results.json
+
+Every benchmark runs on generated scenarios with N agents and M targets,
+split over two teams and scattered over the world with a fixed seed.
+Results are written as JSON; with `--compare` the run is checked against
+a stored file and the exit code is 1 when any benchmark got slower than
+the threshold allows.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable
+
+import numpy as np
+
+import utils
+from config import Config
+from spatial_grid import SpatialGrid
+from world import World, STRATEGIES
+from team import Team
+
+
+def scenario(
+        n_agents: int,
+        n_targets: int,
+        seed: int = 0,
+        strategy: str = "AbsoluteDistanceTeam"
+    ) -> World:
+    """
+    Builds a headless world with `n_agents` agents split over two teams
+    and `n_targets` targets. Agents are scattered over the sky with
+    random headings, so they do not all start in the same spot.
+
+    :param n_agents: total number of agents, at least 2 (int)
+    :param n_targets: number of targets (int)
+    :param seed: seed of the world and the scatter (int)
+    :param strategy: name of the team class in `world.STRATEGIES` (str)
+    :return: world before its first step (World)
+    """
+    config = Config(USE_GUI=False, TARGET={"TARGET_COUNT": n_targets})
+    teams = [
+        {
+            "STRATEGY": strategy,
+            "N_AGENTS": n,
+            "PLANE": plane,
+        }
+        for n, plane in (
+            (n_agents - n_agents // 2, config.PLANE_I_16_REPUBLICAN),
+            (n_agents // 2, config.PLANE_I_16_FALANGIST),
+        )
+    ]
+    world = World(teams, seed=seed, config=config)
+
+    rng = np.random.default_rng(seed)
+    engine = world.engine
+    rows = [agent.index for agent in world.agents_all]
+    pos_virtual = rng.uniform(
+        (0, 50),
+        (config.SCREEN_WIDTH, config.GROUND["COLL_ELEVATION"] - 100),
+        (len(rows), 2)
+    )
+    heading = rng.uniform(0, 2 * np.pi, len(rows))
+    engine.pos_real[rows] = pos_virtual / config.PLANE_POS_SCALE
+    engine.pos_virtual[rows] = pos_virtual
+    engine.center[rows] = pos_virtual
+    engine.pitch[rows] = np.degrees(-heading) % 360
+    engine.v[rows] = 100 * np.stack((np.cos(heading), np.sin(heading)), 1)
+    return world
+
+
+def _fov(world: World) -> list[np.ndarray]:
+    """
+    :return: field of view of every agent, like `World.step()` computes
+     it (list[np.ndarray])
+    """
+    config = world.config
+    target_index, agent_index = (
+        SpatialGrid(
+            config.SCREEN_WIDTH,
+            config.SCREEN_HEIGHT,
+            world.fov_radius
+        ) for _ in range(2)
+    )
+    target_index.build(np.array([target.coords for target in world.targets]))
+    agent_index.build(
+        world.engine.pos_virtual[[a.index for a in world.agents_all]]
+    )
+    return [
+        np.array(utils.check_surround(
+            agent,
+            world.targets,
+            world.agents_all,
+            agent.radius_fov,
+            target_index,
+            agent_index
+        )).reshape(-1, 3)
+        for agent in world.agents_all
+    ]
+
+
+# Every benchmark takes a fresh scenario and returns the work to time. The
+# work returns how many operations it did.
+
+def bench_aircraft_tick(world: World) -> Callable[[], int]:
+    dt = world.config.DT
+    fov = _fov(world)
+
+    def work():
+        for agent, agent_fov in zip(world.agents_all, fov):
+            agent.tick(dt, agent_fov)
+        return len(world.agents_all)
+    return work
+
+
+def bench_engine_step(world: World) -> Callable[[], int]:
+    dt = world.config.DT
+
+    def work():
+        world.engine.step(dt)
+        return len(world.agents_all)
+    return work
+
+
+def bench_explore(world: World) -> Callable[[], int]:
+    dt = world.config.DT
+    fov = _fov(world)
+
+    def work():
+        for agent, agent_fov in zip(world.agents_all, fov):
+            agent.explore(dt, agent_fov)
+        return len(world.agents_all)
+    return work
+
+
+def bench_check_surround(world: World) -> Callable[[], int]:
+    return lambda: len(_fov(world))
+
+
+def bench_hit_detection(
+        world: World,
+        bullets_per_agent: int = 20
+    ) -> Callable[[], int]:
+    rng = np.random.default_rng(0)
+    for agent in world.agents_all:
+        for _ in range(bullets_per_agent):
+            world.bullet_pool.add(
+                rng.uniform((0, 0), world.config.SCREEN_RESOLUTION),
+                rng.uniform(0, 360),
+                agent.index
+            )
+
+    lanes = np.array([world.lane])
+
+    def work():
+        n_bullets = world.bullet_pool.count
+        world.table.move_bullets(lanes, world.config.DT)
+        return n_bullets
+    return work
+
+
+def bench_assign_targets(world: World) -> Callable[[], int]:
+    def work():
+        for team in world.teams:
+            team.assign_targets()
+        return len(world.teams)
+    return work
+
+
+def bench_match(world: World, ticks: int = 600) -> Callable[[], int]:
+    """
+    Full headless match for at most `ticks` ticks; one operation is
+    one tick, so operations per second are ticks per second.
+    """
+    dt = world.config.DT
+
+    def work():
+        done = 0
+        while world.running and done < ticks:
+            world.step(dt)
+            done += 1
+        return done
+    return work
+
+
+BENCHMARKS = {
+    "aircraft_tick": bench_aircraft_tick,
+    "engine_step": bench_engine_step,
+    "explore": bench_explore,
+    "check_surround": bench_check_surround,
+    "hit_detection": bench_hit_detection,
+    "match": bench_match,
+}
+# teams that do not assign targets, such as `ControlledTeam`, are skipped
+BENCHMARKS.update({
+    f"assign_targets[{name}]": bench_assign_targets
+    for name, team_class in STRATEGIES.items()
+    if team_class.assign_targets is not Team.assign_targets
+})
+
+
+def measure(
+        name: str,
+        n_agents: int,
+        n_targets: int,
+        repeat: int,
+        min_time: float = 0.05
+    ) -> dict:
+    """
+    Times benchmark `name` `repeat` times, each on a fresh scenario.
+    Within a run the work is repeated until it took at least
+    `min_time` or stops doing anything.
+
+    :param name: key in `BENCHMARKS` (str)
+    :param n_agents: number of agents in the scenario (int)
+    :param n_targets: number of targets in the scenario (int)
+    :param repeat: number of timed runs (int)
+    :param min_time: minimum duration of a run (s) (float)
+    :return: seconds per operation (best and median over the runs) and
+     operations per second based on the best run (dict)
+    """
+    strategy = "AbsoluteDistanceTeam"
+    if name.startswith("assign_targets["):
+        strategy = name[len("assign_targets["):-1]
+
+    per_op = []
+    for _ in range(repeat):
+        world = scenario(n_agents, n_targets, strategy=strategy)
+        work = BENCHMARKS[name](world)
+        ops = 0
+        start = time.perf_counter()
+        while True:
+            done = work()
+            ops += done
+            elapsed = time.perf_counter() - start
+            if done == 0 or elapsed >= min_time:
+                break
+        per_op.append(elapsed / max(ops, 1))
+
+    best = min(per_op)
+    return {
+        "name": name,
+        "n_agents": n_agents,
+        "n_targets": n_targets,
+        "repeat": repeat,
+        "best": best,
+        "median": statistics.median(per_op),
+        "per_second": 1 / best if best > 0 else float("inf"),
+    }
+
+
+def _metadata() -> dict:
+    """
+    :return: description of the machine and the code that ran (dict)
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+    }
+
+
+def _key(result: dict) -> tuple[str, int, int]:
+    return result["name"], result["n_agents"], result["n_targets"]
+
+
+def compare(
+        results: list[dict],
+        baseline: list[dict],
+        threshold: float
+    ) -> list[dict]:
+    """
+    Prints every result next to its baseline and returns the ones
+    whose best time got more than `threshold` slower.
+
+    :param results: results of this run (list[dict])
+    :param baseline: stored results (list[dict])
+    :param threshold: allowed slowdown, 0.1 is 10% (float)
+    :return: regressed results (list[dict])
+    """
+    stored = {_key(result): result for result in baseline}
+    regressions = []
+    print(f"{'benchmark':40} {'agents':>6} {'targets':>7} "
+          f"{'ops/s':>12} {'baseline':>12} {'change':>8}")
+    for result in results:
+        old = stored.get(_key(result))
+        line = (f"{result['name']:40} {result['n_agents']:>6} "
+                f"{result['n_targets']:>7} {result['per_second']:>12.1f}")
+        if old is None:
+            print(f"{line} {'-':>12} {'new':>8}")
+            continue
+        change = old["best"] / result["best"] - 1
+        flag = ""
+        if result["best"] > old["best"] * (1 + threshold):
+            regressions.append(result)
+            flag = "  REGRESSION"
+        print(f"{line} {old['per_second']:>12.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--agents", type=int, nargs="+", default=[4, 16, 64],
+        help="numbers of agents to run every benchmark with"
+    )
+    parser.add_argument(
+        "--targets", type=int, nargs="+", default=[10, 100],
+        help="numbers of targets to run every benchmark with"
+    )
+    parser.add_argument(
+        "--only", nargs="+", choices=sorted(BENCHMARKS), metavar="NAME",
+        help="benchmarks to run, all if not given: "
+             + ", ".join(sorted(BENCHMARKS))
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.05,
+        help="minimum duration of every timed run in seconds"
+    )
+    parser.add_argument("--output", help="write the results to this file")
+    parser.add_argument(
+        "--compare", metavar="BASELINE",
+        help="compare against results stored with --output"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="allowed slowdown against the baseline (default 0.1 = 10%%)"
+    )
+    args = parser.parse_args(argv)
+
+    random.seed(0)
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        for n_agents in args.agents:
+            for n_targets in args.targets:
+                result = measure(
+                    name,
+                    n_agents,
+                    n_targets,
+                    args.repeat,
+                    args.min_time
+                )
+                results.append(result)
+                if not args.compare:
+                    print(f"{name:40} {n_agents:>4} agents "
+                          f"{n_targets:>4} targets "
+                          f"{result['per_second']:>12.1f} ops/s")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"meta": _metadata(), "results": results}, file,
+                      indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
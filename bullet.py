@@ -1,98 +1,199 @@
 import pygame
 import math
+import numpy as np
 
-import settings
+import assets
+from config import Config
 
 
-class Bullet:
+class BulletPool:
     """
-    Bullet class
+    Bullet pool class. Stores every bullet in the world in preallocated
+    arrays; live bullets occupy the first `count` rows. Expired bullets
+    are retired by moving the last live bullet into their row, so rows
+    are not in firing order; `sequence` is.
 
-    + sprite: (pygame.surface) optional sprite with contents of bullet
     + size: (int) bullet 2r
-    + current_time: (float) accumulator for dt 
-    + pitch: (float) pitch of bullet
-    + speed: (float) bullet speed (m/s)
+    + speed: (float) bullet speed (pixels per tick)
+    + lifetime: (float) time after which a bullet expires (s)
     + ground_height: (int) ground_height (pixels)
-    + coords: (Tuple[int, int]) location (x, y) (pixels)
-    + rect: (Tuple[int, int]) balloon rect
+    + width: (int) width of the world, bullets wrap around it (pixels)
+    + capacity: (int) number of allocated rows
+    + count: (int) number of live bullets
+    + coords: (np.ndarray) location (x, y) per bullet (pixels),
+     shape (capacity, 2)
+    + velocity: (np.ndarray) displacement per tick per bullet,
+     shape (capacity, 2)
+    + age: (np.ndarray) time alive per bullet (s)
+    + owner: (np.ndarray) engine index of the aircraft that fired
+     each bullet
+    + sequence: (np.ndarray) number of every bullet in the order the
+     bullets of the pool were fired
+    + fired: (int) number of bullets fired into the pool
+    + sprite: (pygame.surface) optional sprite shared by all bullets
     """
     def __init__(
             self,
-            coords: tuple[int, int],
-            pitch: float,
             ground_height: int,
             sprite: str=None,
+            capacity: int=256,
+            config: Config=None
     ) -> None:
         """
-        Initaliser of the bullet class
+        Initaliser of the BulletPool class
 
-        :param coords: initial position of the bullet (tuple[int, int])
-        :param pitch: angle of the bullet (float)
         :param ground_height: height of the ground (int)
-        :param sprite: path of the image used for the sprite of the 
-         bullet
+        :param sprite: path of the image used for the sprite of the
+         bullets
+        :param capacity: number of bullets to preallocate room for, the
+         pool grows when more are alive at once (int)
+        :param config: configuration, the current settings if None
+         (Config)
         :return: None
         """
-        self.size = settings.BULLET["SIZE"]
-        self.current_time = 0
-        self.pitch = pitch
-        self.speed = settings.BULLET["SPEED"]
+        if config is None:
+            config = Config()
+        self.size = config.BULLET["SIZE"]
+        self.speed = config.BULLET["SPEED"]
+        self.lifetime = config.BULLET["LIFETIME"]
         self.ground_height = ground_height
+        self.width = config.SCREEN_WIDTH
 
-        self.coords = (
-            coords[0],
-            coords[1]
-        )
-        self.rect = pygame.Rect(
-            self.coords[0],
-            self.coords[1],
-            self.size,
-            self.size
-        )
+        self.capacity = max(1, capacity)
+        self.count = 0
+        self.coords = np.zeros((self.capacity, 2))
+        self.velocity = np.zeros((self.capacity, 2))
+        self.age = np.zeros(self.capacity)
+        self.owner = np.zeros(self.capacity, dtype=int)
+        self.sequence = np.zeros(self.capacity, dtype=np.int64)
+        self.fired = 0
 
+        self.sprite = None
         if sprite:
-            self.sprite = pygame.image.load(sprite)
-            self.sprite = pygame.transform.scale(
-                self.sprite,
-                (self.size, self.size)
+            self.sprite = assets.load(
+                sprite,
+                (self.size, self.size),
+                (True, False)
             )
 
-    def move_bullet(self, dt: float) -> bool:
+    def __len__(self) -> int:
+        return self.count
+
+    def _arrays(self) -> tuple[np.ndarray, ...]:
+        return (
+            self.coords,
+            self.velocity,
+            self.age,
+            self.owner,
+            self.sequence
+        )
+
+    def _grow(self) -> None:
         """
-        This function calculates the new position of the bullet based on 
-        the pitch of the plane. If the bullet has been alive for too
-        long, it destroys itself. If the bullet hits the ground, it
-        is also destroyed. The function returns True if the bullet
-        needs to be destroyed.
+        Doubles the capacity of the pool.
 
-        :param dt: time step (float)
-        :return: bool
+        :return: None
         """
-        self.current_time += dt
-
-        # Calculate the new position of the bullet
-        dx = self.speed * math.cos(math.radians(-self.pitch))
-        dy = self.speed * math.sin(math.radians(-self.pitch))
-
-        self.coords = (self.coords[0] + dx, self.coords[1] + dy)
-        self.rect = pygame.Rect(
-            self.coords[0],
-            self.coords[1],
-            self.size,
-            self.size
+        self.capacity *= 2
+        (
+            self.coords,
+            self.velocity,
+            self.age,
+            self.owner,
+            self.sequence
+        ) = (
+            np.concatenate((array, np.zeros_like(array)))
+            for array in self._arrays()
         )
 
+    def add(
+            self,
+            coords: tuple[float, float],
+            pitch: float,
+            owner: int
+    ) -> None:
+        """
+        Fires a new bullet.
+
+        :param coords: initial position of the bullet
+         (tuple[float, float])
+        :param pitch: angle of the bullet (float)
+        :param owner: engine index of the aircraft firing (int)
+        :return: None
+        """
+        if self.count == self.capacity:
+            self._grow()
+        i = self.count
+        self.count += 1
+
+        self.coords[i] = coords
+        self.velocity[i, 0] = self.speed * math.cos(math.radians(-pitch))
+        self.velocity[i, 1] = self.speed * math.sin(math.radians(-pitch))
+        self.age[i] = 0
+        self.owner[i] = owner
+        self.sequence[i] = self.fired
+        self.fired += 1
+
+    def step(self, dt: float) -> None:
+        """
+        This function moves all live bullets, wraps them around the
+        sides of the screen and retires the bullets that have been
+        alive for too long or hit the ground.
+
+        :param dt: time step (float)
+        :return: None
+        """
+        n = self.count
+        self.age[:n] += dt
+        self.coords[:n] += self.velocity[:n]
+
         # Check if the bullet needs to wrap around the screen
-        if self.coords[0] < 0:
-            self.coords = (settings.SCREEN_WIDTH, self.coords[1])
-        elif self.coords[0] > settings.SCREEN_WIDTH:
-            self.coords = (0, self.coords[1])
+        x = self.coords[:n, 0]
+        left, right = x < 0, x > self.width
+        x[left] = self.width
+        x[right] = 0
 
         # Check if the bullet needs to be destroyed
-        if self.current_time >= settings.BULLET["LIFETIME"]:
-            return True
+        self.retire(np.flatnonzero(
+            (self.age[:n] >= self.lifetime) |
+            (self.coords[:n, 1] >= self.ground_height)
+        ))
+
+    def retire(self, indices: np.ndarray) -> None:
+        """
+        Removes the bullets at `indices` by filling their rows with the
+        live bullets from the end of the pool. Rows of other bullets
+        may change.
+
+        :param indices: rows of the bullets to remove (np.ndarray)
+        :return: None
+        """
+        if len(indices) == 0:
+            return
+        n = self.count
+        dead = np.zeros(n, dtype=bool)
+        dead[indices] = True
+        n_alive = n - np.count_nonzero(dead)
 
-        if self.coords[1] >= self.ground_height:
-            return True
-        return False
+        holes = np.flatnonzero(dead[:n_alive])
+        movers = np.flatnonzero(~dead[n_alive:]) + n_alive
+        for array in self._arrays():
+            array[holes] = array[movers]
+        self.count = n_alive
+
+    def retire_owner(self, owner: int) -> None:
+        """
+        Removes all bullets fired by `owner`.
+
+        :param owner: engine index of the aircraft (int)
+        :return: None
+        """
+        self.retire(np.flatnonzero(self.owner[:self.count] == owner))
+
+    def centers(self) -> np.ndarray:
+        """
+        Returns the centre of every live bullet.
+
+        :return: centres, shape (count, 2) (np.ndarray)
+        """
+        return self.coords[:self.count] + self.size / 2
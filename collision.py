@@ -0,0 +1,277 @@
+import numpy as np
+
+from config import Config
+import agent
+import bullet
+import target
+
+
+class Hit:
+    """
+    Hit event produced by `detect_bullet_hits()`.
+
+    + bullet: (int) row of the bullet in the pool
+    + shooter: (int) engine index of the aircraft that fired the bullet
+    + victim: (agent.Agent) agent that was hit, None for target hits
+    + target: (target.Target) target that was hit, None for agent hits
+    """
+    __slots__ = ("bullet", "shooter", "victim", "target")
+
+    def __init__(
+            self,
+            bullet: int,
+            shooter: int,
+            victim: agent.Agent = None,
+            target: target.Target = None
+    ) -> None:
+        """
+        Initialiser of the Hit class
+
+        :param bullet: row of the bullet in the pool (int)
+        :param shooter: engine index of the shooter (int)
+        :param victim: agent that was hit (agent.Agent)
+        :param target: target that was hit (target.Target)
+        """
+        self.bullet = bullet
+        self.shooter = shooter
+        self.victim = victim
+        self.target = target
+
+
+def sweep_pairs(
+        keys: np.ndarray,
+        centers: np.ndarray,
+        reach: float,
+        width: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sort-and-sweep broadphase along x. Returns every (query, key) pair
+    whose x coordinates are at most `reach` apart, wrapping around the
+    left and right side of the world.
+
+    :param keys: x coordinates to search, any order (np.ndarray)
+    :param centers: x coordinates of the queries (np.ndarray)
+    :param reach: maximum distance along x (float)
+    :param width: width of the world (float)
+    :return: query indices and key indices of the candidate pairs
+     (tuple[np.ndarray, np.ndarray])
+    """
+    order = np.argsort(keys, kind="stable")
+    keys_sorted = keys[order]
+    queries, found = [], []
+    for shift in (-width, 0, width):
+        lo = np.searchsorted(keys_sorted, centers + shift - reach, "left")
+        hi = np.searchsorted(keys_sorted, centers + shift + reach, "right")
+        counts = hi - lo
+        total = counts.sum()
+        if total == 0:
+            continue
+        starts = np.cumsum(counts) - counts
+        queries.append(np.repeat(np.arange(len(centers)), counts))
+        found.append(
+            np.arange(total) -
+            np.repeat(starts, counts) +
+            np.repeat(lo, counts)
+        )
+    if not queries:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    return np.concatenate(queries), order[np.concatenate(found)]
+
+
+def _wrapped_delta(
+        a: np.ndarray,
+        b: np.ndarray,
+        width: float
+    ) -> np.ndarray:
+    """
+    Absolute per-axis difference between points, wrapping x around the
+    sides of the screen.
+
+    :param a: points, shape (n, 2) (np.ndarray)
+    :param b: points, shape (n, 2) (np.ndarray)
+    :param width: width of the world (float)
+    :return: absolute differences, shape (n, 2) (np.ndarray)
+    """
+    delta = np.abs(a - b)
+    delta[:, 0] %= width
+    delta[:, 0] = np.minimum(delta[:, 0], width - delta[:, 0])
+    return delta
+
+
+def bullet_hits(
+        centers: np.ndarray,
+        owners: np.ndarray,
+        victims: np.ndarray,
+        positions: np.ndarray,
+        boxes: np.ndarray,
+        bullet_size: float,
+        width: float,
+        agent_radius: float = 5,
+        sides: np.ndarray = None,
+        lanes: tuple[np.ndarray, np.ndarray, np.ndarray] = None,
+        sequence: np.ndarray = None
+    ) -> list[tuple[int, int, int]]:
+    """
+    Array version of `detect_bullet_hits()`, for bullets, agents and
+    targets that may belong to several worlds. With `lanes`, the sweep
+    lays the worlds out side by side, three widths apart, so that a
+    bullet only meets the agents and targets of its own world; the
+    exact tests use the coordinates within the worlds.
+
+    :param centers: centre of every bullet, shape (n, 2) (np.ndarray)
+    :param owners: engine index of the shooter of every bullet
+     (np.ndarray)
+    :param victims: engine index of every agent that can be hit
+     (np.ndarray)
+    :param positions: centre of every agent that can be hit, shape
+     (a, 2) (np.ndarray)
+    :param boxes: centre x and y, width and height of every target that
+     can be hit, shape (t, 4) (np.ndarray)
+    :param bullet_size: size of a bullet (float)
+    :param width: width of the worlds (float)
+    :param agent_radius: distance between the centre of a bullet and an
+     agent at which the agent is hit (float)
+    :param sides: side of every aircraft by engine index, only the
+     shooter itself is safe from its bullets if None (np.ndarray)
+    :param lanes: world of every bullet, agent and target, all in one
+     world if None (tuple[np.ndarray, np.ndarray, np.ndarray])
+    :param sequence: order in which the bullets were fired, see
+     `BulletPool.sequence`; hits are resolved in this order, so the
+     result does not depend on the rows of the bullets. In bullet order
+     if None (np.ndarray)
+    :return: bullet, agent and target of every hit, in the order they
+     were resolved, with -1 for the agent of a target hit and the
+     target of an agent hit (list[tuple[int, int, int]])
+    """
+    bullet_x, agent_x, target_x = centers[:, 0], positions[:, 0], boxes[:, 0]
+    margin = 0.0
+    if lanes is not None:
+        spacing = 3 * width
+        bullet_x = bullet_x + lanes[0] * spacing
+        agent_x = agent_x + lanes[1] * spacing
+        target_x = target_x + lanes[2] * spacing
+        # the shifted coordinates round differently, the exact tests
+        # below decide
+        margin = 1.0
+
+    # bullet -> candidate agents, in agent order
+    agent_hits = {}
+    if len(victims) > 0:
+        a, b = sweep_pairs(bullet_x, agent_x, agent_radius + margin, width)
+        delta = _wrapped_delta(positions[a], centers[b], width)
+        hit_victims = victims[a]
+        hit = (
+            (delta[:, 0]**2 + delta[:, 1]**2 <= agent_radius**2) &
+            (hit_victims != owners[b])
+        )
+        if sides is not None:
+            hit &= sides[hit_victims] != sides[owners[b]]
+        for i, j in sorted(zip(b[hit].tolist(), a[hit].tolist())):
+            agent_hits.setdefault(i, []).append(j)
+
+    # bullet -> candidate targets, in target order
+    target_hits = {}
+    if len(boxes) > 0:
+        half = (boxes[:, 2:] + bullet_size) / 2
+        a, b = sweep_pairs(
+            bullet_x,
+            target_x,
+            half[:, 0].max() + margin,
+            width
+        )
+        delta = _wrapped_delta(boxes[a, :2], centers[b], width)
+        hit = np.all(delta < half[a], axis=1)
+        for i, j in sorted(zip(b[hit].tolist(), a[hit].tolist())):
+            target_hits.setdefault(i, []).append(j)
+
+    hits = []
+    hit_agents, hit_targets = set(), set()
+    struck_bullets = sorted(agent_hits.keys() | target_hits.keys())
+    if sequence is not None:
+        struck_bullets.sort(key=sequence.__getitem__)
+    for i in struck_bullets:
+        victim = next(
+            (j for j in agent_hits.get(i, []) if j not in hit_agents),
+            None
+        )
+        if victim is not None:
+            hit_agents.add(victim)
+            hits.append((i, victim, -1))
+            continue
+        struck = next(
+            (j for j in target_hits.get(i, []) if j not in hit_targets),
+            None
+        )
+        if struck is not None:
+            hit_targets.add(struck)
+            hits.append((i, -1, struck))
+    return hits
+
+
+def detect_bullet_hits(
+        bullet_pool: bullet.BulletPool,
+        agents: list[agent.Agent],
+        targets: list[target.Target],
+        agent_radius: float = 5,
+        sides: np.ndarray = None,
+        config: Config = None
+    ) -> list[Hit]:
+    """
+    Collision stage for all live bullets at once. A sorted sweep along
+    x finds candidate bullet/agent and bullet/target pairs, which are
+    then tested exactly in one batch. Hits are resolved in the order
+    the bullets were fired: a bullet is used up by its first hit,
+    agents are checked before targets, an agent cannot hit itself, and
+    every agent or target can only be hit once. Agents are only hit
+    with `COLLISION` on. With `sides`, agents on the side of the
+    shooter cannot be hit either.
+
+    :param bullet_pool: bullets of all agents (bullet.BulletPool)
+    :param agents: agents that can be hit (list[agent.Agent])
+    :param targets: targets that can be hit (list[target.Target])
+    :param agent_radius: distance between the centre of a bullet and an
+     agent at which the agent is hit (float)
+    :param sides: side of every aircraft by engine index, only the
+     shooter itself is safe from its bullets if None (np.ndarray)
+    :param config: configuration, the current settings if None (Config)
+    :return: hit events, in firing order (list[Hit])
+    """
+    n = bullet_pool.count
+    if n == 0:
+        return []
+    owners = bullet_pool.owner[:n]
+
+    if config is None:
+        config = Config()
+
+    if config.COLLISION and len(agents) > 0:
+        victims = np.array([agent.index for agent in agents])
+        positions = np.array([agent.center for agent in agents])
+    else:
+        victims = np.zeros(0, dtype=int)
+        positions = np.zeros((0, 2))
+    boxes = np.array([
+        (*target.center, target.rect.w, target.rect.h)
+        for target in targets
+    ]).reshape(-1, 4)
+
+    return [
+        Hit(
+            i,
+            int(owners[i]),
+            victim=agents[victim] if victim >= 0 else None,
+            target=targets[struck] if struck >= 0 else None
+        )
+        for i, victim, struck in bullet_hits(
+            bullet_pool.centers(),
+            owners,
+            victims,
+            positions,
+            boxes,
+            bullet_pool.size,
+            config.SCREEN_WIDTH,
+            agent_radius,
+            sides,
+            sequence=bullet_pool.sequence[:n]
+        )
+    ]
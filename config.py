@@ -0,0 +1,78 @@
+import copy
+import types
+import numpy as np
+
+import settings
+
+
+class Config:
+    """
+    One configuration of the simulation. Holds every upper case name of
+    a profile, the `settings` module by default, under the same name,
+    plus constants derived from them. A match reads its configuration
+    from the `Config` it was given, so one process can run matches with
+    different configurations back to back.
+
+    + (every upper case name of the profile): copy of the setting
+    + SCREEN_RESOLUTION: (tuple[int, int]) SCREEN_WIDTH, SCREEN_HEIGHT
+    + WINDOW: (np.ndarray) SCREEN_RESOLUTION as floats
+    + WRAP_OFFSETS: (np.ndarray) offsets of the copies of the world to
+     the left, in the middle and to the right, shape (3, 2)
+    + DT: (float) time step of the simulation, 1 / TICK_RATE (s)
+    """
+    DERIVED = ("SCREEN_RESOLUTION", "WINDOW", "WRAP_OFFSETS", "DT")
+
+    def __init__(
+            self,
+            profile: types.ModuleType | dict = None,
+            **overrides
+    ) -> None:
+        """
+        Initialiser of the Config class
+
+        :param profile: module or dict to read the settings from,
+         `settings` if None (types.ModuleType | dict)
+        :param overrides: settings to use instead of those of
+         `profile`; a dict is merged into the dict it replaces, so
+         `BULLET={"SPEED": 12}` keeps the other bullet settings
+        """
+        if profile is None:
+            profile = settings
+        if isinstance(profile, types.ModuleType):
+            profile = vars(profile)
+        values = {
+            name: value for name, value in profile.items()
+            if name.isupper() and name not in self.DERIVED
+        }
+        for name, value in overrides.items():
+            if isinstance(value, dict) and isinstance(values.get(name), dict):
+                value = {**values[name], **value}
+            values[name] = value
+
+        self._names = tuple(values)
+        for name, value in copy.deepcopy(values).items():
+            setattr(self, name, value)
+
+        self.SCREEN_RESOLUTION = (self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
+        self.WINDOW = np.array(self.SCREEN_RESOLUTION, dtype=float)
+        self.WRAP_OFFSETS = np.array([-1, 0, 1])[:, None] * np.array(
+            [self.SCREEN_WIDTH, 0]
+        )
+        self.DT = 1 / self.TICK_RATE
+
+    def values(self) -> dict:
+        """
+        The settings of this config, without the derived constants.
+
+        :return: value by setting name (dict)
+        """
+        return {name: getattr(self, name) for name in self._names}
+
+    def replace(self, **overrides) -> "Config":
+        """
+        Copy of this config with some settings replaced, see
+        `__init__()`.
+
+        :return: new config (Config)
+        """
+        return Config(self.values(), **overrides)
@@ -0,0 +1,111 @@
+import numpy as np
+
+from team import Team
+from agent import Agent
+from aircraft import Aircraft
+
+
+# columns of a command: pitch rate as a fraction of the agility, fire
+# and flip, the last two when above 0.5
+TURN, FIRE, FLIP = 0, 1, 2
+COMMAND_SIZE = 3
+
+
+def steer(agents: list[Agent], commands: np.ndarray, dt: float) -> None:
+    """
+    Flies `agents` by `commands` for one tick: pitch all of them at
+    once, then flip and fire those that were told to. All agents must
+    share one physics engine, they may belong to different worlds.
+
+    :param agents: agents to fly (list[Agent])
+    :param commands: one command per agent, see `TURN`, `FIRE` and
+     `FLIP`, shape (agents, 3) (np.ndarray)
+    :param dt: time step (float)
+    :return: None
+    """
+    if len(agents) == 0:
+        return
+    engine = agents[0].engine
+    rows = np.array([agent.index for agent in agents], dtype=np.intp)
+    commands = np.asarray(commands, dtype=float).reshape(-1, COMMAND_SIZE)
+
+    for agent in agents:
+        Aircraft.update(agent, dt, None)
+    turn = np.clip(commands[:, TURN], -1.0, 1.0)
+    engine.pitch[rows] = (
+        engine.pitch[rows] + engine.agility[rows] * (turn * dt)
+    ) % 360
+
+    flip = commands[:, FLIP] > 0.5
+    fire = commands[:, FIRE] > 0.5
+    for agent, flips, fires in zip(agents, flip.tolist(), fire.tolist()):
+        if agent.use_gui:
+            agent._rotate_sprite()
+        if flips and agent.flipstart < 0:
+            agent.flip()
+        if fires:
+            agent.shoot()
+
+
+class ControlledAgent(Agent):
+    """
+    Agent that is flown by commands from outside, such as a learned
+    policy, instead of by its own decisions. It does not explore or
+    pick targets.
+
+    + command: (np.ndarray) command of the next tick, see `steer()`
+    """
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initialiser of the ControlledAgent class, takes the arguments
+        of `Agent`. The agent starts flying straight.
+        """
+        super().__init__(*args, **kwargs)
+        self.target = None
+        self.command = np.zeros(COMMAND_SIZE)
+
+    def update(self, dt: float, fov: np.ndarray) -> None:
+        """
+        Applies `command`, see `steer()`.
+
+        :param dt: (float) time since last frame in s
+        :param fov: (np.ndarray) unused
+        :return: None
+        """
+        steer([self], self.command, dt)
+
+
+class ControlledTeam(Team):
+    """
+    Team of `ControlledAgent`s, flown by the commands set on its agents
+    rather than by a strategy. See `env.Environment`.
+
+    + targets (list[tuple[float, float]]) all targets xy coords
+    + agents (list[ControlledAgent]) list with all existing agents for
+    team
+    """
+    agent_class = ControlledAgent
+
+    def act(self, fov_list: list, dt: float) -> None:
+        """
+        Flies every agent by its command, all at once.
+
+        :param fov_list: (list) unused
+        :param dt: (float) time since the last call in s
+        """
+        steer(
+            self.agents,
+            [agent.command for agent in self.agents],
+            dt
+        )
+
+    def __str__(self) -> str:
+        """
+        Print out class data using this method in the format of:
+
+        Controlled Team:
+            Contains `n` agents.
+            Currently thinks there are `n` targets.
+            Score: `n`.
+        """
+        return f"Controlled {super().__str__()}"
@@ -0,0 +1,161 @@
+import math
+import numpy as np
+
+
+class CoverageMap:
+    """
+    Coarse grid of the area that has been seen. Each cell holds one
+    byte, set once any field of view has covered it. The grid wraps
+    around horizontally like the world does. One map can be shared by
+    all agents of a team, and maps can be merged with `merge()`.
+
+    + scale: (int) size of a cell in pixels
+    + nx: (int) number of cells horizontally
+    + ny: (int) number of cells vertically
+    + cells: (np.ndarray) True for every covered cell, shape (nx, ny)
+    """
+    def __init__(
+        self,
+        window_dimensions: tuple[int, int],
+        scale: int = 10
+    ) -> None:
+        """
+        Initialiser of the CoverageMap class
+
+        :param window_dimensions: dimensions of the world
+         (tuple[int, int])
+        :param scale: size of a cell in pixels (int)
+        """
+        self.scale = scale
+        self.nx = int(window_dimensions[0] / scale)
+        self.ny = int(window_dimensions[1] / scale)
+        self.cells = np.zeros((self.nx, self.ny), dtype=bool)
+
+    def _disks(
+        self,
+        centers: np.ndarray,
+        radius: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Tests the cells in a square window around every centre against
+        the disk of `radius` around it.
+
+        :param centers: centres in pixels, shape (n, 2) (np.ndarray)
+        :param radius: radius in pixels, less than half the world
+         width (float)
+        :return: index into the flattened `cells` of every window cell
+         and whether it is inside the disk, both of shape (n, k, k)
+         (tuple[np.ndarray, np.ndarray])
+        """
+        centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+        reach = math.ceil(radius / self.scale) + 1
+        offsets = np.arange(-reach, reach + 1)
+        xs = np.floor(centers[:, 0, None] / self.scale) + offsets
+        ys = np.floor(centers[:, 1, None] / self.scale) + offsets
+        d_x = xs - centers[:, 0, None] / self.scale
+        d_y = ys - centers[:, 1, None] / self.scale
+        inside = (
+            (d_x[:, :, None] ** 2 + d_y[:, None, :] ** 2) <
+            (radius / self.scale) ** 2
+        ) & ((ys >= 0) & (ys < self.ny))[:, None, :]
+
+        columns = xs.astype(int) % self.nx
+        rows = np.clip(ys.astype(int), 0, self.ny - 1)
+        return columns[:, :, None] * self.ny + rows[:, None, :], inside
+
+    def stamp(self, center: tuple[float, float], radius: float) -> int:
+        """
+        Marks the disk of `radius` around `center` as covered.
+
+        :param center: centre in pixels (tuple[float, float])
+        :param radius: radius in pixels, less than half the world
+         width (float)
+        :return: number of cells that were not covered before (int)
+        """
+        reach = math.ceil(radius / self.scale) + 1
+        x = float(center[0]) / self.scale
+        y = float(center[1]) / self.scale
+        x0, x1 = math.floor(x) - reach, math.floor(x) + reach
+        y0 = max(math.floor(y) - reach, 0)
+        y1 = min(math.floor(y) + reach, self.ny - 1)
+        if x1 - x0 < self.nx:
+            # the test of `_disks()` on the block of `cells` around the
+            # disk, every cell of which is only once in it
+            if y0 > y1:
+                return 0
+            inside = (
+                (np.arange(x0, x1 + 1) - x)[:, None] ** 2 +
+                (np.arange(y0, y1 + 1) - y)[None, :] ** 2
+            ) < (radius / self.scale) ** 2
+            shift = x0 // self.nx * self.nx
+            x0, x1 = x0 - shift, x1 - shift
+            if x1 < self.nx:
+                parts = ((x0, x1 + 1, inside),)
+            else:
+                # the part beyond the right side wraps around
+                split = self.nx - x0
+                parts = (
+                    (x0, self.nx, inside[:split]),
+                    (0, x1 - self.nx + 1, inside[split:])
+                )
+            new = 0
+            for start, stop, part in parts:
+                block = self.cells[start:stop, y0:y1 + 1]
+                new += np.count_nonzero(part & ~block)
+                block |= part
+            return int(new)
+
+        cells, inside = self._disks(center, radius)
+        cells = cells[inside]
+        flat = self.cells.reshape(-1)
+        new = np.count_nonzero(~flat[cells])
+        flat[cells] = True
+        return int(new)
+
+    def revealed(self, centers: np.ndarray, radius: float) -> np.ndarray:
+        """
+        Returns for every centre how many uncovered cells the disk of
+        `radius` around it would cover, without stamping anything.
+
+        :param centers: centres in pixels, shape (n, 2) (np.ndarray)
+        :param radius: radius in pixels, less than half the world
+         width (float)
+        :return: number of new cells per centre (np.ndarray)
+        """
+        cells, inside = self._disks(centers, radius)
+        return np.count_nonzero(
+            inside & ~np.take(self.cells, cells),
+            axis=(1, 2)
+        )
+
+    def uncovered_centroid(self, max_y: float = None) -> np.ndarray:
+        """
+        Returns the mean position of the uncovered cells above `max_y`.
+
+        :param max_y: only cells above this height in pixels count,
+         all cells if None (float)
+        :return: position in pixels, NaN if everything is covered
+         (np.ndarray)
+        """
+        ny = self.ny if max_y is None else int(max_y / self.scale)
+        cells = np.argwhere(~self.cells[:, :ny])
+        if len(cells) == 0:
+            return np.full(2, np.nan)
+        return cells.mean(axis=0) * self.scale
+
+    def merge(self, other: "CoverageMap") -> None:
+        """
+        Adds everything covered in `other` to this map.
+
+        :param other: map with the same dimensions (CoverageMap)
+        :return: None
+        """
+        self.cells |= other.cells
+
+    def reset(self) -> None:
+        """
+        Marks every cell as uncovered.
+
+        :return: None
+        """
+        self.cells[:] = False
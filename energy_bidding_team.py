@@ -1,8 +1,11 @@
 import numpy as np
 
-import settings
 from absolute_distance_team import AbsoluteDistanceTeam
 from agent import Agent
+from physics import PhysicsEngine
+from bullet import BulletPool
+from team import TeamTable
+from config import Config
 
 
 class EnergyBiddingTeam(AbsoluteDistanceTeam):
@@ -11,13 +14,21 @@ class EnergyBiddingTeam(AbsoluteDistanceTeam):
             targets: np.array,
             n_agents: int,
             agent_description: dict,
-            team_number: int
+            team_number: int,
+            engine: PhysicsEngine = None,
+            bullet_pool: BulletPool = None,
+            table: TeamTable = None,
+            config: Config = None
     ) -> None:
         super().__init__(
             targets,
             n_agents,
             agent_description,
-            team_number
+            team_number,
+            engine,
+            bullet_pool,
+            table,
+            config
         )
 
     def _calculate_distance(
@@ -33,10 +44,8 @@ class EnergyBiddingTeam(AbsoluteDistanceTeam):
         - approximation of required energy
         """
         E_min = float("inf")
-        offset = np.array([settings.SCREEN_WIDTH, 0])
-
-        for i in [-1, 0, 1]:
-            target_relative = target - agent.rot_rect.center + i * offset
+        for offset in self.config.WRAP_OFFSETS:
+            target_relative = target - agent.center + offset
 
             # height energy: Eh = mgh
             Eh = (agent.mass * 9.81 * -target_relative[1])
@@ -61,7 +70,53 @@ class EnergyBiddingTeam(AbsoluteDistanceTeam):
                 E_min = (Eh + Er + Ed)
 
         return E_min
-    
+
+    def _distance_matrix(self) -> np.ndarray:
+        """
+        Approximates the energy required for every agent to reach every
+        target, like `_calculate_distance()` but for all agents, targets
+        and horizontal wrap offsets at once.
+
+        :return: (np.ndarray) energies, shape (agents, targets)
+        """
+        position = self._positions()
+        v = np.array([agent.v for agent in self.agents]).reshape(-1, 2)
+        mass = np.array([agent.mass for agent in self.agents])
+        drag = np.array([
+            np.linalg.norm(agent.f_drag) for agent in self.agents
+        ])
+        offsets = self.config.WRAP_OFFSETS
+
+        # shape (agents, targets, offsets, 2)
+        target_relative = (
+            self.targets[None, :, None, :] -
+            position[:, None, None, :] +
+            offsets[None, None, :, :]
+        )
+        distance = np.linalg.norm(target_relative, axis=3)
+        speed = np.linalg.norm(v, axis=1)
+
+        # height energy: Eh = mgh
+        Eh = mass[:, None, None] * 9.81 * -target_relative[..., 1]
+
+        # rotational energy: Er = m/2 * |(v1)^2 - (v2)^2|
+        with np.errstate(invalid="ignore", divide="ignore"):
+            v_target = (
+                target_relative / distance[..., None] *
+                speed[:, None, None, None]
+            )
+        Er = mass[:, None, None] / 2 * np.linalg.norm(
+            v[:, None, None, :] ** 2 - v_target ** 2,
+            axis=3
+        )
+
+        # kinetic energy loss to drag (approximate): Ed = Fd * s
+        Ed = drag[:, None, None] * distance
+
+        E = Eh + Er + Ed
+        E[np.isnan(E)] = np.inf
+        return E.min(axis=2)
+
     def __str__(self) -> str:
         """
         Print out class data using this method in the format of:
@@ -0,0 +1,565 @@
+"""
+Reinforcement learning environments around `World`, in the style of
+gym: `reset()` returns the observations, `step(actions)` the
+observations, rewards, whether the match is done and extra info.
+
+    env = Environment(seed=0)
+    observations = env.reset()
+    done = False
+    while not done:
+        observations, rewards, done, info = env.step(policy(observations))
+
+One team, `learner`, is a `ControlledTeam`: its agents are flown by the
+actions, one command per agent, see `controlled_team.steer()`. The other
+teams keep their scripted strategies. Every agent observes itself and
+the nearest targets and enemy aircraft, see `observe()`; its reward is
+the score its team made during the step.
+
+`VectorEnvironment` plays K matches in lockstep in one process. Their
+aircraft share one physics engine, which is stepped once per team for
+all matches, and their bullets share one bullet pool. The learner teams
+of all matches are flown at once, and perception, collisions, scoring
+and the observations of all matches are computed in one go. Matches
+play out exactly as they would in an `Environment`. Matches that are
+done are reset on the spot.
+"""
+import numpy as np
+
+from config import Config
+from physics import PhysicsEngine
+from bullet import BulletPool
+from world import World, WorldTable
+from controlled_team import ControlledTeam, COMMAND_SIZE, steer
+
+
+# observation of an agent: its own state, then per nearest target and
+# per nearest enemy aircraft the fields below
+OWN_FIELDS = ("x", "y", "vx", "vy", "cos_pitch", "sin_pitch", "orientation")
+TARGET_FIELDS = ("dx", "dy", "present")
+ENEMY_FIELDS = ("dx", "dy", "vx", "vy", "present")
+
+
+def observation_size(n_targets: int, n_enemies: int) -> int:
+    """
+    :param n_targets: nearest targets per observation (int)
+    :param n_enemies: nearest enemy aircraft per observation (int)
+    :return: length of the observation of one agent (int)
+    """
+    return (
+        len(OWN_FIELDS) +
+        n_targets * len(TARGET_FIELDS) +
+        n_enemies * len(ENEMY_FIELDS)
+    )
+
+
+def _nearest(
+        position: np.ndarray,
+        points: np.ndarray,
+        present: np.ndarray,
+        k: int,
+        width: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The `k` points nearest to every position, wrapping around the
+    horizontal edges of the world.
+
+    :param position: positions, shape (K, A, 2) (np.ndarray)
+    :param points: points per world, shape (K, N, 2) (np.ndarray)
+    :param present: True for the points that exist, shape (K, N)
+     (np.ndarray)
+    :param k: number of points to find (int)
+    :param width: width of the world (float)
+    :return: offsets to the nearest points, shape (K, A, k, 2), True
+     where a point was found, shape (K, A, k), and the indices of the
+     points in `points`, shape (K, A, k)
+     (tuple[np.ndarray, np.ndarray, np.ndarray])
+    """
+    n_worlds, n = present.shape
+    if n < k:
+        points = np.concatenate(
+            (points, np.zeros((n_worlds, k - n, 2))),
+            axis=1
+        )
+        present = np.concatenate(
+            (present, np.zeros((n_worlds, k - n), dtype=bool)),
+            axis=1
+        )
+    delta = points[:, None, :, :] - position[:, :, None, :]
+    delta[..., 0] = (delta[..., 0] + width / 2) % width - width / 2
+    distance = np.where(
+        present[:, None, :],
+        np.hypot(delta[..., 0], delta[..., 1]),
+        np.inf
+    )
+    order = np.argsort(distance, axis=2, kind="stable")[..., :k]
+    found = np.isfinite(np.take_along_axis(distance, order, axis=2))
+    delta = np.take_along_axis(delta, order[..., None], axis=2)
+    delta[~found] = 0.0
+    return delta, found, order
+
+
+def observe(
+        engine: PhysicsEngine,
+        rows: np.ndarray,
+        targets: np.ndarray,
+        enemies: np.ndarray,
+        config: Config,
+        n_targets: int = 3,
+        n_enemies: int = 2
+    ) -> np.ndarray:
+    """
+    Observations of the agents at `rows` in K worlds that share
+    `engine`: per agent the fields of `OWN_FIELDS`, then
+    `TARGET_FIELDS` of the `n_targets` nearest targets and
+    `ENEMY_FIELDS` of the `n_enemies` nearest enemy aircraft, nearest
+    first. Positions are in screen sizes, offsets wrap around the
+    horizontal edges, velocities are in screen widths per second and
+    missing targets and enemies are all zeros. Agents that are gone
+    observe all zeros.
+
+    :param engine: physics engine of the worlds (PhysicsEngine)
+    :param rows: rows of the observing agents, shape (K, A) (np.ndarray)
+    :param targets: xy coords of the targets of every world, NaN for
+     missing ones, shape (K, T, 2) (np.ndarray)
+    :param enemies: rows of the enemy aircraft of every world, shape
+     (K, E) (np.ndarray)
+    :param config: configuration of the worlds (Config)
+    :param n_targets: nearest targets per observation (int)
+    :param n_enemies: nearest enemy aircraft per observation (int)
+    :return: observations, shape (K, A, `observation_size()`)
+     (np.ndarray)
+    """
+    window = config.WINDOW
+    width = config.SCREEN_WIDTH
+    speed_scale = config.PLANE_POS_SCALE / width
+    n_worlds, n_agents = rows.shape
+
+    position = engine.pos_virtual[rows]
+    pitch = np.radians(engine.pitch[rows])
+    own = np.concatenate(
+        (
+            position / window,
+            engine.v[rows] * speed_scale,
+            np.cos(pitch)[..., None],
+            np.sin(pitch)[..., None],
+            engine.orientation[rows][..., None],
+        ),
+        axis=2
+    )
+
+    delta, found, _ = _nearest(
+        position,
+        np.nan_to_num(targets),
+        ~np.isnan(targets[..., 0]),
+        n_targets,
+        width
+    )
+    seen_targets = np.concatenate(
+        (delta / window, found[..., None]),
+        axis=3
+    ).reshape(n_worlds, n_agents, -1)
+
+    enemy_v = engine.v[enemies] * speed_scale
+    delta, found, order = _nearest(
+        position,
+        engine.pos_virtual[enemies],
+        engine.active[enemies],
+        n_enemies,
+        width
+    )
+    if enemies.shape[1] < n_enemies:
+        enemy_v = np.concatenate(
+            (enemy_v, np.zeros((n_worlds, n_enemies - enemies.shape[1], 2))),
+            axis=1
+        )
+    velocity = enemy_v[np.arange(n_worlds)[:, None, None], order]
+    velocity[~found] = 0.0
+    seen_enemies = np.concatenate(
+        (delta / window, velocity, found[..., None]),
+        axis=3
+    ).reshape(n_worlds, n_agents, -1)
+
+    observations = np.concatenate((own, seen_targets, seen_enemies), axis=2)
+    observations[~engine.active[rows]] = 0.0
+    return observations
+
+
+def _targets(table: WorldTable, lanes: list[int] = None) -> np.ndarray:
+    """
+    :param table: table of the matches (WorldTable)
+    :param lanes: lanes of the matches, all if None (list[int])
+    :return: xy coords of the targets of every match, NaN where a
+     target is gone, shape (K, T, 2) (np.ndarray)
+    """
+    if lanes is None:
+        lanes = slice(None)
+    return np.where(
+        table.target_present[lanes][..., None],
+        table.target_coords[lanes],
+        np.nan
+    )
+
+
+class Environment:
+    """
+    One match as a reinforcement learning environment, see the module
+    docstring. Matches are always headless.
+
+    + config: (Config) configuration of every match
+    + team_descriptions: (list[dict]) teams of every match, the
+     learner team as a `ControlledTeam`
+    + learner: (int) number of the team flown by the actions
+    + n_agents: (int) number of agents of the learner team
+    + n_targets: (int) nearest targets per observation
+    + n_enemies: (int) nearest enemy aircraft per observation
+    + observation_size: (int) length of the observation of one agent
+    + world: (World) current match, None before `reset()`
+    """
+    def __init__(
+            self,
+            team_descriptions: list[dict] = None,
+            learner: int = 0,
+            seed: int = None,
+            n_targets: int = 3,
+            n_enemies: int = 2,
+            config: Config = None
+    ) -> None:
+        """
+        Initialiser of the Environment class
+
+        :param team_descriptions: teams of every match, see `World`,
+         TEAMS of the configuration if None (list[dict])
+        :param learner: number of the team flown by the actions (int)
+        :param seed: seed of the first match, every `reset()` without a
+         seed plays the next seed; unpredictable if None (int)
+        :param n_targets: nearest targets per observation (int)
+        :param n_enemies: nearest enemy aircraft per observation (int)
+        :param config: configuration of every match, the current
+         settings if None; USE_GUI is ignored (Config)
+        """
+        if config is None:
+            config = Config(USE_GUI=False)
+        elif config.USE_GUI:
+            config = config.replace(USE_GUI=False)
+        if team_descriptions is None:
+            team_descriptions = config.TEAMS
+
+        self.config = config
+        self.team_descriptions = [
+            {**description, "STRATEGY": ControlledTeam.__name__}
+            if team_number == learner else description
+            for team_number, description in enumerate(team_descriptions)
+        ]
+        self.learner = learner
+        self.n_agents = team_descriptions[learner]["N_AGENTS"]
+        self.n_targets = n_targets
+        self.n_enemies = n_enemies
+        self.observation_size = observation_size(n_targets, n_enemies)
+        self.world = None
+        self._seed = seed
+
+    def _next_seed(self, seed: int = None) -> int:
+        """
+        :param seed: seed to play, the next one if None (int)
+        :return: seed of the next match (int)
+        """
+        if seed is not None:
+            self._seed = seed
+        seed = self._seed
+        if self._seed is not None:
+            self._seed += 1
+        return seed
+
+    def _new_world(self, seed: int, engine: PhysicsEngine = None) -> World:
+        return World(
+            self.team_descriptions,
+            seed=seed,
+            config=self.config,
+            engine=engine
+        )
+
+    def _layout(self, world: World) -> tuple[list, np.ndarray, np.ndarray]:
+        """
+        :param world: match (World)
+        :return: the learner agents, their rows and the rows of the
+         aircraft of the other sides
+         (tuple[list[ControlledAgent], np.ndarray, np.ndarray])
+        """
+        agents = list(world.teams[self.learner].agents)
+        sides = world.team_table.sides
+        enemies = [
+            agent.index
+            for team in world.teams
+            if sides[team.number] != sides[self.learner]
+            for agent in team.agents
+        ]
+        return (
+            agents,
+            np.array([agent.index for agent in agents], dtype=np.intp),
+            np.array(enemies, dtype=np.intp)
+        )
+
+    def _done(self, world: World, rows: np.ndarray) -> bool:
+        """
+        :return: True once the match is over or every learner agent is
+         gone (bool)
+        """
+        return world.over or not world.engine.active[rows].any()
+
+    def reset(self, seed: int = None) -> np.ndarray:
+        """
+        Starts a new match.
+
+        :param seed: seed of the match, the next seed if None (int)
+        :return: observations, shape (agents, `observation_size`)
+         (np.ndarray)
+        """
+        self.world = self._new_world(self._next_seed(seed))
+        self._agents, self._rows, self._enemies = self._layout(self.world)
+        return self._observe()
+
+    def _observe(self) -> np.ndarray:
+        return observe(
+            self.world.engine,
+            self._rows[None],
+            _targets(self.world.table, [self.world.lane]),
+            self._enemies[None],
+            self.config,
+            self.n_targets,
+            self.n_enemies
+        )[0]
+
+    def step(self, actions: np.ndarray) -> tuple:
+        """
+        Flies the learner agents by `actions` for one tick and advances
+        the match. Actions of agents that are gone are ignored.
+
+        :param actions: one command per learner agent, see
+         `controlled_team.steer()`, shape (agents, 3) (np.ndarray)
+        :return: observations, shape (agents, `observation_size`),
+         rewards, shape (agents,), True once the match is done, and a
+         dict with the scores of all teams, which learner agents are
+         alive and the simulated time
+         (tuple[np.ndarray, np.ndarray, bool, dict])
+        """
+        world = self.world
+        actions = np.asarray(actions, dtype=float).reshape(
+            self.n_agents,
+            COMMAND_SIZE
+        )
+        for agent, command in zip(self._agents, actions):
+            agent.command = command
+
+        scores = world.team_table.scores
+        before = scores[self.learner]
+        world.step(self.config.DT)
+        reward = float(scores[self.learner] - before)
+
+        return (
+            self._observe(),
+            np.full(self.n_agents, reward),
+            self._done(world, self._rows),
+            {
+                "scores": scores.copy(),
+                "alive": world.engine.active[self._rows].copy(),
+                "time": world.time,
+            }
+        )
+
+
+class VectorEnvironment(Environment):
+    """
+    K matches played in lockstep, see the module docstring. Match k of
+    the first `reset()` plays seed `seed + k`, every reset after that
+    plays the next unplayed seed.
+
+    The matches share one physics engine, one bullet pool and one
+    `WorldTable` with a lane per match, so perception, collisions and
+    scoring run for all matches at once, with the code that steps a
+    single `World`.
+
+    + n_envs: (int) number of matches K
+    + engine: (PhysicsEngine) physics engine shared by all matches
+    + bullet_pool: (BulletPool) bullet pool shared by all matches
+    + table: (WorldTable) aircraft and targets of all matches
+    + worlds: (list[World]) current matches
+    """
+    def __init__(
+            self,
+            n_envs: int,
+            team_descriptions: list[dict] = None,
+            learner: int = 0,
+            seed: int = None,
+            n_targets: int = 3,
+            n_enemies: int = 2,
+            config: Config = None
+    ) -> None:
+        """
+        Initialiser of the VectorEnvironment class, see `Environment`.
+
+        :param n_envs: number of matches K (int)
+        """
+        super().__init__(
+            team_descriptions,
+            learner,
+            seed,
+            n_targets,
+            n_enemies,
+            config
+        )
+        config = self.config
+        self.n_envs = n_envs
+        sizes = [
+            description["N_AGENTS"]
+            for description in self.team_descriptions
+        ]
+        self.engine = PhysicsEngine(
+            config.SCREEN_RESOLUTION,
+            capacity=n_envs * sum(sizes),
+            config=config
+        )
+        self.bullet_pool = BulletPool(
+            config.GROUND["COLL_ELEVATION"],
+            config=config
+        )
+        self.worlds = [None] * n_envs
+        self.table = WorldTable(
+            n_envs,
+            sizes,
+            config.TARGET["TARGET_COUNT"],
+            self.engine,
+            self.bullet_pool,
+            config
+        )
+        self._agents = [None] * n_envs
+        self._rows = np.zeros((n_envs, self.n_agents), dtype=np.intp)
+        self._enemies = None
+
+    def _reset_world(self, k: int, seed: int = None) -> None:
+        """
+        Replaces match k by a new one, reusing the rows of its aircraft
+        in the shared engine.
+
+        :param k: number of the match (int)
+        :param seed: seed of the new match, the next seed if None (int)
+        :return: None
+        """
+        pool = self.bullet_pool
+        if self.worlds[k] is not None:
+            rows = self.table.rows[k]
+            pool.retire(np.flatnonzero(np.isin(pool.owner[:pool.count], rows)))
+            self.engine.release(rows.tolist())
+        world = World(
+            self.team_descriptions,
+            seed=self._next_seed(seed),
+            config=self.config,
+            engine=self.engine,
+            bullet_pool=pool,
+            table=self.table,
+            lane=k
+        )
+        self.worlds[k] = world
+        self._agents[k], self._rows[k], enemies = self._layout(world)
+        if self._enemies is None:
+            self._enemies = np.zeros(
+                (self.n_envs, len(enemies)),
+                dtype=np.intp
+            )
+        self._enemies[k] = enemies
+
+    def reset(self, seed: int = None) -> np.ndarray:
+        """
+        Starts K new matches.
+
+        :param seed: seed of the first match, the next seed if None (int)
+        :return: observations, shape (K, agents, `observation_size`)
+         (np.ndarray)
+        """
+        if seed is not None:
+            self._seed = seed
+        for k in range(self.n_envs):
+            self._reset_world(k)
+        return self._observe()
+
+    def _observe(self) -> np.ndarray:
+        return observe(
+            self.engine,
+            self._rows,
+            _targets(self.table),
+            self._enemies,
+            self.config,
+            self.n_targets,
+            self.n_enemies
+        )
+
+    def step(self, actions: np.ndarray) -> tuple:
+        """
+        Flies the learner agents of every match by `actions` for one
+        tick and advances all matches in lockstep. Matches that are
+        done are reset; their last observations are in the info.
+
+        :param actions: one command per learner agent per match, see
+         `controlled_team.steer()`, shape (K, agents, 3) (np.ndarray)
+        :return: observations, shape (K, agents, `observation_size`),
+         rewards, shape (K, agents), dones, shape (K,), and a dict with
+         the scores of all teams, shape (K, teams), which learner agents
+         are alive, shape (K, agents), the simulated time, shape (K,),
+         and the last observations of the matches that were reset
+         (tuple[np.ndarray, np.ndarray, np.ndarray, dict])
+        """
+        dt = self.config.DT
+        worlds = self.worlds
+        engine = self.engine
+        actions = np.asarray(actions, dtype=float).reshape(
+            self.n_envs,
+            self.n_agents,
+            COMMAND_SIZE
+        )
+        for agents, commands in zip(self._agents, actions):
+            for agent, command in zip(agents, commands):
+                agent.command = command
+        before = np.array([
+            world.team_table.scores[self.learner] for world in worlds
+        ])
+
+        live = np.array(
+            [k for k, world in enumerate(worlds) if world.begin_step()],
+            dtype=np.intp
+        )
+        for team_number in range(len(self.team_descriptions)):
+            if team_number != self.learner:
+                plans = self.table.plan(live, team_number, dt)
+            rows = self.table.rows[live][:, self.table.columns[team_number]]
+            engine.step(dt, rows[engine.active[rows]])
+            teams = [worlds[k].teams[team_number] for k in live.tolist()]
+            if team_number == self.learner:
+                agents = [agent for team in teams for agent in team.agents]
+                steer(agents, [agent.command for agent in agents], dt)
+            else:
+                for k, team, plan in zip(live.tolist(), teams, plans):
+                    worlds[k].act(team, plan, dt)
+        self.table.end_step(live, dt)
+
+        scores = np.array([world.team_table.scores for world in worlds])
+        rewards = np.repeat(
+            (scores[:, self.learner] - before)[:, None].astype(float),
+            self.n_agents,
+            axis=1
+        )
+        alive = engine.active[self._rows].copy()
+        dones = np.array([
+            self._done(world, rows) for world, rows in zip(worlds, self._rows)
+        ])
+        times = np.array([world.time for world in worlds])
+        observations = self._observe()
+        info = {
+            "scores": scores,
+            "alive": alive,
+            "time": times,
+            "final_observations": observations[dones].copy(),
+        }
+        if dones.any():
+            for k in np.flatnonzero(dones):
+                self._reset_world(k)
+            observations = self._observe()
+        return observations, rewards, dones, info
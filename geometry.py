@@ -0,0 +1,72 @@
+import math
+
+
+class Box:
+    """
+    Axis-aligned box used for simulation geometry. Mirrors the parts of
+    `pygame.Rect` the simulation needs, without depending on pygame, and
+    keeps float coordinates.
+
+    + x: (float) left side
+    + y: (float) top side
+    + w: (float) width
+    + h: (float) height
+    """
+    __slots__ = ("x", "y", "w", "h")
+
+    def __init__(self, x: float, y: float, w: float, h: float) -> None:
+        """
+        Initialiser of the Box class
+
+        :param x: left side (float)
+        :param y: top side (float)
+        :param w: width (float)
+        :param h: height (float)
+        """
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+
+    @property
+    def center(self) -> tuple[float, float]:
+        return (self.x + self.w / 2, self.y + self.h / 2)
+
+    @property
+    def bottom(self) -> float:
+        return self.y + self.h
+
+    def colliderect(self, other: "Box") -> bool:
+        """
+        Returns True if this box and `other` overlap, using the same
+        half-open edges as `pygame.Rect.colliderect`.
+
+        :param other: box to test against (Box)
+        :return: bool
+        """
+        return (
+            self.x < other.x + other.w and other.x < self.x + self.w and
+            self.y < other.y + other.h and other.y < self.y + self.h
+        )
+
+
+def rotated_size(
+        size: tuple[float, float],
+        angle: float
+    ) -> tuple[float, float]:
+    """
+    Returns the size of the bounding box of a `size` rectangle rotated
+    by `angle` degrees, which is what `pygame.transform.rotate` would
+    produce for a sprite of that size.
+
+    :param size: (width, height) of the unrotated rectangle
+     (tuple[float, float])
+    :param angle: rotation in degrees (float)
+    :return: (width, height) of the bounding box (tuple[float, float])
+    """
+    rad = math.radians(angle)
+    cos, sin = abs(math.cos(rad)), abs(math.sin(rad))
+    return (
+        size[0] * cos + size[1] * sin,
+        size[0] * sin + size[1] * cos
+    )
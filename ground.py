@@ -1,5 +1,7 @@
 import pygame
 
+import assets
+
 
 class Ground:
     """
@@ -31,10 +33,7 @@ class Ground:
         """
         self.sprite = None
         if sprite:
-            self.sprite = pygame.transform.scale(
-                pygame.image.load(sprite), 
-                (resolution[0], height)
-            )
+            self.sprite = assets.load(sprite, (resolution[0], height))
         self.elevation = elevation
         self.coll_elevation = coll_elevation
 
@@ -1,214 +1,104 @@
+import os
 import time
-from itertools import chain
 import pygame
-import numpy as np
-import settings
-
-from absolute_distance_team import AbsoluteDistanceTeam
-from energy_bidding_team import EnergyBiddingTeam
-from two_targets_distance_team import TwoTargetsTeam
-from target import Target
-import ground
-import utils
-import copy
-
-start = time.time()
-
-screen, font = None, None
-if settings.USE_GUI:
-    pygame.init()
-    screen = pygame.display.set_mode(
-        size=settings.SCREEN_RESOLUTION,
-        flags=pygame.SRCALPHA
-    )
-    font = pygame.font.SysFont(None, 24)
-
-total_scores = [0, 0]
-
-for _ in range(settings.BATCH_SIZE):
-    if settings.USE_GUI:
-        clock = pygame.time.Clock()
-        dt = 0
-    else:
-        dt = 1 / 60
-    running = True
-    total_time = 0
-    fov_radius = 150
-
-    plane_1_data = settings.PLANE_I_16_FALANGIST
-    plane_2_data = settings.PLANE_I_16_REPUBLICAN
-
-    floor = ground.Ground(
-        height=settings.GROUND["HEIGHT"],
-        elevation=settings.GROUND["ELEVATION"],
-        coll_elevation=settings.GROUND["COLL_ELEVATION"],
-    )
-    if settings.USE_GUI:
-        floor = ground.Ground(
-            height=settings.GROUND["HEIGHT"], 
-            elevation=settings.GROUND["ELEVATION"],
-            coll_elevation=settings.GROUND["COLL_ELEVATION"],
-            sprite=settings.GROUND["SPRITE"],
-            resolution=settings.SCREEN_RESOLUTION
-        )
+import assets
+
+from config import Config
+from world import World
+from replay import Replay
+from profiler import Profiler
+from renderer import Renderer
+import batch_runner
+
+
+def run_gui(
+        screen: pygame.Surface,
+        config: Config,
+        profiler: Profiler = None
+    ) -> None:
+    """
+    Runs `config.BATCH_SIZE` matches one after another in the pygame
+    window. The simulation advances in fixed steps of `config.DT`
+    seconds, `config.FAST_FORWARD` simulated seconds per real second,
+    independent of the frame rate; frames are drawn in between two
+    steps. The up and down arrow keys double or halve the speed.
+
+    :param screen: pygame window (pygame.Surface)
+    :param config: configuration of the matches (Config)
+    :param profiler: profiler the ticks of every match are added to,
+     nothing is timed if None (Profiler)
+    :return: None
+    """
+    dt = config.DT
+    speed = config.FAST_FORWARD
+    trace_dir = config.PROFILE_TRACE_DIR
+    for i in range(config.BATCH_SIZE):
+        match_profiler = None
+        if profiler is not None:
+            match_profiler = Profiler(
+                trace_capacity=1 << 16 if trace_dir else 0
+            )
+        world = World(profiler=match_profiler, config=config)
+        floor = world.floor
 
         pygame.mixer.music.load("assets/Arise, Great Country!.mp3")
         pygame.mixer.music.play(-1)
         flip = pygame.mixer.Sound(
             "assets/Flip de beer intro-[AudioTrimmer.com].mp3"
         )
-        background = pygame.image.load("assets/background.png")
-        background = pygame.transform.scale(
-            background,
-            settings.SCREEN_RESOLUTION
-        )
-
-    targets = []
-
-    targets = utils.create_targets(targets, floor.coll_elevation)
-    targetscoords = np.array([target.coords for target in targets])
+        renderer = Renderer(screen, world)
 
-    team1 = AbsoluteDistanceTeam(
-        copy.deepcopy(targetscoords),
-        2, 
-        settings.PLANE_I_16_REPUBLICAN,
-        0
-    )
-
-    team2 = AbsoluteDistanceTeam(
-        copy.deepcopy(targetscoords),
-        1,
-        settings.PLANE_I_16_FALANGIST,
-        1
-    )
-
-    teams = [team1, team2]
-
-    agents_all = list(chain(*[team.agents for team in teams]))
-
-    while running and total_time <= settings.SIMULATION_RUNTIME:
-        if len(targets) == 0 or len(agents_all) == 0:
-            running = False
-  
-        if settings.USE_GUI:
+        clock = pygame.time.Clock()
+        accumulator = 0.0
+        while world.running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    running = False
-                
-            screen.fill("white")
-        
-        for team in teams:
-            fov_list = [
-                utils.check_surround(
-                    agent, 
-                    targets, 
-                    agents_all, 
-                    fov_radius
-                ) for agent in team.agents
-            ]
-
-            team.assign_targets()
-            team.calculate_score()
-            for x, agent in enumerate(team.agents):
-                agent_target = Target(
-                    floor.coll_elevation,
-                    settings.TARGET["SPRITE"]
-                )
-                agent_target.coords = np.array(agent.target)
-                if agent.target is not None:
-                    if utils.check_surround(
-                        agent, 
-                        [agent_target], 
-                        [], 
-                        fov_radius
-                    ) != []:
-                        if np.append(
-                            agent.target, 
-                            1
-                        ).tolist() not in utils.check_surround(
-                            agent, 
-                            targets, 
-                            [], 
-                            fov_radius
-                        ):
-                            indices_to_remove = np.where(
-                                np.all(
-                                    team.targets == agent.target, 
-                                    axis=1
-                                )
-                            )
-                            team.targets = np.delete(
-                                team.targets, 
-                                indices_to_remove, 
-                                axis=0
-                            )
-                agent.tick(dt, np.array(fov_list[x]))
-
-        if settings.COLLISION:
-            utils.hit_detection_agents(agents_all)
-        dead_agents = []
-
-        for team in teams:
-            for agent in team.agents:
-                dead_agents.append(utils.hit_detection_and_move_projectiles(
-                        targets,
-                        agents_all,
-                        agent,
-                        dt
-                    )
-                )
-
-                if settings.COLLISION:
-                    if agent.rot_rect.bottom >= floor.coll_elevation or \
-                            utils.hit_collision_agents(targets, agent):
-                        team.agents.remove(agent)
-
-        if settings.USE_GUI:
-            screen.blit(background, (0, 0))
-            
-            for team in teams:
-                for agent in team.agents:
-                    screen.blit(agent.rot_sprite, agent.rot_rect)
-            screen.blit(floor.sprite, [0, floor.elevation])
-
-            utils.display_targets(targets, screen)
-            for team in teams:
-                utils.display_projectiles(team.agents, screen)
-                for agent in team.agents:
-                    screen.blit(agent.rot_sprite, agent.rot_rect)
-            screen.blit(floor.sprite, [0, floor.elevation])
-
-            utils.display_targets(targets, screen)
-            for team in teams:
-                utils.display_projectiles(team.agents, screen)    
-            for team in teams:
-                team.agents = [
-                    agent for agent in team.agents if agent not in dead_agents
-                ]
-                # Update display with current information
-            pygame.display.flip()
-
-        if settings.USE_GUI:
-            dt = clock.tick(settings.FPS) / 1000
-
-        total_time += dt
-
-    if settings.USE_GUI:
+                    world.running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_UP:
+                        speed *= 2
+                    elif event.key == pygame.K_DOWN:
+                        speed /= 2
+
+            # a slow frame is not caught up on, the match slows down
+            # instead
+            frame_time = min(
+                clock.tick(config.FPS) / 1000,
+                config.MAX_FRAME_TIME
+            )
+            accumulator += frame_time * speed
+            while accumulator >= dt and world.running:
+                renderer.snapshot()
+                world.step(dt)
+                accumulator -= dt
+
+            with world.profiler.phase("render"):
+                renderer.draw(min(accumulator / dt, 1.0))
+
+        if match_profiler is not None:
+            if trace_dir:
+                os.makedirs(trace_dir, exist_ok=True)
+                match_profiler.export_trace(os.path.join(
+                    trace_dir,
+                    f"trace_gui_{i}.json"
+                ), pid=i)
+            profiler.merge(match_profiler)
+
         screen.fill((255, 255, 255))
-        gameover = pygame.image.load(settings.END_SCREEN["GAMEOVER"])
+        gameover = assets.load(config.END_SCREEN["GAMEOVER"])
         r = gameover.get_rect()
         r.centerx = screen.get_width() / 2
         r.centery = screen.get_height() / 2
         screen.blit(gameover, r)
 
-        explosion = pygame.transform.scale(
-            pygame.image.load(settings.END_SCREEN["EXPLOSION"]),
-            settings.END_SCREEN["EXPLOSION_SIZE"]
+        explosion = assets.load(
+            config.END_SCREEN["EXPLOSION"],
+            config.END_SCREEN["EXPLOSION_SIZE"]
         )
         explosion_rect = explosion.get_rect()
 
-        explosion_rect.centerx = settings.SCREEN_RESOLUTION[0] / 2
-        explosion_rect.centery = settings.SCREEN_RESOLUTION[1] / 2
+        explosion_rect.centerx = config.SCREEN_RESOLUTION[0] / 2
+        explosion_rect.centery = config.SCREEN_RESOLUTION[1] / 2
 
         screen.blit(explosion, explosion_rect)
         screen.blit(source=floor.sprite, dest=[0, floor.elevation])
@@ -218,25 +108,115 @@ for _ in range(settings.BATCH_SIZE):
 
         # Let the user enjoy the gameover screen for 2 seconds
         pygame.time.wait(2000)
+
+
+def run_replay(screen: pygame.Surface, replay: Replay) -> None:
+    """
+    Plays back a recorded match in the pygame window at the tick rate
+    it was recorded at. Space pauses, the left and right arrow keys
+    jump five seconds back or ahead.
+
+    :param screen: pygame window (pygame.Surface)
+    :param replay: replay to play back (Replay)
+    :return: None
+    """
+    tick_rate = replay.header["display"]["tick_rate"]
+    clock = pygame.time.Clock()
+    jump = 5 * tick_rate
+    tick, paused, running = 0, False, True
+
+    while running and tick < len(replay):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_LEFT:
+                    tick = max(tick - jump, 0)
+                elif event.key == pygame.K_RIGHT:
+                    tick = min(tick + jump, len(replay) - 1)
+
+        replay.draw(screen, tick)
+        pygame.display.flip()
+
+        if not paused:
+            tick += 1
+        clock.tick(tick_rate)
+
+
+def run_headless(config: Config, profiler: Profiler = None) -> list[int]:
+    """
+    Runs `config.BATCH_SIZE` headless matches over `config.WORKERS`
+    worker processes, printing every match as it finishes.
+
+    :param config: configuration of the matches (Config)
+    :param profiler: profiler the ticks of every match are added to,
+     nothing is timed if None (Profiler)
+    :return: total score per team (list[int])
+    """
+    total_scores = [0] * len(config.TEAMS)
+    for result in batch_runner.run_batch(
+        config.BATCH_SIZE,
+        config.WORKERS,
+        config.SEED,
+        replay_dir=config.REPLAY_DIR,
+        profile=profiler is not None,
+        trace_dir=config.PROFILE_TRACE_DIR,
+        config=config
+    ):
+        if profiler is not None:
+            profiler.merge(result["profile"])
+        for i, score in enumerate(result["scores"]):
+            total_scores[i] += score
+        for summary in result["summary"]:
+            print(summary)
+    return total_scores
+
+
+def main() -> None:
+    start = time.time()
+    config = Config()
+
+    if config.PLAY_REPLAY:
+        replay = Replay(config.PLAY_REPLAY)
+        pygame.init()
+        screen = pygame.display.set_mode(
+            replay.header["display"]["screen_resolution"]
+        )
+        run_replay(screen, replay)
+        pygame.quit()
+        return
+
+    profiler = Profiler() if config.PROFILE else None
+    total_scores = [0] * len(config.TEAMS)
+    if config.USE_GUI:
+        pygame.init()
+        screen = pygame.display.set_mode(
+            size=config.SCREEN_RESOLUTION,
+            flags=pygame.SRCALPHA
+        )
+        assets.preload(config)
+        run_gui(screen, config, profiler)
     else:
-        for i, team in enumerate(teams):
-            total_scores[i] += team.score
-            print(team)
-print(teams[0].__class__.__name__) 
-print(f"\tThe first team scored {total_scores[0]} points \
-over {settings.BATCH_SIZE} runs\n\tOn average they scored \
-{total_scores[0] / settings.BATCH_SIZE} points per run\n"
-)
-
-print(teams[1].__class__.__name__)    
-print(f"\tThe first team scored {total_scores[1]} points \
-over {settings.BATCH_SIZE} runs\n\tOn average they scored \
-{total_scores[1] / settings.BATCH_SIZE} points per run\n"
-)
-
-print(f"{total_scores[0] / settings.BATCH_SIZE}/\
-{total_scores[1] / settings.BATCH_SIZE}"
-)
-pygame.quit()
-
-print(f"The program took {round(time.time()-start, 2)} seconds to run.")
+        total_scores = run_headless(config, profiler)
+
+    for i, description in enumerate(config.TEAMS):
+        print(description["STRATEGY"])
+        print(f"\tTeam {i + 1} scored {total_scores[i]} points \
+over {config.BATCH_SIZE} runs\n\tOn average they scored \
+{total_scores[i] / config.BATCH_SIZE} points per run\n"
+        )
+
+    print("/".join(
+        f"{score / config.BATCH_SIZE}" for score in total_scores
+    ))
+    pygame.quit()
+
+    if profiler is not None:
+        print(profiler.report())
+    print(f"The program took {round(time.time()-start, 2)} seconds to run.")
+
+
+if __name__ == "__main__":
+    main()
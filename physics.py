@@ -0,0 +1,369 @@
+import heapq
+import math
+import numpy as np
+
+from config import Config
+
+
+class PhysicsEngine:
+    """
+    Structure-of-arrays flight physics engine.
+
+    Keeps the state of every registered aircraft in contiguous arrays
+    (one row per aircraft) and advances all of them in one vectorized
+    step. `Aircraft` objects hold an index into this store and read and
+    write their state through it.
+
+    + window_dimensions: (np.ndarray) dimensions of window
+    + pos_scale: (float) real to screen position scale
+    + size: (int) number of rows in use or released
+    + capacity: (int) number of allocated rows
+    + active: (np.ndarray) true for rows that are stepped by `step()`
+    + mass: (np.ndarray) mass per aircraft (Kg)
+    + engine_force: (np.ndarray) engine force per aircraft (N)
+    + agility: (np.ndarray) agility per aircraft (°/s)
+    + const_drag: (np.ndarray) drag constant per aircraft
+    + const_lift: (np.ndarray) lift constant per aircraft
+    + AoA_crit_low: (np.ndarray) negative critical angle of attack
+     and its lift coefficient per aircraft, shape (n, 2)
+    + AoA_crit_high: (np.ndarray) positive critical angle of attack
+     and its lift coefficient per aircraft, shape (n, 2)
+    + cl0: (np.ndarray) lift coefficient at AoA == 0 per aircraft
+    + cd_min: (np.ndarray) drag coefficient at AoA == 0 per aircraft
+    + throttle: (np.ndarray) throttle per aircraft
+    + pitch: (np.ndarray) pitch per aircraft in degrees
+    + orientation: (np.ndarray) direction of lift vector per aircraft
+    + v: (np.ndarray) velocity vectors, shape (n, 2)
+    + pos_real: (np.ndarray) positions in m, shape (n, 2)
+    + pos_virtual: (np.ndarray) positions on screen, shape (n, 2)
+    + center: (np.ndarray) on-screen centre as of the previous tick,
+     shape (n, 2)
+    + AoA_deg: (np.ndarray) angle of attack per aircraft in degrees
+    + clock: (np.ndarray) simulated time per aircraft since it was
+     added (s), drives all timers so results do not depend on how fast
+     the simulation runs
+    + team: (np.ndarray) team number per aircraft
+    + pitch_uv: (np.ndarray) pitch unit vectors, shape (n, 2)
+    + v_uv: (np.ndarray) velocity unit vectors, shape (n, 2)
+    + f_gravity: (np.ndarray) gravity force vectors, shape (n, 2)
+    + f_engine: (np.ndarray) engine force vectors, shape (n, 2)
+    + f_drag: (np.ndarray) drag force vectors, shape (n, 2)
+    + f_lift: (np.ndarray) lift force vectors, shape (n, 2)
+    """
+    SCALARS = {
+        "mass": np.float64,
+        "engine_force": np.float64,
+        "agility": np.float64,
+        "const_drag": np.float64,
+        "const_lift": np.float64,
+        "cl0": np.float64,
+        "cd_min": np.float64,
+        "throttle": np.float64,
+        "pitch": np.float64,
+        "orientation": np.int64,
+        "AoA_deg": np.float64,
+        "clock": np.float64,
+        "team": np.int64,
+        "active": np.bool_,
+    }
+    VECTORS = (
+        "AoA_crit_low",
+        "AoA_crit_high",
+        "v",
+        "pos_real",
+        "pos_virtual",
+        "center",
+        "pitch_uv",
+        "v_uv",
+        "f_gravity",
+        "f_engine",
+        "f_drag",
+        "f_lift",
+    )
+
+    def __init__(
+        self,
+        window_dimensions: tuple[int, int],
+        capacity: int = 16,
+        config: Config = None
+    ) -> None:
+        """
+        Initialiser for PhysicsEngine
+
+        :param window_dimensions: dimensions of pygame window
+         (tuple[int, int])
+        :param capacity: number of rows to preallocate (int)
+        :param config: configuration, the current settings if None
+         (Config)
+        """
+        if config is None:
+            config = Config()
+        self.window_dimensions = np.array(window_dimensions, dtype=float)
+        self.pos_scale = config.PLANE_POS_SCALE
+        self.size = 0
+        self.capacity = max(1, capacity)
+        self._released = []
+
+        for name, dtype in self.SCALARS.items():
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+        for name in self.VECTORS:
+            setattr(self, name, np.zeros((self.capacity, 2)))
+
+    def _grow(self) -> None:
+        """
+        Doubles the capacity of every array in the store.
+
+        :return: None
+        """
+        self.capacity *= 2
+        for name in list(self.SCALARS) + list(self.VECTORS):
+            old = getattr(self, name)
+            new = np.zeros((self.capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(
+        self,
+        mass: float,
+        engine_force: float,
+        agility: float,
+        c_drag: float,
+        c_lift: float,
+        AoA_crit_low: tuple[float, float],
+        AoA_crit_high: tuple[float, float],
+        cl0: float,
+        cd_min: float,
+        init_throttle: float,
+        init_pitch: float,
+        init_v: tuple[float, float],
+        init_pos: tuple[float, float],
+        team: int = 0
+    ) -> int:
+        """
+        Registers a new aircraft and returns its row index.
+
+        :param mass: mass of aircraft in Kilogram (Kg) (float)
+        :param engine_force: engine force in Newton (N) (float)
+        :param agility: pitch rate in degrees per second (°/s) (float)
+        :param c_drag: drag constant (float)
+        :param c_lift: lift constant (float)
+        :param AoA_crit_low: negative critical angle of attack and its
+         lift coefficient (tuple[float, float])
+        :param AoA_crit_high: positive critical angle of attack and its
+         lift coefficient (tuple[float, float])
+        :param cl0: lift coefficient at AoA == 0 (float)
+        :param cd_min: drag coefficient at AoA == 0 (float)
+        :param init_throttle: throttle at spawn (%) (float)
+        :param init_pitch: pitch at spawn (°) (float)
+        :param init_v: velocity vector at spawn (tuple[float, float])
+        :param init_pos: real spawn location (tuple[float, float])
+        :param team: team number of the aircraft (int)
+        :return: row index of the aircraft (int)
+        """
+        if self._released:
+            i = heapq.heappop(self._released)
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            i = self.size
+            self.size += 1
+
+        self.mass[i] = mass
+        self.engine_force[i] = engine_force
+        self.agility[i] = agility
+        self.const_drag[i] = c_drag
+        self.const_lift[i] = c_lift
+        self.AoA_crit_low[i] = AoA_crit_low
+        self.AoA_crit_high[i] = AoA_crit_high
+        self.cl0[i] = cl0
+        self.cd_min[i] = cd_min
+
+        self.throttle[i] = init_throttle
+        self.pitch[i] = init_pitch
+        self.orientation[i] = 1
+        self.v[i] = init_v
+        self.pos_real[i] = init_pos
+        self.active[i] = True
+
+        self.pos_virtual[i] = (
+            self.pos_real[i] *
+            self.pos_scale %
+            self.window_dimensions
+        )
+        self.center[i] = init_pos
+        self.AoA_deg[i] = 0
+        self.clock[i] = 0.0
+        self.team[i] = team
+        self.pitch_uv[i] = 0.0
+        self.v_uv[i] = 0.0
+        self.f_gravity[i] = (0.0, 9.81 * mass)
+        self.f_engine[i] = 0.0
+        self.f_drag[i] = 0.0
+        self.f_lift[i] = 0.0
+        return i
+
+    def remove(self, index: int) -> None:
+        """
+        Stops stepping the aircraft at `index`. Its state is kept so
+        views into the store stay valid.
+
+        :param index: row index of the aircraft (int)
+        :return: None
+        """
+        self.active[index] = False
+
+    def release(self, indices) -> None:
+        """
+        Removes the aircraft at `indices` for good: `add()` reuses their
+        rows, lowest first, so views into them must no longer be used.
+
+        :param indices: row indices of the aircraft (Iterable[int])
+        :return: None
+        """
+        for index in indices:
+            self.active[index] = False
+            heapq.heappush(self._released, int(index))
+
+    def lift_curve(self, AoA: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        Vectorized lift curve based on critical angles and cl0
+
+        :param AoA: angle of attack per row (np.ndarray)
+        :param rows: row indices matching `AoA` (np.ndarray)
+        :return: lift coefficient per row (np.ndarray)
+        """
+        low_a, low_c = self.AoA_crit_low[rows, 0], self.AoA_crit_low[rows, 1]
+        high_a = self.AoA_crit_high[rows, 0]
+        high_c = self.AoA_crit_high[rows, 1]
+        cl0 = self.cl0[rows]
+
+        return np.select(
+            [
+                AoA < low_a - 1,
+                AoA < low_a,
+                AoA < 0.0,
+                AoA < high_a,
+                AoA < high_a + 1,
+            ],
+            [
+                0.0,
+                low_c * np.abs(low_a - 1 - AoA),
+                cl0 - (cl0 - low_c) * (AoA / low_a),
+                cl0 + (high_c - cl0) * (AoA / high_a),
+                high_c * np.abs(high_a - 1 - AoA),
+            ],
+            0.0
+        )
+
+    def step(self, dt: float, indices=None) -> None:
+        """
+        Advances the selected aircraft over the given time interval.
+
+        :param dt: time since last frame (s) (float)
+        :param indices: row indices to step, all active rows if None
+         (Iterable[int])
+        :return: None
+        """
+        if indices is None:
+            rows = np.flatnonzero(self.active[:self.size])
+        else:
+            rows = np.asarray(indices, dtype=np.intp).reshape(-1)
+        if len(rows) == 0:
+            return
+
+        pitch = self.pitch[rows]
+        v = self.v[rows]
+
+        # pitch unit vector
+        pitch_rad = -math.pi / 180 * pitch
+        pitch_uv = np.stack((np.cos(pitch_rad), np.sin(pitch_rad)), axis=1)
+
+        # velocity unit vector (kept as-is when standing still)
+        speed = np.sqrt(v[:, 0] ** 2 + v[:, 1] ** 2)
+        moving = speed != 0
+        v_uv = self.v_uv[rows]
+        v_uv[moving] = v[moving] / speed[moving, None]
+
+        # angle of attack
+        AoA_deg = (
+            np.arctan2(pitch_uv[:, 0], pitch_uv[:, 1]) -
+            np.arctan2(v[:, 0], v[:, 1])
+        ) * 180 / math.pi
+        AoA_deg[AoA_deg > 180] -= 360
+        AoA_deg[AoA_deg < -180] += 360
+
+        # engine force vector
+        f_engine = (
+            (self.throttle[rows] * 0.1 * self.engine_force[rows])[:, None] *
+            pitch_uv
+        )
+
+        # lift force vector
+        orientation = self.orientation[rows]
+        coef_lift = self.lift_curve(orientation * AoA_deg, rows)
+        norm_lift = self.const_lift[rows] * coef_lift * speed**2 * orientation
+        f_lift = np.stack(
+            (norm_lift * v_uv[:, 1], norm_lift * -v_uv[:, 0]),
+            axis=1
+        )
+
+        # drag force vector
+        coef_drag = (AoA_deg / math.sqrt(40))**2 + self.cd_min[rows]
+        norm_drag = self.const_drag[rows] * coef_drag * speed**2
+        f_drag = -norm_drag[:, None] * v_uv
+
+        # resulting force vector, update velocity & position
+        f_res = f_engine + self.f_gravity[rows] + f_drag + f_lift
+        v = v + dt * f_res / self.mass[rows, None]
+        pos_real = self.pos_real[rows] + v * dt
+
+        # induced torque (close enough)
+        stall_low = AoA_deg < self.AoA_crit_low[rows, 0]
+        stall_high = AoA_deg > self.AoA_crit_high[rows, 0]
+        torque = np.where(stall_low, 1.0, -1.0) * norm_drag * 0.0001 * dt
+        turning = stall_low | stall_high
+        pitch[turning] = (
+            pitch[turning] + self.agility[rows][turning] * torque[turning]
+        ) % 360
+
+        self.pitch_uv[rows] = pitch_uv
+        self.v_uv[rows] = v_uv
+        self.AoA_deg[rows] = AoA_deg
+        self.f_engine[rows] = f_engine
+        self.f_lift[rows] = f_lift
+        self.f_drag[rows] = f_drag
+        self.v[rows] = v
+        self.pos_real[rows] = pos_real
+        self.pitch[rows] = pitch
+        self.clock[rows] += dt
+        self.center[rows] = self.pos_virtual[rows]
+        self.pos_virtual[rows] = (
+            pos_real *
+            self.pos_scale %
+            self.window_dimensions
+        )
+
+
+class EngineField:
+    """
+    Descriptor exposing one row of a `PhysicsEngine` array as an
+    attribute of the owning object. The owner must have `engine` and
+    `index` attributes.
+
+    + name: (str) name of the array in the engine
+    """
+    def __init__(self, name: str) -> None:
+        """
+        Initialiser for EngineField
+
+        :param name: name of the array in the engine (str)
+        """
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return getattr(obj.engine, self.name)[obj.index]
+
+    def __set__(self, obj, value) -> None:
+        getattr(obj.engine, self.name)[obj.index] = value
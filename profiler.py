@@ -0,0 +1,294 @@
+import json
+import time
+import numpy as np
+
+
+class _Phase:
+    """
+    Context manager timing one phase for a `Profiler`, see
+    `Profiler.phase()`. Not re-entrant.
+    """
+    __slots__ = ("profiler", "id", "start")
+
+    def __init__(self, profiler: "Profiler", id: int) -> None:
+        self.profiler = profiler
+        self.id = id
+        self.start = 0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc) -> None:
+        self.profiler._record(self.id, self.start, time.perf_counter_ns())
+
+
+class Profiler:
+    """
+    Collects how long every phase of the simulation loop takes. Time
+    and calls are summed per phase over a tick; the sums of the most
+    recent `capacity` ticks are kept in ring buffers. Optionally every
+    single call is kept as well, for `export_trace()`.
+
+    + enabled: (bool) True, False for `NullProfiler`
+    + capacity: (int) number of ticks kept per phase
+    + names: (list[str]) phase names, in order of first use
+    + ticks: (int) number of finished ticks
+    + tick_time: (list[np.ndarray]) time per tick per phase (ns)
+    + tick_calls: (list[np.ndarray]) calls per tick per phase
+    + total_time: (list[int]) time per phase over all ticks (ns)
+    + total_calls: (list[int]) calls per phase over all ticks
+    + trace_capacity: (int) number of calls kept for the trace
+    + n_events: (int) number of calls recorded for the trace
+    """
+    enabled = True
+
+    def __init__(
+            self,
+            capacity: int = 4096,
+            trace_capacity: int = 0
+    ) -> None:
+        """
+        Initialiser of the Profiler class
+
+        :param capacity: number of ticks kept per phase (int)
+        :param trace_capacity: number of calls kept for
+         `export_trace()`, the most recent ones; no trace if 0 (int)
+        """
+        self.capacity = capacity
+        self.names = []
+        self._ids = {}
+        self._phases = []
+        self.ticks = 0
+        self.tick_time = []
+        self.tick_calls = []
+        self.total_time = []
+        self.total_calls = []
+        self._time = []
+        self._calls = []
+        self._open = False
+
+        self.trace_capacity = trace_capacity
+        self.n_events = 0
+        self._origin = time.perf_counter_ns()
+        self._event_phase = np.zeros(trace_capacity, dtype=np.int32)
+        self._event_start = np.zeros(trace_capacity, dtype=np.int64)
+        self._event_duration = np.zeros(trace_capacity, dtype=np.int64)
+
+    def phase(self, name: str) -> _Phase:
+        """
+        Returns a context manager that times the code inside it as
+        phase `name`:
+
+            with profiler.phase("physics"):
+                engine.step(dt)
+
+        :param name: name of the phase (str)
+        :return: context manager (_Phase)
+        """
+        id = self._ids.get(name)
+        if id is None:
+            id = self._ids[name] = len(self.names)
+            self.names.append(name)
+            self._phases.append(_Phase(self, id))
+            self.tick_time.append(np.zeros(self.capacity, dtype=np.int64))
+            self.tick_calls.append(np.zeros(self.capacity, dtype=np.int32))
+            self.total_time.append(0)
+            self.total_calls.append(0)
+            self._time.append(0)
+            self._calls.append(0)
+        return self._phases[id]
+
+    def _record(self, id: int, start: int, end: int) -> None:
+        self._open = True
+        self._time[id] += end - start
+        self._calls[id] += 1
+        if self.trace_capacity:
+            i = self.n_events % self.trace_capacity
+            self._event_phase[i] = id
+            self._event_start[i] = start - self._origin
+            self._event_duration[i] = end - start
+            self.n_events += 1
+
+    def tick(self) -> None:
+        """
+        Ends the current tick, if anything was timed in it, and starts
+        the next. Call once per iteration of the simulation loop.
+
+        :return: None
+        """
+        if not self._open:
+            return
+        row = self.ticks % self.capacity
+        for id in range(len(self.names)):
+            self.tick_time[id][row] = self._time[id]
+            self.tick_calls[id][row] = self._calls[id]
+            self.total_time[id] += self._time[id]
+            self.total_calls[id] += self._calls[id]
+            self._time[id] = 0
+            self._calls[id] = 0
+        self.ticks += 1
+        self._open = False
+
+    def samples(self, name: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the time and calls of phase `name` for every tick that
+        is still in the ring buffer, oldest first.
+
+        :param name: name of the phase (str)
+        :return: time (ns) and calls per tick
+         (tuple[np.ndarray, np.ndarray])
+        """
+        self.tick()
+        id = self._ids[name]
+        n = min(self.ticks, self.capacity)
+        order = (np.arange(self.ticks - n, self.ticks)) % self.capacity
+        return self.tick_time[id][order], self.tick_calls[id][order]
+
+    def merge(self, other: "Profiler") -> None:
+        """
+        Adds the ticks of `other`, for example a match that ran in
+        another process, to this profiler. The trace is not merged.
+
+        :param other: profiler to add (Profiler)
+        :return: None
+        """
+        self.tick()
+        for name in other.names:
+            self.phase(name)
+        samples = {name: other.samples(name) for name in other.names}
+        n = min(other.ticks, other.capacity)
+        rows = np.arange(self.ticks, self.ticks + n) % self.capacity
+        for id, name in enumerate(self.names):
+            time_ns, calls = samples.get(name, (0, 0))
+            self.tick_time[id][rows] = time_ns
+            self.tick_calls[id][rows] = calls
+        self.ticks += n
+        for id, name in enumerate(other.names):
+            own = self._ids[name]
+            self.total_time[own] += other.total_time[id]
+            self.total_calls[own] += other.total_calls[id]
+
+    def summary(self, percentiles: tuple = (50, 90, 99)) -> dict:
+        """
+        Statistics of the time per tick of every phase, over the ticks
+        in the ring buffer. Times are in milliseconds.
+
+        :param percentiles: percentiles to compute (tuple[float])
+        :return: per phase name a dict with p<percentile>, max, mean,
+         calls (mean per tick) and share (of the total time over all
+         ticks) (dict)
+        """
+        self.tick()
+        total = sum(self.total_time) or 1
+        summary = {}
+        for id, name in enumerate(self.names):
+            time_ns, calls = self.samples(name)
+            if len(time_ns) == 0:
+                continue
+            ms = time_ns / 1e6
+            values = np.percentile(ms, percentiles)
+            stats = {
+                f"p{p:g}": float(value)
+                for p, value in zip(percentiles, values)
+            }
+            stats["max"] = float(ms.max())
+            stats["mean"] = float(ms.mean())
+            stats["calls"] = float(calls.mean())
+            stats["share"] = self.total_time[id] / total
+            summary[name] = stats
+        return summary
+
+    def report(self) -> str:
+        """
+        Returns `summary()` as a table.
+
+        :return: table, one line per phase (str)
+        """
+        summary = self.summary()
+        lines = [
+            f"{'phase':16}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+            f"{'max ms':>10}{'calls':>8}{'share':>8}"
+        ]
+        for name, stats in summary.items():
+            lines.append(
+                f"{name:16}{stats['p50']:>10.3f}{stats['p90']:>10.3f}"
+                f"{stats['p99']:>10.3f}{stats['max']:>10.3f}"
+                f"{stats['calls']:>8.1f}{stats['share']:>8.1%}"
+            )
+        lines.append(f"over the last {min(self.ticks, self.capacity)} "
+                     f"of {self.ticks} ticks")
+        return "\n".join(lines)
+
+    def clear_trace(self) -> None:
+        """
+        Drops the recorded calls and stops recording them, for example
+        before sending the profiler to another process.
+
+        :return: None
+        """
+        self.trace_capacity = 0
+        self.n_events = 0
+        self._event_phase = self._event_phase[:0]
+        self._event_start = self._event_start[:0]
+        self._event_duration = self._event_duration[:0]
+
+    def export_trace(self, path: str, pid: int = 0) -> None:
+        """
+        Writes the recorded calls as Chrome trace-event JSON, which can
+        be opened in chrome://tracing or Perfetto.
+
+        :param path: path of the JSON file (str)
+        :param pid: process id shown in the trace (int)
+        :return: None
+        """
+        n = min(self.n_events, self.trace_capacity)
+        order = np.arange(self.n_events - n, self.n_events)
+        if self.trace_capacity:
+            order %= self.trace_capacity
+        events = [
+            {
+                "name": self.names[phase],
+                "ph": "X",
+                "ts": start / 1e3,
+                "dur": duration / 1e3,
+                "pid": pid,
+                "tid": 0,
+            }
+            for phase, start, duration in zip(
+                self._event_phase[order].tolist(),
+                self._event_start[order].tolist(),
+                self._event_duration[order].tolist()
+            )
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+class NullProfiler:
+    """
+    Stand-in for `Profiler` when profiling is off. Every method does
+    nothing, so instrumented code costs one method call per phase.
+
+    + enabled: (bool) False
+    """
+    enabled = False
+    _phase = _NullPhase()
+
+    def phase(self, name: str) -> _NullPhase:
+        return self._phase
+
+    def tick(self) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,271 @@
+import numpy as np
+import pygame
+
+import assets
+from world import World
+
+
+# drawing order of a match, back to front, shared with `replay.Replay`
+LAYERS = ("background", "ground", "targets", "bullets", "aircraft", "hud")
+# the layers that only change when a target disappears
+STATIC_LAYERS = LAYERS[:3]
+
+
+def hud_text(time: float, scores) -> str:
+    """
+    :param time: simulated time of the match (float)
+    :param scores: score of every team (Iterable[int])
+    :return: text of the HUD (str)
+    """
+    return "{:.0f} s   {}".format(
+        time,
+        " / ".join(str(score) for score in scores)
+    )
+
+
+class Renderer:
+    """
+    Draws a `World` in `LAYERS`, each entity once per frame. The
+    `STATIC_LAYERS` are baked into one cached surface that is only
+    rebuilt when a target disappears. Every frame only the regions
+    where bullets, aircraft and the HUD were or are drawn are restored
+    and sent to the display.
+
+    Frames can be drawn in between two simulation steps: aircraft are
+    then drawn at poses interpolated between the `snapshot()` taken
+    before the last step and the current state.
+
+    + screen: (pygame.Surface) display surface
+    + world: (World) match to draw
+    + background: (pygame.Surface) background image, screen sized
+    + static: (pygame.Surface) background, ground and targets
+    + font: (pygame.font.Font) font of the HUD
+    """
+    def __init__(
+            self,
+            screen: pygame.Surface,
+            world: World,
+            background: str = "assets/background.png"
+    ) -> None:
+        """
+        Initialiser of the Renderer class
+
+        :param screen: display surface (pygame.Surface)
+        :param world: match to draw (World)
+        :param background: filepath to the background image (str)
+        """
+        self.screen = screen
+        self.world = world
+        self.background = assets.load(
+            background,
+            world.config.SCREEN_RESOLUTION
+        )
+        self.font = pygame.font.Font(None, 24)
+        self.static = None
+        self._targets = {}
+        self._previous = []
+        self._full = True
+        self._hud = None
+        self._hud_text = None
+        self._center = None
+        self._pitch = None
+
+    def _build_static(self) -> None:
+        """
+        Bakes the `STATIC_LAYERS`: the background, the ground and the
+        live targets into `static`.
+
+        :return: None
+        """
+        # opaque, so sprites blend onto it like onto the display
+        self.static = pygame.Surface(
+            self.world.config.SCREEN_RESOLUTION
+        )
+        for layer in STATIC_LAYERS:
+            getattr(self, "_draw_" + layer)(self.static, 1.0)
+        self._targets = {
+            id(target): pygame.Rect(
+                target.coords.tolist(),
+                target.sprite.get_size()
+            )
+            for target in self.world.targets
+        }
+
+    def snapshot(self) -> None:
+        """
+        Remembers the pose of every aircraft, call right before
+        `World.step()`.
+
+        :return: None
+        """
+        engine = self.world.engine
+        self._center = engine.center[:engine.size].copy()
+        self._pitch = engine.pitch[:engine.size].copy()
+
+    def _interpolated(self, alpha: float) -> list[tuple]:
+        """
+        Returns the sprite and screen rectangle of every live aircraft
+        at `alpha` of the way from the snapshot to the current pose.
+        Aircraft that wrapped around the screen edge in between are
+        drawn at their current pose.
+
+        :param alpha: fraction of the last step, 0 to 1 (float)
+        :return: sprite and rectangle per aircraft
+         (list[tuple[pygame.Surface, pygame.Rect]])
+        """
+        agents = self.world.agents_all
+        engine = self.world.engine
+        index = np.array([agent.index for agent in agents], dtype=int)
+        center = engine.center[index]
+        pitch = engine.pitch[index]
+        width = self.world.config.SCREEN_WIDTH
+        moved = center - self._center[index]
+        wrapped = np.abs(moved[:, 0]) > width / 2
+        moved[wrapped] = 0
+        center = center - moved * (1 - alpha)
+        turned = (pitch - self._pitch[index] + 180) % 360 - 180
+        pitch = pitch - turned * (1 - alpha)
+
+        drawn = []
+        for agent, xy, angle in zip(
+            agents,
+            center.tolist(),
+            pitch.tolist()
+        ):
+            sprite = agent.atlas.get(agent.sprite_variant, angle)
+            drawn.append((sprite, sprite.get_rect(center=xy)))
+        return drawn
+
+    def invalidate(self) -> None:
+        """
+        Redraws the whole screen on the next `draw()`, for example
+        after something else drew on it.
+
+        :return: None
+        """
+        self._full = True
+
+    def _draw_background(
+            self,
+            surface: pygame.Surface,
+            alpha: float
+    ) -> list[pygame.Rect]:
+        """
+        Draws the background image on `surface`, see `_draw_hud()`.
+        """
+        return [surface.blit(self.background, (0, 0))]
+
+    def _draw_ground(
+            self,
+            surface: pygame.Surface,
+            alpha: float
+    ) -> list[pygame.Rect]:
+        """
+        Draws the ground on `surface`, see `_draw_hud()`.
+        """
+        floor = self.world.floor
+        return [surface.blit(floor.sprite, [0, floor.elevation])]
+
+    def _draw_targets(
+            self,
+            surface: pygame.Surface,
+            alpha: float
+    ) -> list[pygame.Rect]:
+        """
+        Draws every live target on `surface`, see `_draw_hud()`.
+        """
+        return [
+            surface.blit(target.sprite, target.coords)
+            for target in self.world.targets
+        ]
+
+    def _draw_bullets(
+            self,
+            surface: pygame.Surface,
+            alpha: float
+    ) -> list[pygame.Rect]:
+        """
+        Draws every live bullet on `surface`, see `_draw_hud()`.
+        """
+        pool = self.world.bullet_pool
+        return [
+            surface.blit(pool.sprite, coords)
+            for coords in pool.coords[:pool.count].tolist()
+        ]
+
+    def _draw_aircraft(
+            self,
+            surface: pygame.Surface,
+            alpha: float
+    ) -> list[pygame.Rect]:
+        """
+        Draws every live aircraft on `surface`, at its interpolated pose
+        if `alpha` < 1, see `_interpolated()` and `_draw_hud()`.
+        """
+        if alpha < 1 and self._center is not None:
+            aircraft = self._interpolated(alpha)
+        else:
+            aircraft = [
+                (agent.rot_sprite, agent.rot_rect)
+                for agent in self.world.agents_all
+            ]
+        return [surface.blit(sprite, rect) for sprite, rect in aircraft]
+
+    def _draw_hud(
+            self,
+            surface: pygame.Surface,
+            alpha: float
+    ) -> list[pygame.Rect]:
+        """
+        Draws the match time and the team scores in the top left corner.
+
+        :param surface: surface to draw on (pygame.Surface)
+        :param alpha: unused, see `draw()` (float)
+        :return: regions drawn (list[pygame.Rect])
+        """
+        text = hud_text(self.world.time, self.world.scores)
+        if text != self._hud_text:
+            self._hud_text = text
+            self._hud = self.font.render(text, True, "white")
+        return [surface.blit(self._hud, (8, 8))]
+
+    def draw(self, alpha: float = 1.0) -> None:
+        """
+        Draws the current state of the world and updates the changed
+        regions of the display.
+
+        :param alpha: how far the frame lies between the state at the
+         last `snapshot()` (0) and the current state (1), the current
+         state if there is no snapshot (float)
+        :return: None
+        """
+        world = self.world
+        screen = self.screen
+        dirty = []
+
+        alive = set(map(id, world.targets))
+        if self.static is None or alive != self._targets.keys():
+            removed = [
+                rect for key, rect in self._targets.items()
+                if key not in alive
+            ]
+            self._build_static()
+            dirty.extend(removed)
+
+        if self._full:
+            screen.blit(self.static, (0, 0))
+        else:
+            for rect in self._previous + dirty:
+                screen.blit(self.static, rect, rect)
+            dirty.extend(self._previous)
+
+        drawn = []
+        for layer in LAYERS[len(STATIC_LAYERS):]:
+            drawn.extend(getattr(self, "_draw_" + layer)(screen, alpha))
+
+        if self._full:
+            pygame.display.flip()
+            self._full = False
+        else:
+            pygame.display.update(dirty + drawn)
+        self._previous = drawn
@@ -0,0 +1,377 @@
+import json
+import math
+import os
+import struct
+import numpy as np
+import pygame
+
+import assets
+from world import World
+from renderer import LAYERS, hud_text
+from sprite_atlas import atlas_for, SIDE, SIDE_FLIPPED, TOP
+
+MAGIC = b"TPRP"
+VERSION = 2
+
+
+def record_dtype(
+        n_teams: int,
+        n_aircraft: int,
+        n_targets: int,
+        bullet_capacity: int
+    ) -> np.dtype:
+    """
+    Returns the layout of one tick in a replay file. Every tick has the
+    same size, so tick i starts at `i * itemsize` and every field reads
+    as a strided view over all ticks.
+
+    :param n_teams: number of teams (int)
+    :param n_aircraft: number of aircraft at the start of the match (int)
+    :param n_targets: number of targets at the start of the match (int)
+    :param bullet_capacity: maximum number of bullets per tick (int)
+    :return: record layout (np.dtype)
+    """
+    return np.dtype([
+        ("time", "<f8"),
+        ("scores", "<i4", (n_teams,)),
+        ("alive", "u1", (n_aircraft,)),
+        ("x", "<f4", (n_aircraft,)),
+        ("y", "<f4", (n_aircraft,)),
+        ("pitch", "<f4", (n_aircraft,)),
+        ("orientation", "i1", (n_aircraft,)),
+        ("sprite", "u1", (n_aircraft,)),
+        ("targets", "u1", (n_targets,)),
+        ("n_bullets", "<u4"),
+        ("bullets", "<i2", (bullet_capacity, 2)),
+    ])
+
+
+def max_bullets(world: World) -> int:
+    """
+    Most bullets the aircraft of `world` can have alive at once: every
+    aircraft fires at most once per FIRE_RATE and a bullet expires
+    after the LIFETIME of BULLET.
+
+    :param world: match before its first step (World)
+    :return: number of bullets (int)
+    """
+    config = world.config
+    per_aircraft = math.ceil(
+        config.BULLET["LIFETIME"] / config.FIRE_RATE
+    ) + 1
+    return len(world.agents_all) * per_aircraft
+
+
+class Recorder:
+    """
+    Writes the state of a `World` after every tick to a replay file: a
+    short header followed by fixed-size records, see `record_dtype()`.
+    The header also holds the display settings of the match, so a
+    replay is drawn the way it was played whatever the current settings
+    are. Aircraft are stored by engine index and targets in their order at
+    the start of the match, so dead ones keep their column.
+
+    + path: (str) path of the replay file
+    + header: (dict) description of the match stored in the file
+    + dtype: (np.dtype) layout of one tick
+    + ticks: (int) number of ticks written
+    """
+    def __init__(
+            self,
+            path: str,
+            world: World,
+            bullet_capacity: int = None,
+            seed: int = None
+    ) -> None:
+        """
+        Initialiser of the Recorder class, writes the header.
+
+        :param path: path of the replay file, overwritten (str)
+        :param world: match to record, before its first step (World)
+        :param bullet_capacity: bullets stored per tick, any more are
+         left out of the replay; if None, as many as the aircraft of
+         `world` can have alive at once, see `max_bullets()` (int)
+        :param seed: seed of the match, only stored (int)
+        """
+        self.path = path
+        self._world = world
+        config = world.config
+        if bullet_capacity is None:
+            bullet_capacity = max_bullets(world)
+        self._targets = {
+            id(target): i for i, target in enumerate(world.targets)
+        }
+        self._team_of = np.zeros(world.engine.size, dtype=int)
+        for team_number, team in enumerate(world.teams):
+            for agent in team.agents:
+                self._team_of[agent.index] = team_number
+
+        self.header = {
+            "version": VERSION,
+            "seed": seed,
+            "teams": [
+                {
+                    "strategy": team.__class__.__name__,
+                    "sprite": description["PLANE"]["SPRITE"],
+                    "sprite_top": description["PLANE"]["SPRITE_TOP"],
+                    "size": list(description["PLANE"]["SIZE"]),
+                }
+                for team, description in zip(
+                    world.teams,
+                    world.team_descriptions
+                )
+            ],
+            "aircraft_team": self._team_of.tolist(),
+            "targets": [target.coords.tolist() for target in world.targets],
+            "bullet_capacity": bullet_capacity,
+            "display": {
+                "tick_rate": config.TICK_RATE,
+                "screen_resolution": list(config.SCREEN_RESOLUTION),
+                "rotation_step": config.ROTATION_STEP,
+                "target": {
+                    "sprite": config.TARGET["SPRITE"],
+                    "size": config.TARGET["SIZE"],
+                },
+                "bullet": {
+                    "sprite": config.BULLET["SPRITE"],
+                    "size": config.BULLET["SIZE"],
+                },
+                "ground": {
+                    "sprite": config.GROUND["SPRITE"],
+                    "height": config.GROUND["HEIGHT"],
+                    "elevation": config.GROUND["ELEVATION"],
+                },
+            },
+        }
+        self.dtype = record_dtype(
+            len(world.teams),
+            world.engine.size,
+            len(world.targets),
+            bullet_capacity
+        )
+        self._record = np.zeros(1, dtype=self.dtype)
+        self.ticks = 0
+
+        header = json.dumps(self.header).encode()
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._file.write(struct.pack("<I", len(header)))
+        self._file.write(header)
+
+    def _sprites(self) -> np.ndarray:
+        """
+        Returns which sprite every aircraft shows, following the timing
+        of `Aircraft.flip_update_sprite()`.
+
+        :return: `SIDE`, `SIDE_FLIPPED` or `TOP` per aircraft (np.ndarray)
+        """
+        engine = self._world.engine
+        sprites = np.where(
+            engine.orientation[:engine.size] == 1,
+            SIDE,
+            SIDE_FLIPPED
+        )
+        for agent in self._world.agents_all:
+            if agent.flipstart < 0:
+                continue
+            elapsed = agent.clock - agent.flipstart
+            if elapsed <= .25:
+                # the sprite still shows the orientation before the flip
+                sprites[agent.index] = (
+                    SIDE_FLIPPED if agent.orientation == 1 else SIDE
+                )
+            elif elapsed < .5:
+                sprites[agent.index] = TOP
+        return sprites
+
+    def record(self) -> None:
+        """
+        Appends the current state of the world as the next tick.
+
+        :return: None
+        """
+        world = self._world
+        engine = world.engine
+        n = engine.size
+        record = self._record[0]
+
+        record["time"] = world.time
+        record["scores"] = world.scores
+        record["alive"] = engine.active[:n]
+        record["x"] = engine.center[:n, 0]
+        record["y"] = engine.center[:n, 1]
+        record["pitch"] = engine.pitch[:n]
+        record["orientation"] = engine.orientation[:n]
+        record["sprite"] = self._sprites()
+
+        record["targets"] = 0
+        for target in world.targets:
+            record["targets"][self._targets[id(target)]] = 1
+
+        bullets = world.bullet_pool.coords[:world.bullet_pool.count]
+        bullets = bullets[:len(record["bullets"])]
+        record["n_bullets"] = len(bullets)
+        # truncated like the coordinates passed to Surface.blit()
+        record["bullets"][:len(bullets)] = np.trunc(bullets)
+
+        self._file.write(self._record.tobytes())
+        self.ticks += 1
+
+    def close(self) -> None:
+        """
+        Flushes and closes the replay file.
+
+        :return: None
+        """
+        self._file.close()
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        """
+        Closes the replay file. If the match failed, the file is
+        removed rather than left behind truncated.
+        """
+        self.close()
+        if exc_type is not None:
+            os.remove(self.path)
+
+
+class Replay:
+    """
+    Read-only view of a replay file. The ticks are memory-mapped, so
+    opening a replay and seeking to any tick is O(1) and only the ticks
+    that are looked at are read from disk.
+
+    + path: (str) path of the replay file
+    + header: (dict) description of the match, see `Recorder`
+    + ticks: (np.memmap) one record per tick, see `record_dtype()`
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Initialiser of the Replay class
+
+        :param path: path of a file written by `Recorder` (str)
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            if file.read(4) != MAGIC:
+                raise ValueError(f"{path} is not a replay file")
+            length, = struct.unpack("<I", file.read(4))
+            self.header = json.loads(file.read(length))
+        if self.header["version"] != VERSION:
+            raise ValueError(
+                f"{path} has replay version {self.header['version']}, "
+                f"expected {VERSION}"
+            )
+
+        dtype = record_dtype(
+            len(self.header["teams"]),
+            len(self.header["aircraft_team"]),
+            len(self.header["targets"]),
+            self.header["bullet_capacity"]
+        )
+        self.ticks = np.memmap(
+            path,
+            dtype=dtype,
+            mode="r",
+            offset=8 + length
+        )
+        self._sprites = None
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def __getitem__(self, tick: int) -> np.void:
+        return self.ticks[tick]
+
+    def _load_sprites(self) -> None:
+        """
+        Loads the sprites of every team, the targets, the bullets and
+        the ground, and the font of the HUD.
+
+        :return: None
+        """
+        display = self.header["display"]
+        resolution = tuple(display["screen_resolution"])
+        target, bullet = display["target"], display["bullet"]
+        self._sprites = {
+            "teams": [
+                atlas_for(
+                    team["sprite"],
+                    team["sprite_top"],
+                    team["size"],
+                    display["rotation_step"]
+                )
+                for team in self.header["teams"]
+            ],
+            "target": assets.load(
+                target["sprite"],
+                (target["size"], target["size"])
+            ),
+            "bullet": assets.load(
+                bullet["sprite"],
+                (bullet["size"], bullet["size"]),
+                (True, False)
+            ),
+            "floor": assets.load(
+                display["ground"]["sprite"],
+                (resolution[0], display["ground"]["height"])
+            ),
+            "background": assets.load(
+                "assets/background.png",
+                resolution
+            ),
+            "font": pygame.font.Font(None, 24),
+        }
+
+    def _draw_background(self, screen: pygame.Surface, record) -> None:
+        screen.blit(self._sprites["background"], (0, 0))
+
+    def _draw_ground(self, screen: pygame.Surface, record) -> None:
+        screen.blit(
+            self._sprites["floor"],
+            [0, self.header["display"]["ground"]["elevation"]]
+        )
+
+    def _draw_targets(self, screen: pygame.Surface, record) -> None:
+        for i in np.flatnonzero(record["targets"]):
+            screen.blit(self._sprites["target"], self.header["targets"][i])
+
+    def _draw_bullets(self, screen: pygame.Surface, record) -> None:
+        for coords in record["bullets"][:record["n_bullets"]].tolist():
+            screen.blit(self._sprites["bullet"], coords)
+
+    def _draw_aircraft(self, screen: pygame.Surface, record) -> None:
+        for i in np.flatnonzero(record["alive"]):
+            team = self.header["aircraft_team"][i]
+            sprite = self._sprites["teams"][team].get(
+                int(record["sprite"][i]),
+                float(record["pitch"][i])
+            )
+            screen.blit(
+                sprite,
+                sprite.get_rect(
+                    center=(float(record["x"][i]), float(record["y"][i]))
+                )
+            )
+
+    def _draw_hud(self, screen: pygame.Surface, record) -> None:
+        text = hud_text(float(record["time"]), record["scores"].tolist())
+        screen.blit(self._sprites["font"].render(text, True, "white"), (8, 8))
+
+    def draw(self, screen: pygame.Surface, tick: int) -> None:
+        """
+        Draws `tick` the way the live GUI draws a match: every layer of
+        `renderer.LAYERS` in order, each by its `_draw_<layer>()`.
+
+        :param screen: surface to draw on (pygame.Surface)
+        :param tick: tick to draw (int)
+        :return: None
+        """
+        if self._sprites is None:
+            self._load_sprites()
+        record = self.ticks[tick]
+        for layer in LAYERS:
+            getattr(self, "_draw_" + layer)(screen, record)
@@ -2,13 +2,33 @@ SCREEN_HEIGHT     = 720
 SCREEN_WIDTH      = 1280
 SCREEN_RESOLUTION = (SCREEN_WIDTH, SCREEN_HEIGHT)
 
-FPS = 60
+FPS = 60 # frames drawn per second in the GUI
+TICK_RATE = 60 # simulation steps per simulated second, GUI and headless
+FAST_FORWARD = 1 # simulated seconds per real second in the GUI
+MAX_FRAME_TIME = 0.25 # real seconds simulated per frame at most
 SIMULATION_RUNTIME = 1000000 # in seconds
 USE_GUI = True
 COLLISION = True
+COLLISION_DISTANCE = 24 # aircraft closer than x pixels collide
+FRIENDLY_FIRE = True # bullets hit aircraft of the own side as well
 PLANE_POS_SCALE = 2
 BATCH_SIZE = 10
+WORKERS = None # worker processes for headless batches, None uses all cores
+SEED = 0 # seed of the first match in a batch, match i uses SEED + i
+REPLAY_DIR = None # headless matches are recorded here when set
+PLAY_REPLAY = None # path of a replay to watch instead of simulating
+PROFILE = False # time every phase of the simulation loop, see profiler.py
+PROFILE_TRACE_DIR = None # with PROFILE, write a Chrome trace per match here
+SWEEP_CACHE = ".sweep_cache" # results of sweep.py by config, seed and code
 FIRE_RATE = 0.08 #fire per x seconds
+ROTATION_STEP = 1 # degrees between the pre-rendered rotations of sprites
+ASSIGNMENT_BACKEND = None # "scipy", "munkres" or None for the fastest
+
+# teams reassign targets when their targets or agents change, and:
+ASSIGNMENT = {
+    "REFRESH_INTERVAL" : None, # every x seconds, None for never
+    "DRIFT_THRESHOLD" : None, # when an agent moved x pixels, None for never
+}
 
 PLANE_I_16_REPUBLICAN = {
     "SPRITE" : "assets/facing_right.png",
@@ -67,6 +87,37 @@ PLANE_MESSERSCHMIDT_109E = {
     "SIZE" : (35, 15)  # 8.95 : 2.6 irl
 }
 
+# any number of teams; teams with the same optional "SIDE" are allies
+TEAMS = [
+    {
+        "STRATEGY" : "AbsoluteDistanceTeam",
+        "N_AGENTS" : 2,
+        "PLANE" : PLANE_I_16_REPUBLICAN,
+    },
+    {
+        "STRATEGY" : "AbsoluteDistanceTeam",
+        "N_AGENTS" : 1,
+        "PLANE" : PLANE_I_16_FALANGIST,
+    },
+]
+
+# round-robin between every strategy flying every plane, see tournament.py
+TOURNAMENT = {
+    "STRATEGIES" : [
+        "AbsoluteDistanceTeam",
+        "TwoTargetsTeam",
+        "EnergyBiddingTeam",
+    ],
+    "PLANES" : {
+        "I-16" : PLANE_I_16_REPUBLICAN,
+        "Bf 109E" : PLANE_MESSERSCHMIDT_109E,
+    },
+    "N_AGENTS" : 2,
+    "SEEDS" : 10, # seeds per pairing and side, from SEED
+    "DATABASE" : "tournament.sqlite",
+    "COMMIT_EVERY" : 20, # results written per transaction
+}
+
 TARGET = {
     "SPRITE" : "assets/target.png",
     "SPRITES" : [
@@ -0,0 +1,129 @@
+import math
+import numpy as np
+
+
+class SpatialGrid:
+    """
+    Uniform grid over the screen for radius queries. The grid wraps
+    around horizontally like the world does, vertically it is clamped.
+    Points are stored sorted by cell, so a query only looks at the
+    points in the cells that overlap the query circle.
+
+    + width: (float) width of the world
+    + height: (float) height of the world
+    + nx: (int) number of cells horizontally
+    + ny: (int) number of cells vertically
+    + cell_width: (float) width of a cell, `width` / `nx` so the cells
+     wrap around evenly
+    + cell_height: (float) height of a cell, `height` / `ny`
+    + points: (np.ndarray) indexed points, shape (n, 2)
+    + order: (np.ndarray) point indices sorted by cell
+    + starts: (np.ndarray) offset into `order` of the first point of
+     every cell, with one extra entry at the end
+    """
+    def __init__(
+        self,
+        width: float,
+        height: float,
+        cell_size: float
+    ) -> None:
+        """
+        Initialiser of the SpatialGrid class
+
+        :param width: width of the world (float)
+        :param height: height of the world (float)
+        :param cell_size: maximum width and height of a cell, queries
+         are cheapest when this is close to the query radius (float)
+        """
+        self.width = width
+        self.height = height
+        self.nx = max(1, math.ceil(width / cell_size))
+        self.ny = max(1, math.ceil(height / cell_size))
+        self.cell_width = width / self.nx
+        self.cell_height = height / self.ny
+        self.build(np.zeros((0, 2)))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        """
+        Returns the cell id of every point.
+
+        :param points: points, shape (n, 2) (np.ndarray)
+        :return: cell ids (np.ndarray)
+        """
+        cx = np.floor(points[:, 0] / self.cell_width).astype(int) % self.nx
+        cy = np.clip(
+            np.floor(points[:, 1] / self.cell_height).astype(int),
+            0,
+            self.ny - 1
+        )
+        return cy * self.nx + cx
+
+    def build(self, points: np.ndarray) -> None:
+        """
+        (Re)builds the grid from scratch for the given points. Indices
+        returned by `query()` refer to rows of `points`.
+
+        :param points: points, shape (n, 2) (np.ndarray)
+        :return: None
+        """
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        cells = self._cells(self.points)
+        self.order = np.argsort(cells, kind="stable")
+        self.starts = np.zeros(self.nx * self.ny + 1, dtype=int)
+        np.cumsum(
+            np.bincount(cells, minlength=self.nx * self.ny),
+            out=self.starts[1:]
+        )
+
+    def query(
+        self,
+        center: tuple[float, float],
+        radius: float
+    ) -> np.ndarray:
+        """
+        Returns the indices of all points closer than `radius` to
+        `center`, wrapping around the left and right side of the world.
+
+        :param center: centre of the query circle (tuple[float, float])
+        :param radius: radius of the query circle (float)
+        :return: indices of the points in the circle, ascending
+         (np.ndarray)
+        """
+        if len(self.points) == 0:
+            return np.zeros(0, dtype=int)
+
+        x0 = math.floor((center[0] - radius) / self.cell_width)
+        x1 = math.floor((center[0] + radius) / self.cell_width)
+        if x1 - x0 + 1 >= self.nx:
+            columns = range(self.nx)
+        else:
+            columns = [x % self.nx for x in range(x0, x1 + 1)]
+        y0 = min(
+            max(math.floor((center[1] - radius) / self.cell_height), 0),
+            self.ny - 1
+        )
+        y1 = min(
+            max(math.floor((center[1] + radius) / self.cell_height), 0),
+            self.ny - 1
+        )
+
+        candidates = [
+            self.order[self.starts[cell]:self.starts[cell + 1]]
+            for cell in (
+                y * self.nx + x
+                for y in range(y0, y1 + 1)
+                for x in columns
+            )
+        ]
+        candidates = np.concatenate(candidates)
+        if len(candidates) == 0:
+            return candidates
+
+        delta = np.abs(self.points[candidates] - center)
+        delta[:, 0] %= self.width
+        delta[:, 0] = np.minimum(delta[:, 0], self.width - delta[:, 0])
+        inside = delta[:, 0]**2 + delta[:, 1]**2 < radius**2
+        return np.sort(candidates[inside])
@@ -0,0 +1,90 @@
+import pygame
+
+import assets
+
+# sprite variants of an aircraft
+SIDE, SIDE_FLIPPED, TOP = 0, 1, 2
+
+
+class RotationAtlas:
+    """
+    All rotations of the sprites of one aircraft type, rendered once
+    at angles `step` degrees apart. Looking up a rotated sprite is a
+    list index instead of a `pygame.transform.rotate()` per tick.
+
+    + size: (tuple[int, int]) size of the unrotated sprites
+    + step: (float) degrees between two pre-rendered angles
+    + frames: (list[list[pygame.Surface]]) rotated sprites per variant
+     (`SIDE`, `SIDE_FLIPPED`, `TOP`) per angle
+    """
+    def __init__(
+            self,
+            sprite: str,
+            sprite_top: str,
+            size: tuple[int, int],
+            step: float = 1
+    ) -> None:
+        """
+        Initialiser of the RotationAtlas class, renders every rotation.
+
+        :param sprite: filepath to the side view sprite (str)
+        :param sprite_top: filepath to the top view sprite (str)
+        :param size: size to scale the sprites to (tuple[int, int])
+        :param step: degrees between two pre-rendered angles, should
+         divide 360 (float)
+        """
+        self.size = tuple(size)
+        self.step = step
+        variants = (
+            assets.load(sprite, size),
+            assets.load(sprite, size, (False, True)),
+            assets.load(sprite_top, size),
+        )
+        n = round(360 / step)
+        self.frames = [
+            [pygame.transform.rotate(variant, i * step) for i in range(n)]
+            for variant in variants
+        ]
+
+    def get(self, variant: int, pitch: float) -> pygame.Surface:
+        """
+        Returns `variant` rotated by the pre-rendered angle closest to
+        `pitch`.
+
+        :param variant: `SIDE`, `SIDE_FLIPPED` or `TOP` (int)
+        :param pitch: angle in degrees (float)
+        :return: rotated sprite, shared, do not draw on it
+         (pygame.Surface)
+        """
+        frames = self.frames[variant]
+        return frames[round(pitch / self.step) % len(frames)]
+
+
+_atlases = {}
+
+
+def atlas_for(
+        sprite: str,
+        sprite_top: str,
+        size: tuple[int, int],
+        step: float
+    ) -> RotationAtlas:
+    """
+    Returns the atlas of an aircraft type, rendering it on first use.
+    All aircraft with the same sprites and size share one atlas.
+
+    :param sprite: filepath to the side view sprite (str)
+    :param sprite_top: filepath to the top view sprite (str)
+    :param size: size of the aircraft on screen (tuple[int, int])
+    :param step: degrees between two rendered rotations (float)
+    :return: shared atlas (RotationAtlas)
+    """
+    key = (sprite, sprite_top, tuple(size), step)
+    if key not in _atlases:
+        _atlases[key] = RotationAtlas(
+            sprite,
+            sprite_top,
+            size,
+            step
+        )
+    return _atlases[key]
@@ -0,0 +1,440 @@
+"""
+Parameter sweeps over team descriptions.
+
+    python sweep.py --grid "0.PLANE.MASS=[1000, 1200, 1400]" --seeds 5
+    python sweep.py --random "*.PLANE.AGILITY=80:120" --samples 20
+
+A parameter is a path into the team descriptions: the team number, or
+`*` for every team, followed by keys, such as `0.PLANE.ENGINE_FORCE` or
+`*.PLANE.RADIUS_FOV`. Any other path is a setting, such as
+`BULLET.SPEED` or `FIRE_RATE`, and is played with a `Config` that
+replaces it. Every point of the sweep is played with every seed.
+Results are cached on disk under a hash of the team descriptions, the
+seed, the other settings that affect a match and the source code, so
+repeated and overlapping sweeps only play the points that are new.
+"""
+import argparse
+import copy
+import glob
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+from typing import Iterator
+
+import numpy as np
+
+import batch_runner
+from config import Config
+
+
+# settings that do not change the outcome of a match
+_NOT_IN_KEY = {
+    "FPS",
+    "FAST_FORWARD",
+    "MAX_FRAME_TIME",
+    "USE_GUI",
+    "BATCH_SIZE",
+    "WORKERS",
+    "SEED",
+    "REPLAY_DIR",
+    "PLAY_REPLAY",
+    "PROFILE",
+    "PROFILE_TRACE_DIR",
+    "TEAMS",
+    "TOURNAMENT",
+    "SWEEP_CACHE",
+}
+
+_code_version = None
+
+
+def code_version() -> str:
+    """
+    Hash of the source code of the simulation, every .py file next to
+    this one. Computed once per process.
+
+    :return: hex digest (str)
+    """
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+            digest.update(os.path.basename(path).encode())
+            with open(path, "rb") as file:
+                digest.update(file.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def match_settings(config: Config) -> dict:
+    """
+    The settings of `config` that affect the outcome of a match.
+
+    :param config: configuration of the match (Config)
+    :return: value by setting name (dict)
+    """
+    return {
+        name: value for name, value in config.values().items()
+        if name not in _NOT_IN_KEY
+    }
+
+
+def cache_key(
+        team_descriptions: list[dict],
+        seed: int,
+        config: Config = None
+    ) -> str:
+    """
+    Content address of a match: a hash of the team descriptions, the
+    seed, every setting of `config` that affects a match and
+    `code_version()`.
+
+    :param team_descriptions: teams of the match (list[dict])
+    :param seed: seed of the match (int)
+    :param config: configuration of the match, the current settings if
+     None (Config)
+    :return: hex digest (str)
+    """
+    if config is None:
+        config = Config()
+    content = json.dumps(
+        {
+            "teams": team_descriptions,
+            "seed": seed,
+            "settings": match_settings(config),
+            "code": code_version(),
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def grid(space: dict[str, list]) -> list[dict]:
+    """
+    Every combination of the values of every parameter.
+
+    :param space: values per parameter path (dict[str, list])
+    :return: one dict of parameter values per point (list[dict])
+    """
+    names = list(space)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*space.values())
+    ]
+
+
+def random_search(
+        space: dict[str, tuple | list],
+        n_samples: int,
+        seed: int = 0
+    ) -> list[dict]:
+    """
+    `n_samples` random points. A (low, high) tuple is sampled uniformly,
+    as an int if both are ints; a list is sampled from.
+
+    :param space: range or values per parameter path
+     (dict[str, tuple | list])
+    :param n_samples: number of points (int)
+    :param seed: seed of the sampling (int)
+    :return: one dict of parameter values per point (list[dict])
+    """
+    rng = random.Random(seed)
+    points = []
+    for _ in range(n_samples):
+        point = {}
+        for name, values in space.items():
+            if isinstance(values, list):
+                point[name] = rng.choice(values)
+            elif all(isinstance(value, int) for value in values):
+                point[name] = rng.randint(*values)
+            else:
+                point[name] = rng.uniform(*values)
+        points.append(point)
+    return points
+
+
+def _is_team_path(path: str) -> bool:
+    team = path.split(".")[0]
+    return team == "*" or team.isdigit()
+
+
+def apply(team_descriptions: list[dict], point: dict) -> list[dict]:
+    """
+    Copy of `team_descriptions` with the team parameters of `point`
+    filled in.
+
+    :param team_descriptions: descriptions to start from (list[dict])
+    :param point: value per parameter path, see the module docstring
+     (dict)
+    :return: new team descriptions (list[dict])
+    """
+    teams = copy.deepcopy(team_descriptions)
+    for path, value in point.items():
+        if not _is_team_path(path):
+            continue
+        team, *keys, last = path.split(".")
+        selected = teams if team == "*" else [teams[int(team)]]
+        for description in selected:
+            for key in keys:
+                description = description[key]
+            description[last] = value
+    return teams
+
+
+def configure(config: Config, point: dict) -> Config:
+    """
+    Copy of `config` with the setting parameters of `point` replaced.
+
+    :param config: configuration to start from (Config)
+    :param point: value per parameter path, see the module docstring
+     (dict)
+    :return: new configuration, `config` itself if `point` has no
+     setting parameters (Config)
+    """
+    overrides = {}
+    for path, value in point.items():
+        if _is_team_path(path):
+            continue
+        name, *keys = path.split(".")
+        if not keys:
+            overrides[name] = value
+            continue
+        table = overrides.setdefault(
+            name,
+            copy.deepcopy(getattr(config, name))
+        )
+        *keys, last = keys
+        for key in keys:
+            table = table[key]
+        table[last] = value
+    if not overrides:
+        return config
+    return config.replace(**overrides)
+
+
+def _play(job: tuple[str, list[dict], int, Config]) -> tuple[str, dict]:
+    """
+    Runs one sweep match headless.
+
+    :param job: cache key, team descriptions, seed and configuration
+     (tuple[str, list[dict], int, Config])
+    :return: cache key and result (tuple[str, dict])
+    """
+    key, team_descriptions, seed, config = job
+    result = batch_runner.run_match(
+        seed,
+        team_descriptions,
+        config=config
+    )
+    return key, {
+        "scores": result["scores"],
+        "time": result["time"],
+    }
+
+
+def _cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], key + ".json")
+
+
+def _load(cache_dir: str, key: str) -> dict:
+    """
+    :param cache_dir: cache directory (str)
+    :param key: cache key (str)
+    :return: cached result, None if there is none (dict)
+    """
+    try:
+        with open(_cache_path(cache_dir, key)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def _store(cache_dir: str, key: str, result: dict) -> None:
+    """
+    Writes a result to the cache. The file is written under a temporary
+    name and then renamed, so a sweep that is interrupted never leaves
+    a partial result behind.
+
+    :param cache_dir: cache directory (str)
+    :param key: cache key (str)
+    :param result: result of the match (dict)
+    :return: None
+    """
+    path = _cache_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(result, file)
+    os.replace(temporary, path)
+
+
+def run_sweep(
+        points: list[dict],
+        seeds: range,
+        team_descriptions: list[dict] = None,
+        cache_dir: str = None,
+        workers: int = None,
+        config: Config = None
+    ) -> Iterator[dict]:
+    """
+    Plays every point with every seed and yields the results, cached
+    ones first, the others as they finish over a pool of worker
+    processes. Points that are the same match, such as duplicates or
+    points that set a parameter to its current value, are played once.
+
+    :param points: parameter values per point, see `grid()` and
+     `random_search()` (list[dict])
+    :param seeds: seeds every point plays (range)
+    :param team_descriptions: descriptions the points are applied to,
+     TEAMS of `config` if None (list[dict])
+    :param cache_dir: cache directory, SWEEP_CACHE of `config` if None
+     (str)
+    :param workers: number of worker processes, all cores if None and
+     in-process if 1 (int)
+    :param config: configuration the points are applied to, the
+     current settings if None (Config)
+    :return: iterator over results with the keys point, seed, scores,
+     time and cached (Iterator[dict])
+    """
+    if config is None:
+        config = Config()
+    if team_descriptions is None:
+        team_descriptions = config.TEAMS
+    if cache_dir is None:
+        cache_dir = config.SWEEP_CACHE
+
+    # matches by cache key, with the points and seeds they stand for
+    jobs, wanted = {}, {}
+    for point in points:
+        teams = apply(team_descriptions, point)
+        point_config = configure(config, point)
+        for seed in seeds:
+            key = cache_key(teams, seed, point_config)
+            jobs[key] = (key, teams, seed, point_config)
+            wanted.setdefault(key, []).append((point, seed))
+
+    def results(key, result, cached):
+        for point, seed in wanted[key]:
+            yield {"point": point, "seed": seed, "cached": cached, **result}
+
+    missing = []
+    for key, job in jobs.items():
+        result = _load(cache_dir, key)
+        if result is None:
+            missing.append(job)
+        else:
+            yield from results(key, result, True)
+
+    if workers == 1:
+        played = map(_play, missing)
+        for key, result in played:
+            _store(cache_dir, key, result)
+            yield from results(key, result, False)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        for key, result in pool.imap_unordered(_play, missing):
+            _store(cache_dir, key, result)
+            yield from results(key, result, False)
+
+
+def summarize(results: list[dict]) -> list[tuple[dict, int, np.ndarray]]:
+    """
+    Mean score per team of every point, over its seeds.
+
+    :param results: results of `run_sweep()` (list[dict])
+    :return: point, number of seeds and mean score per team, in the
+     order the points first appear (list[tuple[dict, int, np.ndarray]])
+    """
+    scores = {}
+    for result in results:
+        key = json.dumps(result["point"], sort_keys=True)
+        entry = scores.setdefault(key, (result["point"], []))
+        entry[1].append(result["scores"])
+    return [
+        (point, len(runs), np.mean(runs, axis=0))
+        for point, runs in scores.values()
+    ]
+
+
+def _parse(option: str) -> tuple[str, str]:
+    name, _, value = option.partition("=")
+    if not value:
+        raise argparse.ArgumentTypeError(f"expected PATH=VALUE: {option}")
+    return name, value
+
+
+def main(argv: list[str] = None) -> int:
+    config = Config()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--grid", type=_parse, nargs="+", default=[], metavar="PATH=VALUES",
+        help="JSON list of values to try, e.g. 0.PLANE.MASS=[1000, 1200]"
+             " or BULLET.SPEED=[10, 12]"
+    )
+    parser.add_argument(
+        "--random", type=_parse, nargs="+", default=[],
+        metavar="PATH=LOW:HIGH",
+        help="range to sample uniformly, ints if both bounds are ints"
+    )
+    parser.add_argument(
+        "--samples", type=int, default=10,
+        help="number of random points, with --random"
+    )
+    parser.add_argument(
+        "--seeds", type=int, default=config.BATCH_SIZE,
+        help="seeds per point, starting at SEED"
+    )
+    parser.add_argument("--cache", default=config.SWEEP_CACHE)
+    parser.add_argument(
+        "--workers", type=int, default=config.WORKERS,
+        help="worker processes, all cores if not given"
+    )
+    args = parser.parse_args(argv)
+    if not args.grid and not args.random:
+        parser.error("give at least one --grid or --random parameter")
+
+    points = grid({name: json.loads(value) for name, value in args.grid})
+    if args.random:
+        space = {
+            name: tuple(json.loads(bound) for bound in value.split(":"))
+            for name, value in args.random
+        }
+        points = [
+            {**fixed, **sampled}
+            for fixed in points
+            for sampled in random_search(space, args.samples, config.SEED)
+        ]
+
+    results = []
+    played = 0
+    for result in run_sweep(
+        points,
+        range(config.SEED, config.SEED + args.seeds),
+        cache_dir=args.cache,
+        workers=args.workers,
+        config=config
+    ):
+        results.append(result)
+        played += not result["cached"]
+    print(f"{len(results)} matches, {played} played, "
+          f"{len(results) - played} from the cache")
+
+    for point, n, scores in summarize(results):
+        values = ", ".join(
+            f"{name}={value:.4g}" if isinstance(value, float)
+            else f"{name}={value}"
+            for name, value in point.items()
+        )
+        print(f"{values:60} {n:>4} seeds   mean scores "
+              + " / ".join(f"{score:.2f}" for score in scores))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,7 +2,9 @@ import numpy as np
 import pygame
 import random
 
-import settings
+import assets
+from config import Config
+from geometry import Box
 
 
 class Target:
@@ -10,41 +12,53 @@ class Target:
     Target class
 
     + coords: (Tuple[int, int]) coördinaten
-    + rect: (pygame.rect) rect
-    + sprite: (pygame.surface) sprite
+    + rect: (geometry.Box) rect
+    + center: (tuple[float, float]) centre of `rect`, targets do not
+     move
+    + sprite: (pygame.surface) sprite, only loaded when using the GUI
     """
-    def __init__(self, ground_height: int, sprite:str=None) -> None:
+    def __init__(
+            self,
+            ground_height: int,
+            sprite: str=None,
+            rng: random.Random=None,
+            config: Config=None
+    ) -> None:
         """
         Initaliser of the Target class
 
         :param ground_height: height of the ground (int)
         :param sprite: path of the image used for the sprite of the
          target (Default = False) (str)
+        :param rng: random number generator the position is drawn from,
+         the global one if None (random.Random)
+        :param config: configuration, the current settings if None
+         (Config)
         """
-        size = settings.TARGET["SIZE"]
+        if rng is None:
+            rng = random
+        if config is None:
+            config = Config()
+        size = config.TARGET["SIZE"]
         self.coords = np.array((
-            random.randint(
-                size, settings.SCREEN_WIDTH - size
-            ), random.randint(
+            rng.randint(
+                size, config.SCREEN_WIDTH - size
+            ), rng.randint(
                 10, ground_height - size
             )
         ))
-        self.rect = pygame.Rect(self.coords[0], self.coords[1], size, size)
-        self.rect.center = self.coords + (np.array([size, size]) / 2)
+        self.rect = Box(self.coords[0], self.coords[1], size, size)
+        self.center = self.rect.center
 
-
-        if settings.USE_GUI:
-            pygame.draw.rect(
-                surface=pygame.display.get_surface(),
-                color="black",
-                rect=self.rect
-            )
-            self.sprite = pygame.image.load(sprite)        
-            self.sprite = pygame.transform.scale(self.sprite, (size, size))
+        if config.USE_GUI and sprite:
+            self.sprite = assets.load(sprite, (size, size))
 
 
 def load_single_type_targets(
-        ground_height: int, target_count: int
+        ground_height: int,
+        target_count: int,
+        rng: random.Random=None,
+        config: Config=None
 ) -> list[Target]:
     """
     This function loads a list of target with the same sprite, the
@@ -52,13 +66,20 @@ def load_single_type_targets(
     
     :param ground_height: height of the ground (int)
     :param target_count: number of target to be loaded (int)
+    :param rng: random number generator the positions are drawn from,
+     the global one if None (random.Random)
+    :param config: configuration, the current settings if None (Config)
     :return: list of target (list[Target])
     """
+    if config is None:
+        config = Config()
 
     targets = [
         Target(
             ground_height,
-            settings.TARGET["SPRITE"]
+            config.TARGET["SPRITE"],
+            rng,
+            config
         ) for _ in range(
             target_count
         )
@@ -71,8 +92,10 @@ def load_single_type_targets(
                     targets.remove(target2)
                     targets.append(
                         Target(
-                            settings.GROUND["HEIGHT"],
-                            settings.TARGET["SPRITE"]
+                            config.GROUND["HEIGHT"],
+                            config.TARGET["SPRITE"],
+                            rng,
+                            config
                         )
                     )
     return targets
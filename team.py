@@ -1,7 +1,89 @@
 import numpy as np
 
 from agent import Agent
-import settings
+from physics import PhysicsEngine
+from bullet import BulletPool
+from coverage import CoverageMap
+from config import Config
+import utils
+
+
+class TeamTable:
+    """
+    State of all teams of a match in arrays indexed by team number,
+    shared by the teams so that scoring and perception handle every
+    team in one pass.
+
+    + sides: (np.ndarray) side of every team, teams on the same side
+     are allies
+    + scores: (np.ndarray) score of every team
+    + targets: (np.ndarray) xy coords of every target at the start of
+     the match, shape (targets, 2)
+    + beliefs: (np.ndarray) per team and target, True while the team
+     believes the target exists, shape (teams, targets)
+    + versions: (np.ndarray) per team, bumped whenever its beliefs
+     change
+    """
+    def __init__(self, targets: np.ndarray, sides: list[int]) -> None:
+        """
+        Initialiser of the TeamTable class, every team believes in
+        every target.
+
+        :param targets: xy coords of all targets (np.ndarray)
+        :param sides: side of every team, one team per entry (list[int])
+        """
+        self.sides = np.array(sides, dtype=int)
+        self.scores = np.zeros(len(self.sides), dtype=int)
+        self.targets = np.asarray(targets).reshape(-1, 2)
+        self.beliefs = np.ones(
+            (len(self.sides), len(self.targets)),
+            dtype=bool
+        )
+        self.versions = np.zeros(len(self.sides), dtype=int)
+
+    def __len__(self) -> int:
+        return len(self.sides)
+
+    def forget(self, team_number: int, target: np.ndarray) -> None:
+        """
+        Removes `target` from the targets team `team_number` believes
+        exist. The version of the team is only bumped if it believed
+        in the target.
+
+        :param team_number: team that forgets the target (int)
+        :param target: xy coords of the target (np.ndarray)
+        :return: None
+        """
+        known = self.beliefs[team_number] & np.all(
+            self.targets == target, axis=1
+        )
+        if not np.any(known):
+            return
+        self.beliefs[team_number] &= ~known
+        self.versions[team_number] += 1
+
+
+def spawn_point(
+        team_number: int,
+        n_teams: int,
+        width: float
+    ) -> tuple[float, int]:
+    """
+    Start x and facing of a team. Even teams start on the left facing
+    right, odd teams on the right facing left; further teams start
+    further towards the middle of the screen.
+
+    :param team_number: number of the team (int)
+    :param n_teams: number of teams in the match (int)
+    :param width: width of the world (float)
+    :return: start x and 1 for facing right, -1 for facing left
+     (tuple[float, int])
+    """
+    columns = (n_teams + 1) // 2
+    x = team_number // 2 * width / 2 / columns
+    if team_number % 2:
+        return width - 1.0 - x, -1
+    return x, 1
 
 
 class Team:
@@ -9,22 +91,35 @@ class Team:
     Base class for team.
     Only implements constructor and empty bidding method to override.
 
-    + targets (list[tuple[float, float]]) all targets xy coords
+    + number (int) team number, the row of the team in `table`
+    + table (TeamTable) state of all teams, shared within a match
+    + targets (np.ndarray) xy coords of all targets the team believes
+    exist
     + agents (list[Agent]) list with all existing agents for team
     + score (int) team score
+    + targets_version (int) bumped whenever `targets` changes
+    + coverage (CoverageMap) area seen by any agent of the team
+    + config (Config) configuration of the match
+    + agent_class (type) class of the agents the team builds
     """
+    agent_class = Agent
+
     def __init__(
         self, 
         targets: np.ndarray,
         n_agents: int,
         agent_description: dict,
-        team_number: int
+        team_number: int,
+        engine: PhysicsEngine = None,
+        bullet_pool: BulletPool = None,
+        table: TeamTable = None,
+        config: Config = None
     ) -> None:
         """
         Constructor for Team.
 
         :param targets: (np.ndarray)
-        all targets xy coords
+        all targets xy coords, only used if `table` is None
         :param n_agents: (int) number of agents to construct
         :param agent_description: (dict) a dict used for creating agents
         must contain at minimum the following keys:
@@ -41,80 +136,163 @@ class Team:
         - CD_MIN
         - INIT_THROTTLE
         - INIT_V
-        :param team_number: (int) number of team, 
-        1 starts on the left, 2 starts on the right (facing left)
+        - SIZE
+        and optionally RADIUS_FOV (default 150) and EVADE_ZONE
+        (default (150, 30)), see `Agent`
+        :param team_number: (int) number of team, starts at 0, see
+        `spawn_point()` for where the team starts
+        :param engine: (PhysicsEngine) physics engine shared by all
+        aircraft in the world, every agent gets its own if None
+        :param bullet_pool: (BulletPool) pool shared by all bullets in
+        the world, every agent gets its own if None
+        :param table: (TeamTable) state of all teams in the world, the
+        team gets its own if None
+        :param config: (Config) configuration of the match, the current
+        settings if None
         """
-        self.targets = targets
-        self.score = 0
+        if config is None:
+            config = Config()
+        if table is None:
+            table = TeamTable(targets, range(team_number + 1))
+        self.number = team_number
+        self.table = table
+        self.config = config
+        self._targets = None
+        self._targets_version = None
         self.agents = []
-        if team_number not in [0, 1]:
-            raise NotImplementedError(
-                "Simulation does not support more\
-                 than 2 teams at this point in time."
-            )
+        self.coverage = CoverageMap(config.SCREEN_RESOLUTION)
+
+        # state of the last assignment, see `update_assignment()`
+        self._assigned_key = None
+        self._assigned_positions = None
+        self._since_assignment = 0.0
+
+        # sprites are only loaded when there is something to draw on
+        sprite, sprite_top = None, None
+        if config.USE_GUI:
+            sprite = agent_description["SPRITE"]
+            sprite_top = agent_description["SPRITE_TOP"]
 
+        start_x, facing = spawn_point(
+            team_number,
+            len(table),
+            config.SCREEN_WIDTH
+        )
         for i in range(n_agents):
-            if team_number == 0:
-                self.agents.append(Agent(
-                    settings.SCREEN_RESOLUTION,
-                    agent_description["SPRITE"],
-                    agent_description["SPRITE_TOP"],
-                    agent_description["MASS"],
-                    agent_description["ENGINE_FORCE"],
-                    agent_description["AGILITY"],
-                    agent_description["C_DRAG"],
-                    agent_description["C_LIFT"],
-                    agent_description["AOA_CRIT_LOW"],
-                    agent_description["AOA_CRIT_HIGH"],
-                    agent_description["CL0"],
-                    agent_description["CD_MIN"],
-                    agent_description["INIT_THROTTLE"],
-                    0.0, # Start pitch
-                    agent_description["INIT_V"],
-                    np.array((
-                        0.0, # start x
-                        float(
-                            (settings.SCREEN_HEIGHT / n_agents / 2) +
-                            (settings.SCREEN_HEIGHT / n_agents * (i-1))
-                        )
-                    )) / settings.PLANE_POS_SCALE % settings.SCREEN_RESOLUTION,
-                    agent_description["SIZE"]
-                ))
-            if team_number == 1:
-                self.agents.append(Agent(
-                    settings.SCREEN_RESOLUTION,
-                    agent_description["SPRITE"],
-                    agent_description["SPRITE_TOP"],
-                    agent_description["MASS"],
-                    agent_description["ENGINE_FORCE"],
-                    agent_description["AGILITY"],
-                    agent_description["C_DRAG"],
-                    agent_description["C_LIFT"],
-                    agent_description["AOA_CRIT_LOW"],
-                    agent_description["AOA_CRIT_HIGH"],
-                    agent_description["CL0"],
-                    agent_description["CD_MIN"],
-                    agent_description["INIT_THROTTLE"],
-                    180, # start pitch
-                    -np.array(agent_description["INIT_V"]),
-                    np.array((
-                        settings.SCREEN_WIDTH - 1.0, # start x
-                        float(
-                            (settings.SCREEN_HEIGHT / n_agents / 2) +
-                            (settings.SCREEN_HEIGHT / n_agents * (i-1))
-                        )
-                    )) / settings.PLANE_POS_SCALE % settings.SCREEN_RESOLUTION,
-                    agent_description["SIZE"]
-                ))
-
-    def calculate_score(self)-> None:
-        """
-        calculate the team score by summing all agents scores
-        """
-        for agent in self.agents:
-            if agent.score != 0:
-                self.score += agent.score
-                agent.score = 0 
+            self.agents.append(self.agent_class(
+                config.SCREEN_RESOLUTION,
+                sprite,
+                sprite_top,
+                agent_description["MASS"],
+                agent_description["ENGINE_FORCE"],
+                agent_description["AGILITY"],
+                agent_description["C_DRAG"],
+                agent_description["C_LIFT"],
+                agent_description["AOA_CRIT_LOW"],
+                agent_description["AOA_CRIT_HIGH"],
+                agent_description["CL0"],
+                agent_description["CD_MIN"],
+                agent_description["INIT_THROTTLE"],
+                0.0 if facing == 1 else 180, # start pitch
+                facing * np.array(agent_description["INIT_V"]),
+                np.array((
+                    start_x,
+                    float(
+                        (config.SCREEN_HEIGHT / n_agents / 2) +
+                        (config.SCREEN_HEIGHT / n_agents * (i-1))
+                    )
+                )) / config.PLANE_POS_SCALE % config.WINDOW,
+                agent_description["SIZE"],
+                np.array(agent_description.get("EVADE_ZONE", (150, 30))),
+                agent_description.get("RADIUS_FOV", 150),
+                engine=engine,
+                bullet_pool=bullet_pool,
+                coverage=self.coverage,
+                team=team_number,
+                config=config
+            ))
+
+    @property
+    def score(self) -> int:
+        return int(self.table.scores[self.number])
+
+    @property
+    def targets_version(self) -> int:
+        return int(self.table.versions[self.number])
+
+    @property
+    def targets(self) -> np.ndarray:
+        version = self.targets_version
+        if self._targets_version != version:
+            self._targets = self.table.targets[
+                self.table.beliefs[self.number]
+            ]
+            self._targets_version = version
+        return self._targets
+
+    def forget_target(self, target: np.ndarray) -> None:
+        """
+        Removes `target` from the targets the team believes exist.
+
+        :param target: (np.ndarray) xy coords of the target
+        """
+        self.table.forget(self.number, target)
+
+    def _positions(self) -> np.ndarray:
+        """
+        :return: (np.ndarray) positions of all agents, shape (agents, 2)
+        """
+        return np.array(
+            [agent.center for agent in self.agents]
+        ).reshape(-1, 2)
+
+    def update_assignment(self, dt: float) -> bool:
+        """
+        Reruns `assign_targets()` only when its inputs changed: the
+        targets or the agents of the team changed, the refresh interval
+        in `config.ASSIGNMENT` passed, or an agent moved further than
+        the drift threshold since the last assignment.
+
+        :param dt: (float) time since the last call in s
+        :return: (bool) True if the targets were reassigned
+        """
+        self._since_assignment += dt
+        key = (self.targets_version, tuple(map(id, self.agents)))
+        refresh = self.config.ASSIGNMENT["REFRESH_INTERVAL"]
+        drift = self.config.ASSIGNMENT["DRIFT_THRESHOLD"]
+
+        if not (
+            key != self._assigned_key or
+            (
+                refresh is not None and
+                self._since_assignment >= refresh
+            ) or
+            (
+                drift is not None and
+                np.any(utils.wrapped_distance(
+                    self._positions(),
+                    self._assigned_positions,
+                    self.config.SCREEN_WIDTH
+                ) > drift)
+            )
+        ):
+            return False
+
+        self.assign_targets()
+        self._assigned_key = key
+        self._assigned_positions = self._positions()
+        self._since_assignment = 0.0
+        return True
+
+    def act(self, fov_list: list, dt: float) -> None:
+        """
+        Decisions of the agents after the physics step of the team.
+
+        :param fov_list: (list) field of view of every agent
+        :param dt: (float) time since the last call in s
+        """
+        for x, agent in enumerate(self.agents):
+            agent.update(dt, np.array(fov_list[x]))
 
     def assign_targets(self) -> None:
         """
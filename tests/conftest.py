@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the modules of the simulation live in the root of the repository
+sys.path.insert(
+    0,
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+
+from collision import bullet_hits
+from geometry import Box
+
+
+WIDTH = 1280
+BULLET_SIZE = 4
+
+
+def per_bullet_loop(coords, owners, victims, positions, boxes):
+    """
+    Hits the way the collision stage found them before the sweep: every
+    bullet in turn looks at every agent, then at every target, and is
+    used up by its first hit. Hit agents and targets are gone for the
+    bullets after it.
+    """
+    agents = list(range(len(victims)))
+    targets = list(range(len(boxes)))
+    hits = []
+    for i, corner in enumerate(coords):
+        center = corner + BULLET_SIZE / 2
+        hit = False
+        for j in agents:
+            if np.linalg.norm(positions[j] - center) <= 5 and \
+                    victims[j] != owners[i]:
+                agents.remove(j)
+                hits.append((i, j, -1))
+                hit = True
+                break
+        if hit:
+            continue
+        projectile = Box(*corner, BULLET_SIZE, BULLET_SIZE)
+        for j in targets:
+            x, y, w, h = boxes[j]
+            if projectile.colliderect(Box(x - w / 2, y - h / 2, w, h)):
+                targets.remove(j)
+                hits.append((i, -1, j))
+                break
+    return hits
+
+
+def scene(seed: int, n_bullets: int, n_agents: int, n_targets: int):
+    rng = np.random.default_rng(seed)
+    # away from the sides, where the old loop did not wrap
+    low, high = (200, 100), (600, 400)
+    coords = rng.uniform(low, high, (n_bullets, 2))
+    victims = rng.permutation(n_agents) + 10
+    owners = rng.choice(victims, n_bullets)
+    positions = rng.uniform(low, high, (n_agents, 2))
+    boxes = np.concatenate((
+        rng.integers(low, high, (n_targets, 2)),
+        rng.integers(8, 40, (n_targets, 2)),
+    ), axis=1).astype(float)
+    return coords, owners, victims, positions, boxes
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bullet_hits_matches_per_bullet_loop(seed):
+    coords, owners, victims, positions, boxes = scene(seed, 400, 40, 25)
+    expected = per_bullet_loop(coords, owners, victims, positions, boxes)
+    assert len(expected) > 10
+    assert bullet_hits(
+        coords + BULLET_SIZE / 2,
+        owners,
+        victims,
+        positions,
+        boxes,
+        BULLET_SIZE,
+        WIDTH
+    ) == expected
+
+
+def test_bullet_hits_without_agents_or_targets():
+    coords, owners, victims, positions, boxes = scene(0, 100, 10, 10)
+    centers = coords + BULLET_SIZE / 2
+    only_targets = bullet_hits(
+        centers,
+        owners,
+        victims[:0],
+        positions[:0],
+        boxes,
+        BULLET_SIZE,
+        WIDTH
+    )
+    assert all(victim == -1 for _, victim, _ in only_targets)
+    assert only_targets == per_bullet_loop(
+        coords,
+        owners,
+        victims[:0],
+        positions[:0],
+        boxes
+    )
+    assert bullet_hits(
+        centers,
+        owners,
+        victims,
+        positions,
+        boxes[:0],
+        BULLET_SIZE,
+        WIDTH
+    ) == per_bullet_loop(coords, owners, victims, positions, boxes[:0])
+
+
+def test_bullet_hits_across_the_edge():
+    centers = np.array([[1.0, 300.0], [WIDTH - 1.0, 100.0]])
+    owners = np.array([0, 0])
+    victims = np.array([1])
+    positions = np.array([[WIDTH - 2.0, 300.0]])
+    boxes = np.array([[2.0, 100.0, 10.0, 10.0]])
+    assert bullet_hits(
+        centers,
+        owners,
+        victims,
+        positions,
+        boxes,
+        BULLET_SIZE,
+        WIDTH
+    ) == [(0, 0, -1), (1, -1, 0)]
+
+
+def test_bullet_hits_spares_own_side():
+    centers = np.array([[300.0, 300.0], [300.0, 300.0]])
+    owners = np.array([0, 2])
+    victims = np.array([1])
+    positions = np.array([[301.0, 300.0]])
+    sides = np.array([0, 0, 1])
+    assert bullet_hits(
+        centers,
+        owners,
+        victims,
+        positions,
+        np.zeros((0, 4)),
+        BULLET_SIZE,
+        WIDTH,
+        sides=sides
+    ) == [(1, 0, -1)]
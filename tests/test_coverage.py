@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from coverage import CoverageMap
+
+
+def reference_stamp(coverage: CoverageMap, center, radius: float) -> int:
+    """
+    `CoverageMap.stamp()` done with the window test of `_disks()`.
+    """
+    cells, inside = coverage._disks(center, radius)
+    cells = np.unique(cells[inside])
+    flat = coverage.cells.reshape(-1)
+    new = np.count_nonzero(~flat[cells])
+    flat[cells] = True
+    return int(new)
+
+
+@pytest.mark.parametrize("scale", [10, 7])
+@pytest.mark.parametrize("radius", [5.0, 48.0, 150.0, 333.0])
+def test_stamp_matches_disks(scale, radius):
+    rng = np.random.default_rng(int(radius) * scale)
+    coverage = CoverageMap((1280, 720), scale)
+    reference = CoverageMap((1280, 720), scale)
+    coverage.cells[:] = reference.cells[:] = (
+        rng.random(coverage.cells.shape) < 0.3
+    )
+    centers = np.concatenate((
+        rng.uniform((0, 0), (1280, 720), (100, 2)),
+        # over the sides, where the disk wraps around
+        rng.uniform((-40, 0), (40, 720), (50, 2)),
+        rng.uniform((1240, 0), (1320, 720), (50, 2)),
+        # above and below the world, partly or not at all on the map
+        rng.uniform((0, -400), (1280, 0), (25, 2)),
+        rng.uniform((0, 720), (1280, 1100), (25, 2)),
+    ))
+    for center in centers:
+        revealed = coverage.revealed(center[None], radius)[0]
+        new = coverage.stamp(center, radius)
+        assert new == reference_stamp(reference, center, radius)
+        assert new == revealed
+        np.testing.assert_array_equal(coverage.cells, reference.cells)
+
+
+def test_stamp_on_a_map_narrower_than_the_disk():
+    coverage = CoverageMap((100, 100), 10)
+    reference = CoverageMap((100, 100), 10)
+    for center in ((5.0, 50.0), (95.0, 20.0)):
+        assert coverage.stamp(center, 45.0) == reference_stamp(
+            reference,
+            center,
+            45.0
+        )
+        np.testing.assert_array_equal(coverage.cells, reference.cells)
+
+
+def test_stamp_counts_each_cell_once():
+    coverage = CoverageMap((1280, 720), 10)
+    first = coverage.stamp((640.0, 360.0), 100.0)
+    assert first > 0
+    assert coverage.stamp((640.0, 360.0), 100.0) == 0
+    assert np.count_nonzero(coverage.cells) == first
@@ -0,0 +1,168 @@
+import numpy as np
+import pytest
+
+from collision import bullet_hits
+from config import Config
+from env import Environment, VectorEnvironment
+
+
+def three_teams(config: Config) -> list[dict]:
+    first, second = config.TEAMS[:2]
+    return [
+        {**first, "N_AGENTS": 2, "SIDE": 1},
+        {**second, "N_AGENTS": 2, "SIDE": 0},
+        {**first, "N_AGENTS": 1, "SIDE": 1, "STRATEGY": "EnergyBiddingTeam"},
+    ]
+
+
+@pytest.mark.parametrize("overrides, teams, learner", [
+    ({}, False, 0),
+    ({"FRIENDLY_FIRE": False}, False, 1),
+    ({"COLLISION": False}, False, 0),
+    ({"FRIENDLY_FIRE": False}, True, 2),
+])
+def test_vector_environment_matches_environments(overrides, teams, learner):
+    config = Config(USE_GUI=False, SIMULATION_RUNTIME=5.0, **overrides)
+    teams = three_teams(config) if teams else None
+    n_envs = 3
+    vector = VectorEnvironment(
+        n_envs,
+        teams,
+        learner=learner,
+        seed=100,
+        config=config
+    )
+    singles = [
+        Environment(teams, learner=learner, seed=100 + k, config=config)
+        for k in range(n_envs)
+    ]
+    observations = vector.reset()
+    np.testing.assert_array_equal(
+        observations,
+        [single.reset() for single in singles]
+    )
+
+    rng = np.random.default_rng(learner)
+    next_seed = 100 + n_envs
+    episodes = 0
+    for _ in range(400):
+        size = (n_envs, vector.n_agents)
+        actions = np.stack((
+            rng.uniform(-1, 1, size),
+            rng.random(size) < 0.3,
+            rng.random(size) < 0.01,
+        ), axis=2).astype(float)
+        observations, rewards, dones, info = vector.step(actions)
+        final = iter(info["final_observations"])
+        for k, single in enumerate(singles):
+            observation, reward, done, single_info = single.step(actions[k])
+            assert done == dones[k]
+            np.testing.assert_array_equal(reward, rewards[k])
+            np.testing.assert_array_equal(
+                single_info["scores"],
+                info["scores"][k]
+            )
+            np.testing.assert_array_equal(
+                single_info["alive"],
+                info["alive"][k]
+            )
+            if done:
+                episodes += 1
+                np.testing.assert_array_equal(observation, next(final))
+                observation = single.reset(next_seed)
+                next_seed += 1
+            np.testing.assert_array_equal(observation, observations[k])
+    assert episodes > 0
+
+
+def test_bullet_hits_keeps_lanes_apart():
+    rng = np.random.default_rng(0)
+    width, n_lanes = 1280, 4
+    lanes = []
+    for lane in range(n_lanes):
+        # the same scene in every lane, so every lane could hit the
+        # aircraft and targets of every other lane
+        lanes.append((
+            rng.uniform((0, 100), (width, 400), (300, 2)),
+            rng.integers(0, 20, 300) + 20 * lane,
+            np.arange(20) + 20 * lane,
+            rng.uniform((0, 100), (width, 400), (20, 2)),
+            np.concatenate((
+                rng.integers((0, 100), (width, 400), (15, 2)),
+                rng.integers(8, 40, (15, 2)),
+            ), axis=1).astype(float),
+        ))
+    expected = []
+    offsets = np.zeros(3, dtype=int)
+    for centers, owners, victims, positions, boxes in lanes:
+        for bullet, victim, struck in bullet_hits(
+            centers,
+            owners,
+            victims,
+            positions,
+            boxes,
+            4,
+            width
+        ):
+            expected.append((
+                bullet + offsets[0],
+                victim + offsets[1] if victim >= 0 else -1,
+                struck + offsets[2] if struck >= 0 else -1,
+            ))
+        offsets += (len(centers), len(victims), len(boxes))
+
+    centers, owners, victims, positions, boxes = (
+        np.concatenate(arrays) for arrays in zip(*lanes)
+    )
+    hits = bullet_hits(
+        centers,
+        owners,
+        victims,
+        positions,
+        boxes,
+        4,
+        width,
+        lanes=(
+            owners // 20,
+            victims // 20,
+            np.repeat(np.arange(n_lanes), 15),
+        )
+    )
+    assert len(expected) > 20
+    assert hits == expected
+
+
+def test_bullet_hits_follow_firing_order():
+    rng = np.random.default_rng(1)
+    centers = rng.uniform((300, 300), (340, 340), (200, 2))
+    owners = rng.integers(0, 5, 200)
+    victims = np.arange(5, 10)
+    positions = rng.uniform((300, 300), (340, 340), (5, 2))
+    boxes = np.array([[320.0, 320.0, 30.0, 30.0]])
+    sequence = rng.permutation(200)
+    expected = bullet_hits(
+        centers,
+        owners,
+        victims,
+        positions,
+        boxes,
+        4,
+        1280,
+        sequence=sequence
+    )
+    order = rng.permutation(200)
+    shuffled = bullet_hits(
+        centers[order],
+        owners[order],
+        victims,
+        positions,
+        boxes,
+        4,
+        1280,
+        sequence=sequence[order]
+    )
+    assert len(expected) > 1
+    assert [
+        (order[bullet], victim, struck)
+        for bullet, victim, struck in shuffled
+    ] == expected
@@ -0,0 +1,164 @@
+import math
+
+import numpy as np
+import pytest
+
+from config import Config
+from physics import PhysicsEngine
+
+
+class ReferenceAircraft:
+    """
+    Flight model of one aircraft the way `Aircraft.tick()` computed it
+    before the physics engine, without the sprites.
+    """
+    def __init__(self, engine: PhysicsEngine, row: int) -> None:
+        self.window_dimensions = engine.window_dimensions
+        self.pos_scale = engine.pos_scale
+        for name in (
+            "mass", "engine_force", "agility", "cl0", "cd_min", "throttle",
+            "pitch", "orientation"
+        ):
+            setattr(self, name, float(getattr(engine, name)[row]))
+        self.const_drag = float(engine.const_drag[row])
+        self.const_lift = float(engine.const_lift[row])
+        self.AoA_crit_low = engine.AoA_crit_low[row].tolist()
+        self.AoA_crit_high = engine.AoA_crit_high[row].tolist()
+        self.v = engine.v[row].copy()
+        self.pos_real = engine.pos_real[row].copy()
+        self.v_uv = engine.v_uv[row].copy()
+        self.pitch_uv = np.array([0.0, 0.0])
+        self.f_gravity = np.array([0.0, 9.81 * self.mass])
+
+    def tick(self, dt: float) -> None:
+        self.pitch_uv[0] = math.cos(-math.pi / 180 * self.pitch)
+        self.pitch_uv[1] = math.sin(-math.pi / 180 * self.pitch)
+
+        if np.linalg.norm(self.v) != 0:
+            self.v_uv = self.v / np.linalg.norm(self.v)
+
+        self.AoA_deg = (
+            math.atan2(self.pitch_uv[0], self.pitch_uv[1]) -
+            math.atan2(self.v[0], self.v[1])
+        ) * 180 / math.pi
+        if self.AoA_deg > 180:
+            self.AoA_deg -= 360
+        elif self.AoA_deg < -180:
+            self.AoA_deg += 360
+
+        f_engine = self.throttle * 0.1 * self.engine_force * self.pitch_uv
+
+        coef_lift = self.lift_curve(self.orientation * self.AoA_deg)
+        norm_lift = (
+            self.const_lift *
+            coef_lift *
+            np.linalg.norm(self.v)**2 *
+            self.orientation
+        )
+        f_lift = np.array(
+            [norm_lift * self.v_uv[1], norm_lift * -self.v_uv[0]]
+        )
+
+        coef_drag = (self.AoA_deg / (math.sqrt(40)))**2 + self.cd_min
+        norm_drag = self.const_drag * coef_drag * np.linalg.norm(self.v) ** 2
+        f_drag = -norm_drag * self.v_uv
+
+        f_res = f_engine + self.f_gravity + f_drag + f_lift
+        self.v = self.v + dt * f_res / self.mass
+        self.pos_real = self.pos_real + self.v * dt
+
+        if self.AoA_deg < self.AoA_crit_low[0]:
+            self.adjust_pitch(norm_drag * 0.0001 * dt)
+        if self.AoA_deg > self.AoA_crit_high[0]:
+            self.adjust_pitch(-norm_drag * 0.0001 * dt)
+
+        self.pos_virtual = (
+            self.pos_real * self.pos_scale % self.window_dimensions
+        )
+
+    def adjust_pitch(self, dt: float) -> None:
+        self.pitch = (self.pitch + self.agility * dt) % 360
+
+    def lift_curve(self, AoA: float) -> float:
+        if AoA < self.AoA_crit_low[0] - 1:
+            return 0.0
+        elif self.AoA_crit_low[0] - 1 <= AoA < self.AoA_crit_low[0]:
+            return self.AoA_crit_low[1] * abs(self.AoA_crit_low[0] - 1 - AoA)
+        elif self.AoA_crit_low[0] <= AoA < 0.0:
+            b = self.cl0 - self.AoA_crit_low[1]
+            c = AoA / self.AoA_crit_low[0]
+            return self.cl0 - b * c
+        elif 0.0 <= AoA < self.AoA_crit_high[0]:
+            b = self.AoA_crit_high[1] - self.cl0
+            c = AoA / self.AoA_crit_high[0]
+            return self.cl0 + b * c
+        elif self.AoA_crit_high[0] <= AoA < self.AoA_crit_high[0] + 1:
+            return self.AoA_crit_high[1] * abs(self.AoA_crit_high[0] - 1 - AoA)
+        else:
+            return 0
+
+
+def random_engine(n: int, seed: int) -> PhysicsEngine:
+    config = Config(USE_GUI=False)
+    plane = config.PLANE_I_16_REPUBLICAN
+    engine = PhysicsEngine(config.SCREEN_RESOLUTION, capacity=2, config=config)
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        engine.add(
+            plane["MASS"],
+            plane["ENGINE_FORCE"],
+            plane["AGILITY"],
+            plane["C_DRAG"],
+            plane["C_LIFT"],
+            plane["AOA_CRIT_LOW"],
+            plane["AOA_CRIT_HIGH"],
+            plane["CL0"],
+            plane["CD_MIN"],
+            rng.uniform(0, 100),
+            rng.uniform(0, 360),
+            rng.uniform(-150, 150, 2),
+            rng.uniform((0, 0), (640, 400)),
+            0
+        )
+    engine.orientation[:n] = rng.choice((-1, 1), n)
+    # one aircraft standing still keeps its velocity unit vector
+    engine.v[0] = 0
+    return engine
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_step_matches_aircraft_tick(seed):
+    n = 40
+    engine = random_engine(n, seed)
+    rng = np.random.default_rng(seed)
+    dt = Config(USE_GUI=False).DT
+    for _ in range(100):
+        references = [ReferenceAircraft(engine, row) for row in range(n)]
+        engine.step(dt)
+        for row, reference in enumerate(references):
+            reference.tick(dt)
+            np.testing.assert_allclose(engine.v[row], reference.v, rtol=1e-12)
+            np.testing.assert_allclose(
+                engine.pos_real[row],
+                reference.pos_real,
+                rtol=1e-12
+            )
+            np.testing.assert_allclose(
+                engine.pos_virtual[row],
+                reference.pos_virtual,
+                rtol=1e-12
+            )
+            assert engine.pitch[row] == pytest.approx(reference.pitch, 1e-12)
+            assert engine.AoA_deg[row] == pytest.approx(
+                reference.AoA_deg,
+                1e-12
+            )
+        engine.throttle[:n] = rng.uniform(0, 100, n)
+
+
+def test_step_selected_rows_only():
+    engine = random_engine(6, 0)
+    before = engine.pos_real[:6].copy()
+    engine.step(0.01, [1, 4])
+    moved = np.any(engine.pos_real[:6] != before, axis=1)
+    assert moved.tolist() == [False, True, False, False, True, False]
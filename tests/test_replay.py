@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from config import Config
+from world import World
+import replay
+
+
+def test_round_trip(tmp_path):
+    config = Config(USE_GUI=False)
+    world = World(seed=7, config=config)
+    path = str(tmp_path / "match.replay")
+    expected = []
+    with replay.Recorder(path, world, seed=7) as recorder:
+        for _ in range(900):
+            world.step(config.DT)
+            recorder.record()
+            engine = world.engine
+            n = engine.size
+            pool = world.bullet_pool
+            expected.append({
+                "time": world.time,
+                "scores": list(world.scores),
+                "alive": engine.active[:n].copy(),
+                "x": engine.center[:n, 0].astype(np.float32),
+                "y": engine.center[:n, 1].astype(np.float32),
+                "pitch": engine.pitch[:n].astype(np.float32),
+                "orientation": engine.orientation[:n].copy(),
+                "targets": len(world.targets),
+                "bullets": np.trunc(pool.coords[:pool.count]),
+            })
+            if not world.running:
+                break
+
+    played = replay.Replay(path)
+    assert played.header["seed"] == 7
+    assert played.header["bullet_capacity"] == replay.max_bullets(world)
+    assert len(played) == recorder.ticks == len(expected)
+    assert any(len(tick["bullets"]) for tick in expected)
+    for record, tick in zip(played.ticks, expected):
+        assert record["time"] == tick["time"]
+        assert record["scores"].tolist() == tick["scores"]
+        np.testing.assert_array_equal(record["alive"], tick["alive"])
+        np.testing.assert_array_equal(record["x"], tick["x"])
+        np.testing.assert_array_equal(record["y"], tick["y"])
+        np.testing.assert_array_equal(record["pitch"], tick["pitch"])
+        np.testing.assert_array_equal(
+            record["orientation"],
+            tick["orientation"]
+        )
+        assert record["targets"].sum() == tick["targets"]
+        assert record["n_bullets"] == len(tick["bullets"])
+        np.testing.assert_array_equal(
+            record["bullets"][:record["n_bullets"]],
+            tick["bullets"]
+        )
+
+
+def test_failed_match_leaves_no_file(tmp_path):
+    world = World(seed=0, config=Config(USE_GUI=False))
+    path = tmp_path / "failed.replay"
+    with pytest.raises(RuntimeError):
+        with replay.Recorder(str(path), world) as recorder:
+            recorder.record()
+            raise RuntimeError("match failed")
+    assert not path.exists()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.replay"
+    path.write_bytes(b"not a replay")
+    with pytest.raises(ValueError):
+        replay.Replay(str(path))
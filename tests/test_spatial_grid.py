@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from config import Config
+from spatial_grid import SpatialGrid
+from world import World
+import utils
+
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def brute_force(points: np.ndarray, center, radius: float) -> np.ndarray:
+    """
+    Every point closer than `radius` to `center`, wrapping around the
+    left and right side of the world.
+    """
+    delta = np.abs(points - center)
+    dx = delta[:, 0] % WIDTH
+    dx = np.minimum(dx, WIDTH - dx)
+    return np.flatnonzero(dx**2 + delta[:, 1]**2 < radius**2)
+
+
+@pytest.mark.parametrize("cell_size", [37.0, 150.0, 700.0, 2000.0])
+def test_query_matches_brute_force(cell_size):
+    rng = np.random.default_rng(int(cell_size))
+    # points also above and below the screen, where the grid clamps
+    points = rng.uniform((0, -100), (WIDTH, HEIGHT + 100), (500, 2))
+    grid = SpatialGrid(WIDTH, HEIGHT, cell_size)
+    grid.build(points)
+    centers = np.concatenate((
+        rng.uniform((0, -50), (WIDTH, HEIGHT + 50), (200, 2)),
+        # close to the left and right edge, where queries wrap
+        rng.uniform((-30, 0), (30, HEIGHT), (50, 2)) % (WIDTH, HEIGHT),
+        rng.uniform((WIDTH - 30, 0), (WIDTH, HEIGHT), (50, 2)),
+    ))
+    for center in centers:
+        for radius in (5.0, 80.0, 150.0, 700.0):
+            np.testing.assert_array_equal(
+                grid.query(center, radius),
+                brute_force(points, center, radius)
+            )
+
+
+def test_query_empty_grid():
+    grid = SpatialGrid(WIDTH, HEIGHT, 100)
+    assert len(grid.query((10.0, 10.0), 50)) == 0
+
+
+def test_query_across_the_edge():
+    grid = SpatialGrid(WIDTH, HEIGHT, 100)
+    grid.build(np.array([[2.0, 300.0], [WIDTH - 2.0, 300.0], [640.0, 300.0]]))
+    assert grid.query((WIDTH - 5.0, 300.0), 10).tolist() == [0, 1]
+    assert grid.query((3.0, 300.0), 10).tolist() == [0, 1]
+
+
+def test_check_surround_grid_matches_brute_force():
+    config = Config(USE_GUI=False, TARGET={"TARGET_COUNT": 30})
+    world = World(seed=3, config=config)
+    rng = np.random.default_rng(3)
+    rows = [agent.index for agent in world.agents_all]
+    world.engine.pos_virtual[rows] = rng.uniform(
+        (0, 0),
+        config.SCREEN_RESOLUTION,
+        (len(rows), 2)
+    )
+    target_index = SpatialGrid(WIDTH, HEIGHT, world.fov_radius)
+    agent_index = SpatialGrid(WIDTH, HEIGHT, world.fov_radius)
+    target_index.build(np.array([target.coords for target in world.targets]))
+    agent_index.build(world.engine.pos_virtual[rows])
+    for agent in world.agents_all:
+        for radius in (agent.radius_fov, 400):
+            assert utils.check_surround(
+                agent,
+                world.targets,
+                world.agents_all,
+                radius,
+                target_index,
+                agent_index
+            ) == utils.check_surround(
+                agent,
+                world.targets,
+                world.agents_all,
+                radius
+            )
@@ -0,0 +1,365 @@
+"""
+Round-robin tournament between team strategies.
+
+    python tournament.py
+    python tournament.py --seeds 20 --database results.sqlite
+
+Every entrant, a strategy from `settings.TOURNAMENT["STRATEGIES"]` flying
+a plane from `settings.TOURNAMENT["PLANES"]`, plays every other entrant
+from both sides with every seed. Results are appended to a SQLite
+database as matches finish. Running the tournament again only plays the
+matches that are not in the database yet, so an interrupted tournament
+resumes where it stopped. Every result is stored with a hash of the two
+team descriptions, the settings and the source code, see `config_key()`;
+matches played with other settings or code are played again and left
+out of the standings.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import sqlite3
+from typing import Iterator
+
+import batch_runner
+import sweep
+from config import Config
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    team_0 TEXT NOT NULL,
+    team_1 TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    score_0 INTEGER NOT NULL,
+    score_1 INTEGER NOT NULL,
+    time REAL NOT NULL,
+    config TEXT NOT NULL,
+    PRIMARY KEY (team_0, team_1, seed, config)
+)
+"""
+
+
+def entrants(
+        strategies: list[str],
+        planes: dict[str, dict],
+        n_agents: int
+    ) -> dict[str, dict]:
+    """
+    Every strategy flying every plane.
+
+    :param strategies: names of classes in `world.STRATEGIES` (list[str])
+    :param planes: plane descriptions by name (dict[str, dict])
+    :param n_agents: number of agents per team (int)
+    :return: team description by entrant name (dict[str, dict])
+    """
+    return {
+        f"{strategy} ({plane_name})": {
+            "STRATEGY": strategy,
+            "N_AGENTS": n_agents,
+            "PLANE": plane,
+        }
+        for strategy in strategies
+        for plane_name, plane in planes.items()
+    }
+
+
+def schedule(names: list[str], seeds: range) -> list[tuple[str, str, int]]:
+    """
+    Every pairing of two entrants, with each of them as team 0 (starting
+    on the left) once, for every seed.
+
+    :param names: entrant names (list[str])
+    :param seeds: seeds every pairing plays (range)
+    :return: team 0, team 1 and seed of every match
+     (list[tuple[str, str, int]])
+    """
+    return [
+        (team_0, team_1, seed)
+        for a, b in itertools.combinations(names, 2)
+        for team_0, team_1 in ((a, b), (b, a))
+        for seed in seeds
+    ]
+
+
+def config_key(team_descriptions: list[dict], config: Config) -> str:
+    """
+    Hash of everything but the seed that decides the outcome of a
+    match, built like `sweep.cache_key()`: the team descriptions, every
+    setting of `config` that affects a match and `sweep.code_version()`.
+
+    :param team_descriptions: teams of the match (list[dict])
+    :param config: configuration of the match (Config)
+    :return: hex digest (str)
+    """
+    content = json.dumps(
+        {
+            "teams": team_descriptions,
+            "settings": sweep.match_settings(config),
+            "code": sweep.code_version(),
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def pairing_keys(
+        teams: dict[str, dict],
+        config: Config
+    ) -> dict[tuple[str, str], str]:
+    """
+    :param teams: team description by entrant name (dict[str, dict])
+    :param config: configuration of every match (Config)
+    :return: `config_key()` of every pairing by team 0 and team 1
+     (dict[tuple[str, str], str])
+    """
+    return {
+        (team_0, team_1): config_key([teams[team_0], teams[team_1]], config)
+        for team_0, team_1 in itertools.permutations(teams, 2)
+    }
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Opens the results database, creating it if needed.
+
+    :param path: path of the database file (str)
+    :return: connection (sqlite3.Connection)
+    """
+    connection = sqlite3.connect(path)
+    connection.execute(SCHEMA)
+    columns = [
+        row[1] for row in connection.execute("PRAGMA table_info(matches)")
+    ]
+    if "config" not in columns:
+        connection.close()
+        raise ValueError(
+            f"{path} has no config column, it was written by an older "
+            "version of tournament.py; use a new database"
+        )
+    return connection
+
+
+def finished(
+        connection: sqlite3.Connection,
+        keys: dict[tuple[str, str], str]
+    ) -> set[tuple[str, str, int]]:
+    """
+    :param connection: results database (sqlite3.Connection)
+    :param keys: config key of every pairing, see `pairing_keys()`
+     (dict[tuple[str, str], str])
+    :return: team 0, team 1 and seed of every stored match that was
+     played with the config key of its pairing
+     (set[tuple[str, str, int]])
+    """
+    return {
+        (team_0, team_1, seed)
+        for team_0, team_1, seed, config in connection.execute(
+            "SELECT team_0, team_1, seed, config FROM matches"
+        )
+        if keys.get((team_0, team_1)) == config
+    }
+
+
+def _store(connection: sqlite3.Connection, rows: list[tuple]) -> None:
+    """
+    Appends match results in one transaction.
+
+    :param connection: results database (sqlite3.Connection)
+    :param rows: rows of the matches table (list[tuple])
+    :return: None
+    """
+    if not rows:
+        return
+    with connection:
+        connection.executemany(
+            "INSERT OR IGNORE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+
+def _play(job: tuple[str, str, int, list[dict], Config, str]) -> tuple:
+    """
+    Runs one tournament match headless.
+
+    :param job: team 0, team 1, seed, the two team descriptions, the
+     configuration and the config key
+     (tuple[str, str, int, list[dict], Config, str])
+    :return: row of the matches table (tuple)
+    """
+    team_0, team_1, seed, team_descriptions, config, key = job
+    result = batch_runner.run_match(
+        seed,
+        team_descriptions,
+        config=config
+    )
+    score_0, score_1 = result["scores"]
+    return team_0, team_1, seed, score_0, score_1, result["time"], key
+
+
+def run_tournament(
+        teams: dict[str, dict],
+        seeds: range,
+        database: str,
+        workers: int = None,
+        commit_every: int = 20,
+        config: Config = None
+    ) -> Iterator[tuple]:
+    """
+    Plays every match of the round-robin between `teams` that is not in
+    `database` yet with the config key of its pairing, see
+    `config_key()`, over a pool of worker processes, and yields the
+    result of every match as soon as it finishes. Results are written
+    `commit_every` at a time, and whatever is left when the tournament
+    ends or is interrupted.
+
+    :param teams: team description by entrant name, see `entrants()`
+     (dict[str, dict])
+    :param seeds: seeds every pairing plays (range)
+    :param database: path of the results database (str)
+    :param workers: number of worker processes, all cores if None and
+     in-process if 1 (int)
+    :param commit_every: results written per transaction (int)
+    :param config: configuration of every match, the current settings
+     if None (Config)
+    :return: iterator over rows of the matches table: team 0, team 1,
+     seed, score 0, score 1, simulated time and config key
+     (Iterator[tuple])
+    """
+    if config is None:
+        config = Config()
+    keys = pairing_keys(teams, config)
+    connection = connect(database)
+    done = finished(connection, keys)
+    jobs = [
+        (
+            team_0, team_1, seed, [teams[team_0], teams[team_1]], config,
+            keys[team_0, team_1]
+        )
+        for team_0, team_1, seed in schedule(list(teams), seeds)
+        if (team_0, team_1, seed) not in done
+    ]
+
+    rows = []
+    pool = None
+    try:
+        if workers == 1:
+            results = map(_play, jobs)
+        else:
+            pool = multiprocessing.Pool(workers)
+            results = pool.imap_unordered(_play, jobs)
+        for row in results:
+            rows.append(row)
+            if len(rows) >= commit_every:
+                _store(connection, rows)
+                rows = []
+            yield row
+    finally:
+        _store(connection, rows)
+        connection.close()
+        if pool is not None:
+            pool.terminate()
+
+
+def standings(
+        database: str,
+        keys: dict[tuple[str, str], str] = None
+    ) -> list[tuple]:
+    """
+    Results of every entrant over the matches in `database`, best
+    first: most wins, then most points.
+
+    :param database: path of the results database (str)
+    :param keys: config key of every pairing, see `pairing_keys()`;
+     only matches played with the key of their pairing count, all
+     matches if None (dict[tuple[str, str], str])
+    :return: name, matches, wins, draws, losses, points and points per
+     match of every entrant (list[tuple])
+    """
+    connection = connect(database)
+    try:
+        connection.execute(
+            "CREATE TEMP TABLE current (team_0, team_1, config)"
+        )
+        if keys is None:
+            connection.execute(
+                "INSERT INTO current "
+                "SELECT DISTINCT team_0, team_1, config FROM matches"
+            )
+        else:
+            connection.executemany(
+                "INSERT INTO current VALUES (?, ?, ?)",
+                [(*pairing, key) for pairing, key in keys.items()]
+            )
+        return connection.execute("""
+            WITH played AS (
+                SELECT * FROM matches
+                JOIN current USING (team_0, team_1, config)
+            ),
+            results (entrant, own, other) AS (
+                SELECT team_0, score_0, score_1 FROM played
+                UNION ALL
+                SELECT team_1, score_1, score_0 FROM played
+            )
+            SELECT
+                entrant,
+                COUNT(*),
+                SUM(own > other),
+                SUM(own = other),
+                SUM(own < other),
+                SUM(own),
+                AVG(own)
+            FROM results
+            GROUP BY entrant
+            ORDER BY SUM(own > other) DESC, SUM(own) DESC
+        """).fetchall()
+    finally:
+        connection.close()
+
+
+def main(argv: list[str] = None) -> int:
+    config = Config()
+    tournament = config.TOURNAMENT
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--seeds", type=int, default=tournament["SEEDS"],
+        help="seeds per pairing and side, starting at SEED"
+    )
+    parser.add_argument("--database", default=tournament["DATABASE"])
+    parser.add_argument(
+        "--workers", type=int, default=config.WORKERS,
+        help="worker processes, all cores if not given"
+    )
+    args = parser.parse_args(argv)
+
+    teams = entrants(
+        tournament["STRATEGIES"],
+        tournament["PLANES"],
+        tournament["N_AGENTS"]
+    )
+    seeds = range(config.SEED, config.SEED + args.seeds)
+    for team_0, team_1, seed, score_0, score_1, *_ in run_tournament(
+        teams,
+        seeds,
+        args.database,
+        args.workers,
+        tournament["COMMIT_EVERY"],
+        config
+    ):
+        print(f"{team_0} vs {team_1}, seed {seed}: {score_0} - {score_1}")
+
+    print(f"\n{'entrant':40}{'played':>8}{'won':>6}{'drawn':>7}"
+          f"{'lost':>6}{'points':>8}{'per match':>11}")
+    for name, played, won, drawn, lost, points, mean in standings(
+        args.database,
+        pairing_keys(teams, config)
+    ):
+        print(f"{name:40}{played:>8}{won:>6}{drawn:>7}{lost:>6}"
+              f"{points:>8}{mean:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
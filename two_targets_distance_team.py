@@ -1,10 +1,13 @@
 import numpy as np
-from munkres import Munkres
 
-from team import Team
+from team import Team, TeamTable
 from agent import Agent
+from physics import PhysicsEngine
+from bullet import BulletPool
+from config import Config
 
-import settings
+import assignment
+import utils
 
 
 class TwoTargetsTeam(Team):
@@ -14,13 +17,20 @@ class TwoTargetsTeam(Team):
 
     + targets (list[tuple[float, float]]) all targets xy coords
     + agents (list[Agent]) list with all existing agents for team
+    + _pair_distances (np.ndarray) cached target to target distances
+    + _nearest_other (np.ndarray) cached distance from every target to
+    the nearest other target
     """
     def __init__(
         self, 
         targets: list[tuple[float, float]],
         n_agents: int,
         agent_description: dict,
-        team_number: int
+        team_number: int,
+        engine: PhysicsEngine = None,
+        bullet_pool: BulletPool = None,
+        table: TeamTable = None,
+        config: Config = None
     ) -> None:
         """
         Constructor for TwoTargetsTeam.
@@ -45,14 +55,29 @@ class TwoTargetsTeam(Team):
         - CD_MIN
         - INIT_THROTTLE
         - INIT_V
-        :param team_number: (int) number of team, 
-        1 starts on the left, 2 starts on the right (facing left)
+        :param team_number: (int) number of team, starts at 0, see
+        `team.spawn_point()` for where the team starts
+        :param engine: (PhysicsEngine) physics engine shared by all
+        aircraft in the world, every agent gets its own if None
+        :param bullet_pool: (BulletPool) pool shared by all bullets in
+        the world, every agent gets its own if None
+        :param table: (TeamTable) state of all teams in the world, the
+        team gets its own if None
+        :param config: (Config) configuration of the match, the current
+        settings if None
         """
+        # cached target to target distances, see `_build_target_cache()`
+        self._cache_version = None
+
         super().__init__(
             targets,
             n_agents,
             agent_description,
-            team_number
+            team_number,
+            engine,
+            bullet_pool,
+            table,
+            config
         )
         
         self.assign_targets()
@@ -75,45 +100,69 @@ class TwoTargetsTeam(Team):
         """
         dx = min(
                 abs(target[0] - startpoint[0]), 
-                settings.SCREEN_WIDTH - abs(target[0] - startpoint[0])
+                self.config.SCREEN_WIDTH - abs(target[0] - startpoint[0])
             )
         dy = abs(target[1] - startpoint[1])
         return np.sqrt(dx**2 + dy**2)
         
 
-    def _calculate_path(
-            self, 
-            target : tuple[float, float], 
-            agent : Agent, 
-            targets :list[tuple[float, float]]
-        ) -> float:
+    def _build_target_cache(self) -> None:
         """
-        This function bets on a target by calculating the shortest 
-        distance between the agent and two targets.
-
-        :param target: target to be bet on (target.Target)
-        :param agent: agent that bets on the target (agent.Agent)
-        :param targets: list of targets (list[target.Target])
+        Builds the cached target to target distance matrix and, for
+        every target, the distance to the nearest other target.
+        Targets at the same coords do not count as other targets.
+        """
+        distances = utils.wrapped_distance(
+            self.targets[:, None, :],
+            self.targets[None, :, :],
+            self.config.SCREEN_WIDTH
+        )
+        distances[np.all(
+            self.targets[:, None, :] == self.targets[None, :, :],
+            axis=2
+        )] = np.inf
+        self._pair_distances = distances
+        self._nearest_index = np.zeros(len(self.targets), dtype=int)
+        if len(self.targets) > 0:
+            self._nearest_index = np.argmin(distances, axis=1)
+        self._update_nearest_other()
+
+    def _update_nearest_other(self) -> None:
+        """
+        Fills `_nearest_other` from `_nearest_index`. A target without
+        other targets adds nothing to the path.
+        """
+        nearest = self._pair_distances[
+            np.arange(len(self._nearest_index)),
+            self._nearest_index
+        ]
+        nearest[np.isinf(nearest)] = 0
+        self._nearest_other = nearest
+        self._cache_version = self.targets_version
+
+    def forget_target(self, target: np.ndarray) -> None:
+        """
+        Removes `target` from the targets the team believes exist and
+        updates the cached distances incrementally: only targets whose
+        nearest other target was removed are searched again.
 
-        :return: the shortest distance between the agent 
-        and two targets.
+        :param target: (np.ndarray) xy coords of the target
         """
-        distance_dict = {}
-        agent_pos = agent.rot_rect.center 
-        agent_to_target_distance = self._calculate_distance(agent_pos, target)
-        if len(targets) == 1:
-            return agent_to_target_distance
-        # When there are no targets there is no need 
-        # to calculate a distance
-        if len(targets) == 0:
-            return 0
-
-        for target2 in targets:
-            if target[0] != target2[0] or target[1] != target2[1]:
-                distance = self._calculate_distance(target, target2)
-                total_distance = agent_to_target_distance + distance 
-                distance_dict[total_distance] = (target, target2)
-        return min(distance_dict.keys())
+        keep = ~np.all(self.targets == target, axis=1)
+        cache_valid = self._cache_version == self.targets_version
+        super().forget_target(target)
+        if not cache_valid:
+            return
+
+        self._pair_distances = self._pair_distances[keep][:, keep]
+        new_index = np.cumsum(keep) - 1
+        nearest = self._nearest_index[keep]
+        stale = ~keep[nearest]
+        nearest = new_index[nearest]
+        if np.any(stale):
+            nearest[stale] = np.argmin(self._pair_distances[stale], axis=1)
+        self._nearest_index = nearest
+        self._update_nearest_other()
 
     def assign_targets(self) -> None:
         """
@@ -123,21 +172,26 @@ class TwoTargetsTeam(Team):
         
         if there are no targets or agents, the function returns.
         """
-        distances = np.zeros((len(self.agents), len(self.targets)))
         if len(self.targets) == 0 or len(self.agents) == 0:
             return
-        # calculate distances for bidding for agents.
-        for i, agent in enumerate(self.agents):
+        if self._cache_version != self.targets_version:
+            self._build_target_cache()
+        for agent in self.agents:
             agent.target = None
-            for j, target in enumerate(self.targets):
-                distances[i, j] = self._calculate_path(target, agent, self.targets)
-
-        # calculate targets
-        mukres = Munkres()
-        assigned_info = mukres.compute(distances.tolist())
 
-        # assign targets
-        for i, j in assigned_info:
+        # calculate distances for bidding for agents: agent to target
+        # plus target to the nearest other target
+        distances = utils.wrapped_distance(
+            self._positions()[:, None, :],
+            self.targets[None, :, :],
+            self.config.SCREEN_WIDTH
+        ) + self._nearest_other[None, :]
+
+        # calculate and assign targets
+        for i, j in assignment.solve(
+            distances,
+            self.config.ASSIGNMENT_BACKEND
+        ):
             self.agents[i].target = self.targets[j]
 
     def __str__(self) -> str:
@@ -1,107 +1,101 @@
-import settings
+import random
+
 import pygame
 import numpy as np
 
 import agent
-import aircraft
 import bullet as bullet
 import target
+from spatial_grid import SpatialGrid
+from config import Config
 
 
-def hit_detection_and_move_projectiles(
-        targets: target.Target,
-        agents: list[agent.Agent],
-        current_agent: agent.Agent,
-        dt: float
-    ) -> None:
+def hit_detection_agents(
+        centers: np.ndarray,
+        alive: np.ndarray,
+        distance: float
+    ) -> np.ndarray:
     """
-    This function checks if a bullet hits a target.
-    
-    :param targets: list of target (list[target.Target])
-    :param agents: list of agents (list[agent.Agent])
-    :param current_agent: current agent (agent.Agent)
-    :param dt: time step (float)
-    :return: None
+    This function checks which agents hit another agent, in any number
+     of worlds at once. Agents only hit agents of their own world.
+
+    :param centers: centre of every agent per world, shape (K, N, 2)
+     (np.ndarray)
+    :param alive: True for the agents that can collide, shape (K, N)
+     (np.ndarray)
+    :param distance: agents closer than this collide (float)
+    :return: True for every agent that hit another one, shape (K, N)
+     (np.ndarray)
     """
-    dead_agents = []
-
-    for projectile in current_agent.bullets:
-        if projectile.move_bullet(dt):
-            current_agent.bullets.remove(projectile)
-            continue
-        if settings.COLLISION:
-            for agent in agents:
-                if np.linalg.norm(np.array(agent.rot_rect.center) - \
-                   np.array(projectile.rect.center)) <= 5 and \
-                   agent != current_agent:
-                    current_agent.bullets.remove(projectile)
-                    dead_agents.append(agent)
-                    agents.remove(agent)
-                    continue
-        for target in targets:
-            if projectile.rect.colliderect(target.rect):
-                current_agent.bullets.remove(projectile)
-                targets.remove(target)
-                current_agent.score += 1
-                continue
-    return dead_agents
+    delta = centers[:, :, None, :] - centers[:, None, :, :]
+    near = (
+        np.sqrt(
+            delta[..., 0] * delta[..., 0] + delta[..., 1] * delta[..., 1]
+        ) < distance
+    ) & alive[:, :, None] & alive[:, None, :]
+    diagonal = np.arange(alive.shape[1])
+    near[:, diagonal, diagonal] = False
+    return np.any(near, axis=2)
 
 
-def hit_detection_agents(
-        agents: list[agent.Agent],
-    ) -> None:
-    """
-    This function checks if an agent hits another agent
-    
-    :param agents: list of agents (list[agent.Agent])
-    :return: None
-    """
-    for agent1 in agents:
-        for agent2 in agents:
-            if agent1 != agent2:
-                if np.linalg.norm(np.array(agent1.rot_rect.center) \
-                - np.array(agent2.rot_rect.center) 
-                ) < 24:
-                    agents.remove(agent1)
-                    agents.remove(agent2)
-                
-                
 def hit_collision_agents(
-        targets: list[target.Target],
-        player: aircraft.Aircraft
-    ) -> bool:
+        centers: np.ndarray,
+        alive: np.ndarray,
+        targets: np.ndarray,
+        present: np.ndarray
+    ) -> np.ndarray:
     """
-    This function checks if the player hits a target. If a player
-     hits a target, the function returns True.
+    This function checks which agents hit a target, in any number of
+     worlds at once. Agents only hit targets of their own world.
 
-    :param targets: list of target (list[target.Target])
-    :param player: player object (aircraft.Aircraft)
-    :return: bool
+    :param centers: centre of every agent per world, shape (K, N, 2)
+     (np.ndarray)
+    :param alive: True for the agents that can collide, shape (K, N)
+     (np.ndarray)
+    :param targets: centre of every target per world, shape (K, T, 2)
+     (np.ndarray)
+    :param present: True for the targets that exist, shape (K, T)
+     (np.ndarray)
+    :return: True for every agent that hit a target, shape (K, N)
+     (np.ndarray)
     """
-    for target in targets:
-        if np.linalg.norm(
-            np.array(player.rot_rect.center) - target.rect.center
-        ) < 10:
-            return True
-    return False
-     
+    delta = targets[:, None, :, :] - centers[:, :, None, :]
+    return alive & np.any(
+        (
+            np.sqrt(
+                delta[..., 0] * delta[..., 0] + delta[..., 1] * delta[..., 1]
+            ) < 10
+        ) & present[:, None, :],
+        axis=2
+    )
+
+
 def create_targets(
         targets: list[target.Target],
-        ground_height: int
+        ground_height: int,
+        rng: random.Random = None,
+        config: Config = None
     ) -> list[target.Target]:
     """
     This function generates new targets if the number of targets is 
-     less than the defined amount in settings.py. Ground height is used
+     less than TARGET_COUNT of the configuration. Ground height is used
      to spawn targets above the ground.
     
     :param targets: list of target (list[target.Target])
     :param ground_height: height of the ground (int)
+    :param rng: random number generator the positions are drawn from,
+     the global one if None (random.Random)
+    :param config: configuration, the current settings if None (Config)
     :return: list of target (list[target.Target])
     """
-    if len(targets) < settings.TARGET["TARGET_COUNT"]:
+    if config is None:
+        config = Config()
+    if len(targets) < config.TARGET["TARGET_COUNT"]:
         new_targets = target.load_single_type_targets(
             ground_height,
-            settings.TARGET["TARGET_COUNT"] - len(targets)
+            config.TARGET["TARGET_COUNT"] - len(targets),
+            rng,
+            config
         )
         new_targets.extend(targets)
         return new_targets
@@ -127,89 +121,154 @@ def display_targets(
 
 
 def display_projectiles(
-        agents: list[agent.Agent],
+        bullet_pool: bullet.BulletPool,
         screen: pygame.Surface
     ) -> None:
     """
     This function displays the bullets on the screen.
 
     @Parameters:
-    :param projectiles: list of bullets (list[bullet.Bullet])
+    :param bullet_pool: bullets of all agents (bullet.BulletPool)
     :param screen: screen (pygame.Surface)
     :return: None
     """
-    for agent in agents:
-        for bullet in agent.bullets:
-            screen.blit(
-                pygame.transform.flip(
-                    bullet.sprite,
-                    True, 
-                    False
-                    ), 
-                bullet.coords
-            )
+    for coords in bullet_pool.coords[:bullet_pool.count]:
+        screen.blit(bullet_pool.sprite, coords)
+
+
+def wrapped_distance(
+        a: np.ndarray,
+        b: np.ndarray,
+        width: float
+    ) -> np.ndarray:
+    """
+    This function calculates the distance between points, wrapping
+     around the left and right side of the screen.
+
+    :param a: point(s), shape (2,) or (n, 2) (np.ndarray)
+    :param b: point(s), shape (2,) or (n, 2) (np.ndarray)
+    :param width: width of the world (float)
+    :return: distance(s) (np.ndarray)
+    """
+    delta = np.abs(np.asarray(a, dtype=float) - b)
+    dx = delta[..., 0] % width
+    dx = np.minimum(dx, width - dx)
+    return np.sqrt(dx**2 + delta[..., 1]**2)
+
+
+def wrapped_delta(
+        delta: np.ndarray,
+        width: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    This function wraps differences between points around the left and
+     right side of the screen, computed the way `SpatialGrid.query()`
+     does.
+
+    :param delta: differences between points, shape (..., 2)
+     (np.ndarray)
+    :param width: width of the world (float)
+    :return: absolute x and y differences (tuple[np.ndarray, np.ndarray])
+    """
+    delta = np.abs(delta)
+    dx = delta[..., 0] % width
+    return np.minimum(dx, width - dx), delta[..., 1]
+
+
+def in_sight(
+        positions: np.ndarray,
+        radius: np.ndarray,
+        points: np.ndarray,
+        present: np.ndarray,
+        width: float
+    ) -> np.ndarray:
+    """
+    This function checks which points every observer sees, in any
+     number of worlds at once, wrapping around the left and right side
+     of the screen. Observers only see the points of their own world.
+
+    :param positions: positions of the observers per world, shape
+     (K, A, 2) (np.ndarray)
+    :param radius: field of view radius of every observer, shape (K, A)
+     (np.ndarray)
+    :param points: points per world, shape (K, P, 2) (np.ndarray)
+    :param present: True for the points that exist, shape (K, P)
+     (np.ndarray)
+    :param width: width of the world (float)
+    :return: True where observer a of world k sees point p, shape
+     (K, A, P) (np.ndarray)
+    """
+    dx, dy = wrapped_delta(
+        points[:, None, :, :] - positions[:, :, None, :],
+        width
+    )
+    return (
+        dx**2 + dy**2 < radius[..., None] ** 2
+    ) & present[:, None, :]
 
 
 def check_surround(
         current_agent: agent.Agent, 
         targets: list[target.Target], 
         agents : list[agent.Agent],
-        fov_radius: int
+        fov_radius: int,
+        target_index: SpatialGrid = None,
+        agent_index: SpatialGrid = None
     ) -> list: 
     """
     This function checks the surrounding of the agent and returns a 
-     list of all nearby targets.
+     list of all nearby targets and agents, wrapping around the left
+     and right side of the screen. Targets come first, both in list
+     order.
+
+    When an index is given, it must have been built from the
+     coordinates of `targets` or the positions of `agents`, in list
+     order, and is used instead of looking at every entity.
 
     :param player: player object (agent.Agent)
     :param targets: list of targets (list[TARGET.TARGET])
     :agents: list of agents (list[agent.Agent])
     :param fov_radius: field of view radius (int)
-    :return: list of targets (list[TARGET.TARGET])
+    :param target_index: index over `targets` (SpatialGrid)
+    :param agent_index: index over `agents` (SpatialGrid)
+    :return: list of [x, y, 1] rows (list[list[float]])
     """
     fov = []
-    for target in targets:
-        if(
-            np.linalg.norm(target.coords - current_agent.pos_virtual) < 
-            fov_radius
-        ):
-            fov.append([target.coords[0], target.coords[1], 1])
-        # check if fov_radius circle moves 
-        #  out of frame on the right side of the screen
-        elif(
-            current_agent.pos_virtual[0] + fov_radius > 
-            settings.SCREEN_WIDTH
-        ):
-            # place circle outside of the screen on the left
-            if(
-                np.linalg.norm(
-                    target.coords - (
-                        settings.SCREEN_WIDTH - (
-                            current_agent.pos_virtual[0] + 
-                            fov_radius
-                        ), 
-                        current_agent.pos_virtual[1]
-                    )
-                ) < 
-                fov_radius
-            ):
-                fov.append([target.coords[0], target.coords[1], 1])
-        # check if fov_radius circle moves 
-        #  out of frame on the left side of the screen
-        elif(current_agent.pos_virtual[0] - fov_radius < 0):
-            # place circle outside of the screen on the right
-            if(
-                np.linalg.norm(
-                    target.coords - (
-                        settings.SCREEN_WIDTH + 
-                        current_agent.pos_virtual[0],
-                        current_agent.pos_virtual[1]
-                    )
-                ) < 
-                fov_radius
-            ):
-                fov.append([target.coords[0], target.coords[1], 1])
-    for agent in agents:
-        if(np.linalg.norm(agent.pos_virtual - current_agent.pos_virtual) < fov_radius) \
-            and agent != current_agent:
-            fov.append([agent.pos_virtual[0], agent.pos_virtual[1], 1])
+    position = current_agent.pos_virtual
+    width = current_agent.config.SCREEN_WIDTH
+
+    if target_index is not None:
+        seen = target_index.query(position, fov_radius)
+    elif len(targets) > 0:
+        seen = np.flatnonzero(in_sight(
+            position[None, None],
+            np.array([[fov_radius]]),
+            np.array([[target.coords for target in targets]], dtype=float),
+            np.ones((1, len(targets)), dtype=bool),
+            width
+        ))
+    else:
+        seen = []
+    for i in seen:
+        fov.append([targets[i].coords[0], targets[i].coords[1], 1])
+
+    if agent_index is not None:
+        seen = agent_index.query(position, fov_radius)
+    elif len(agents) > 0:
+        seen = np.flatnonzero(in_sight(
+            position[None, None],
+            np.array([[fov_radius]]),
+            np.array([[agent.pos_virtual for agent in agents]]),
+            np.ones((1, len(agents)), dtype=bool),
+            width
+        ))
+    else:
+        seen = []
+    for i in seen:
+        if agents[i] is not current_agent:
+            fov.append([
+                agents[i].pos_virtual[0],
+                agents[i].pos_virtual[1],
+                1
+            ])
     return fov
@@ -0,0 +1,669 @@
+import random
+from itertools import chain
+import numpy as np
+
+from config import Config
+from absolute_distance_team import AbsoluteDistanceTeam
+from energy_bidding_team import EnergyBiddingTeam
+from two_targets_distance_team import TwoTargetsTeam
+from controlled_team import ControlledTeam
+from physics import PhysicsEngine
+from bullet import BulletPool
+from profiler import Profiler, NULL_PROFILER
+from team import TeamTable
+import collision
+import ground
+import utils
+
+
+STRATEGIES = {
+    team_class.__name__: team_class for team_class in (
+        AbsoluteDistanceTeam,
+        TwoTargetsTeam,
+        EnergyBiddingTeam,
+        ControlledTeam,
+    )
+}
+
+
+class World:
+    """
+    One match: the ground, the targets, the teams and the physics
+    engine their aircraft share. `step()` advances the whole simulation
+    by one tick; drawing is left to the caller.
+
+    + config: (Config) configuration of the match
+    + team_descriptions: (list[dict]) descriptions the teams were
+     built from
+    + floor: (ground.Ground) ground
+    + targets: (list[target.Target]) targets that are still alive
+    + engine: (PhysicsEngine) physics engine shared by all aircraft,
+     and by other worlds if it was passed in
+    + bullet_pool: (BulletPool) all bullets in flight, and those of
+     other worlds if it was passed in
+    + teams: (list[team.Team]) all teams
+    + team_table: (TeamTable) sides, scores and target beliefs of all
+     teams, indexed by team number
+    + agents_all: (list[agent.Agent]) all agents that are still alive
+    + fov_radius: (int) largest perception radius of the agents
+    + table: (WorldTable) aircraft and targets of the match in arrays,
+     shared with other worlds if it was passed in
+    + lane: (int) row of the match in `table`
+    + rng: (random.Random) random number generator of the match,
+     everything random in the match is drawn from it
+    + profiler: (Profiler) times the phases of `step()`, a
+     `NullProfiler` when profiling is off
+    + time: (float) simulated time since the start of the match (s)
+    + running: (bool) false once the match has ended
+    """
+    def __init__(
+        self,
+        team_descriptions: list[dict] = None,
+        fov_radius: int = 150,
+        seed: int = None,
+        profiler: Profiler = None,
+        config: Config = None,
+        engine: PhysicsEngine = None,
+        bullet_pool: BulletPool = None,
+        table: "WorldTable" = None,
+        lane: int = 0
+    ) -> None:
+        """
+        Initialiser of the World class
+
+        :param team_descriptions: one dict per team with the keys
+         STRATEGY (name of a class in `STRATEGIES`), N_AGENTS, PLANE
+         and optionally SIDE (teams with the same side are allies, every
+         team is on its own side by default), TEAMS of the configuration
+         if None (list[dict])
+        :param fov_radius: lower bound of `fov_radius` (int)
+        :param seed: seed of `rng`, matches with the same seed and
+         time steps play out identically; unpredictable if None (int)
+        :param profiler: profiler for the phases of `step()`, nothing is
+         timed if None (Profiler)
+        :param config: configuration of the match, the current settings
+         if None (Config)
+        :param engine: physics engine to add the aircraft to, which may
+         be shared with other worlds of the same screen size; a new one
+         if None (PhysicsEngine)
+        :param bullet_pool: bullet pool of the aircraft, which may be
+         shared with other worlds that use the same engine; a world
+         sharing it steps the bullets of all of them, so they must be
+         stepped together, see `env.VectorEnvironment`. A new one if
+         None (BulletPool)
+        :param table: table of matches with the same engine, bullet pool
+         and team sizes to fill lane `lane` of; a new table with one
+         lane if None (WorldTable)
+        :param lane: lane of the match in `table` (int)
+        """
+        if config is None:
+            config = Config()
+        if team_descriptions is None:
+            team_descriptions = config.TEAMS
+
+        self.config = config
+
+        self.team_descriptions = team_descriptions
+        self.rng = random.Random(seed)
+        self.profiler = NULL_PROFILER if profiler is None else profiler
+        self.time = 0.0
+        self.running = True
+
+        if config.USE_GUI:
+            self.floor = ground.Ground(
+                height=config.GROUND["HEIGHT"],
+                elevation=config.GROUND["ELEVATION"],
+                coll_elevation=config.GROUND["COLL_ELEVATION"],
+                sprite=config.GROUND["SPRITE"],
+                resolution=config.SCREEN_RESOLUTION
+            )
+        else:
+            self.floor = ground.Ground(
+                height=config.GROUND["HEIGHT"],
+                elevation=config.GROUND["ELEVATION"],
+                coll_elevation=config.GROUND["COLL_ELEVATION"],
+            )
+
+        self.targets = utils.create_targets(
+            [],
+            self.floor.coll_elevation,
+            self.rng,
+            config
+        )
+        targetscoords = np.array([target.coords for target in self.targets])
+
+        if engine is None:
+            engine = PhysicsEngine(config.SCREEN_RESOLUTION, config=config)
+        self.engine = engine
+        if bullet_pool is None:
+            bullet_pool = BulletPool(
+                self.floor.coll_elevation,
+                config.BULLET["SPRITE"] if config.USE_GUI else None,
+                config=config
+            )
+        self.bullet_pool = bullet_pool
+        self.team_table = TeamTable(
+            targetscoords,
+            [
+                description.get("SIDE", team_number)
+                for team_number, description in enumerate(team_descriptions)
+            ]
+        )
+        self.teams = [
+            STRATEGIES[description["STRATEGY"]](
+                targetscoords,
+                description["N_AGENTS"],
+                description["PLANE"],
+                team_number,
+                self.engine,
+                self.bullet_pool,
+                self.team_table,
+                config
+            ) for team_number, description in enumerate(team_descriptions)
+        ]
+        self.agents_all = list(chain(*[team.agents for team in self.teams]))
+
+        self.fov_radius = max(
+            [fov_radius] + [agent.radius_fov for agent in self.agents_all]
+        )
+
+        if table is None:
+            table = WorldTable(
+                1,
+                [len(team.agents) for team in self.teams],
+                len(self.targets),
+                self.engine,
+                self.bullet_pool,
+                config
+            )
+        self.table = table
+        self.lane = lane
+        self._lanes = np.array([lane], dtype=np.intp)
+        table.fill(lane, self)
+
+    @property
+    def scores(self) -> list[int]:
+        """
+        Current score of every team, in team order.
+
+        :return: list of scores (list[int])
+        """
+        return self.team_table.scores.tolist()
+
+    @property
+    def over(self) -> bool:
+        """
+        True once the match has ended: every target is gone, every
+        agent is gone or the simulation runtime has passed.
+
+        :return: whether the match has ended (bool)
+        """
+        return (
+            len(self.targets) == 0 or
+            len(self.agents_all) == 0 or
+            self.time > self.config.SIMULATION_RUNTIME
+        )
+
+    def step(self, dt: float) -> None:
+        """
+        Advances the match by one tick: perception, target assignment,
+        physics, agent decisions, collisions and scoring.
+
+        :param dt: time step (float)
+        :return: None
+        """
+        if not self.begin_step():
+            return
+        for team in self.teams:
+            fov_list = self.plan(team, dt)
+            with self.profiler.phase("physics"):
+                self.engine.step(dt, [agent.index for agent in team.agents])
+            self.act(team, fov_list, dt)
+        self.end_step(dt)
+
+    # `step()` in phases, so that several worlds sharing one engine can
+    # be stepped in lockstep with one physics step per team
+
+    def begin_step(self) -> bool:
+        """
+        First phase of `step()`: ends the match if it is over.
+
+        :return: False if the match has ended (bool)
+        """
+        if self.over:
+            self.running = False
+            return False
+
+        self.profiler.tick()
+        return True
+
+    def plan(self, team, dt: float) -> list:
+        """
+        Phase of `step()` before the physics step of `team`: perception
+        and target assignment, see `WorldTable.plan()`.
+
+        :param team: team to plan for (team.Team)
+        :param dt: time step (float)
+        :return: field of view of every agent of the team (list)
+        """
+        return self.table.plan(self._lanes, team.number, dt, self.profiler)[0]
+
+    def act(self, team, fov_list: list, dt: float) -> None:
+        """
+        Phase of `step()` after the physics step of `team`: the
+        decisions of its agents.
+
+        :param team: team to act for (team.Team)
+        :param fov_list: field of view of every agent, see `plan()`
+         (list)
+        :param dt: time step (float)
+        :return: None
+        """
+        with self.profiler.phase("decisions"):
+            team.act(fov_list, dt)
+
+    def end_step(self, dt: float) -> None:
+        """
+        Last phase of `step()`: collisions, scoring and removing dead
+        agents, see `WorldTable.end_step()`.
+
+        :param dt: time step (float)
+        :return: None
+        """
+        self.table.end_step(self._lanes, dt, self.profiler)
+
+    def remove_agents(self, agents: list) -> None:
+        """
+        Removes agents that were shot down, collided or crashed from
+        their team, from `agents_all` and from the physics engine, along
+        with their bullets.
+
+        :param agents: agents to remove (list[agent.Agent])
+        :return: None
+        """
+        gone = set(map(id, agents))
+        self.agents_all = [
+            agent for agent in self.agents_all if id(agent) not in gone
+        ]
+        for team in self.teams:
+            for agent in team.agents:
+                if id(agent) in gone:
+                    self.engine.remove(agent.index)
+                    self.bullet_pool.retire_owner(agent.index)
+            team.agents = [
+                agent for agent in team.agents if id(agent) not in gone
+            ]
+
+
+class WorldTable:
+    """
+    The aircraft and targets of one or more matches in arrays with one
+    row, a lane, per match, so that perception, collisions and scoring
+    run for all of them at once. A `World` on its own has a table with
+    one lane; the matches of `env.VectorEnvironment` share one table,
+    and with it one physics engine and one bullet pool. The matches of
+    a table have teams of the same sizes and the same number of
+    targets. Only the decisions of the teams and the rare events that
+    change a match, such as an aircraft being shot down, are handled
+    match by match.
+
+    + config: (Config) configuration of the matches
+    + engine: (PhysicsEngine) physics engine of the matches
+    + bullet_pool: (BulletPool) bullet pool of the matches
+    + worlds: (list[World]) match of every lane
+    + columns: (list[slice]) columns of the aircraft of every team, in
+     the order of `World.agents_all`
+    + aircraft: (list[list[agent.Agent]]) aircraft every match started
+     with
+    + rows: (np.ndarray) engine row of every aircraft, shape (K, N)
+    + radius: (np.ndarray) perception radius of every aircraft, shape
+     (K, N)
+    + plane_size: (np.ndarray) sprite dimensions of every aircraft,
+     shape (K, N, 2)
+    + targets: (list[list[target.Target]]) targets every match started
+     with
+    + target_coords: (np.ndarray) xy coords of every target, shape
+     (K, T, 2)
+    + target_boxes: (np.ndarray) centre, width and height of every
+     target, shape (K, T, 4)
+    + target_present: (np.ndarray) True for the targets that are left,
+     shape (K, T)
+    + lane: (np.ndarray) lane of the aircraft of every engine row
+    + side: (np.ndarray) side of the aircraft of every engine row, from
+     the `TeamTable` of its match
+    """
+    def __init__(
+        self,
+        n_lanes: int,
+        team_sizes: list[int],
+        n_targets: int,
+        engine: PhysicsEngine,
+        bullet_pool: BulletPool,
+        config: Config
+    ) -> None:
+        """
+        Initialiser of the WorldTable class
+
+        :param n_lanes: number of matches K (int)
+        :param team_sizes: number of aircraft of every team (list[int])
+        :param n_targets: number of targets of every match (int)
+        :param engine: physics engine of the matches (PhysicsEngine)
+        :param bullet_pool: bullet pool of the matches (BulletPool)
+        :param config: configuration of the matches (Config)
+        """
+        self.config = config
+        self.engine = engine
+        self.bullet_pool = bullet_pool
+        self.worlds = [None] * n_lanes
+
+        bounds = np.cumsum([0] + list(team_sizes))
+        self.columns = [
+            slice(bounds[i], bounds[i + 1]) for i in range(len(team_sizes))
+        ]
+        n_aircraft = bounds[-1]
+        self.aircraft = [None] * n_lanes
+        self.rows = np.zeros((n_lanes, n_aircraft), dtype=np.intp)
+        self.radius = np.zeros((n_lanes, n_aircraft))
+        self.plane_size = np.zeros((n_lanes, n_aircraft, 2))
+        self.targets = [None] * n_lanes
+        self.target_coords = np.zeros((n_lanes, n_targets, 2), dtype=int)
+        self.target_boxes = np.zeros((n_lanes, n_targets, 4))
+        self.target_present = np.zeros((n_lanes, n_targets), dtype=bool)
+        self.lane = np.zeros(engine.capacity, dtype=np.intp)
+        self.side = np.zeros(engine.capacity, dtype=int)
+
+    def fill(self, lane: int, world: World) -> None:
+        """
+        Puts a new match in lane `lane`.
+
+        :param lane: lane of the match (int)
+        :param world: match whose aircraft are in the engine and bullet
+         pool of the table (World)
+        :return: None
+        """
+        engine = self.engine
+        self.worlds[lane] = world
+
+        aircraft = list(world.agents_all)
+        rows = [agent.index for agent in aircraft]
+        self.aircraft[lane] = aircraft
+        self.rows[lane] = rows
+        self.radius[lane] = [agent.radius_fov for agent in aircraft]
+        self.plane_size[lane] = [agent.plane_size for agent in aircraft]
+        if len(self.lane) < engine.capacity:
+            self.lane = np.resize(self.lane, engine.capacity)
+            self.side = np.resize(self.side, engine.capacity)
+        self.lane[rows] = lane
+        self.side[rows] = world.team_table.sides[engine.team[rows]]
+
+        targets = list(world.targets)
+        n = len(targets)
+        self.targets[lane] = targets
+        self.target_present[lane] = False
+        self.target_present[lane, :n] = True
+        if n:
+            self.target_coords[lane, :n] = [
+                target.coords for target in targets
+            ]
+            self.target_boxes[lane, :n] = [
+                (*target.center, target.rect.w, target.rect.h)
+                for target in targets
+            ]
+
+    def plan(
+        self,
+        live: np.ndarray,
+        team_number: int,
+        dt: float,
+        profiler: Profiler = NULL_PROFILER
+    ) -> list:
+        """
+        `World.plan()` of team `team_number` in the lanes `live`: what
+        every agent sees within its own `radius_fov`, wrapping around
+        the sides of the world, then the target assignment of every
+        team, then forgetting the targets that are within sight of
+        their agent but not seen, as they are gone.
+
+        :param live: lanes being stepped (np.ndarray)
+        :param team_number: team to plan for (int)
+        :param dt: time step (float)
+        :param profiler: profiler timing the phases (Profiler)
+        :return: field of view of every agent of the team, per lane
+         (list[list])
+        """
+        engine = self.engine
+        width = self.config.SCREEN_WIDTH
+        columns = self.columns[team_number]
+        rows = self.rows[live]
+        alive = engine.active[rows]
+        positions = engine.pos_virtual[rows]
+        observers = alive[:, columns]
+        position = positions[:, columns]
+        radius = self.radius[live, columns]
+        coords = self.target_coords[live]
+
+        with profiler.phase("perception"):
+            sees_targets = utils.in_sight(
+                position,
+                radius,
+                coords.astype(float),
+                self.target_present[live],
+                width
+            )
+            sees_agents = utils.in_sight(
+                position,
+                radius,
+                positions,
+                alive,
+                width
+            )
+            own = np.arange(alive.shape[1])[columns]
+            sees_agents[:, np.arange(len(own)), own] = False
+            plans = [
+                [
+                    [[x, y, 1] for x, y in coords[i, sees_targets[i, a]]
+                     .tolist()]
+                    + [[x, y, 1] for x, y in positions[i, sees_agents[i, a]]
+                       .tolist()]
+                    for a in np.flatnonzero(observers[i]).tolist()
+                ]
+                for i in range(len(live))
+            ]
+
+        with profiler.phase("assignment"):
+            teams = [self.worlds[k].teams[team_number] for k in live.tolist()]
+            for team in teams:
+                team.update_assignment(dt)
+
+            agents = [agent for team in teams for agent in team.agents]
+            chosen = [agent.target is not None for agent in agents]
+            if any(chosen):
+                target = np.full((len(agents), 2), np.nan)
+                target[chosen] = [
+                    agent.target for agent, has in zip(agents, chosen) if has
+                ]
+                dx, dy = utils.wrapped_delta(
+                    position[observers] - target,
+                    width
+                )
+                close = np.sqrt(dx**2 + dy**2) < radius[observers]
+                seen = np.any(
+                    sees_targets[observers] &
+                    np.all(
+                        coords[np.nonzero(observers)[0]]
+                        == target[:, None, :],
+                        axis=2
+                    ),
+                    axis=1
+                )
+                for m in np.flatnonzero(close & ~seen).tolist():
+                    agent = agents[m]
+                    self.worlds[self.lane[agent.index]].teams[
+                        team_number
+                    ].forget_target(agent.target)
+        return plans
+
+    def end_step(
+        self,
+        live: np.ndarray,
+        dt: float,
+        profiler: Profiler = NULL_PROFILER
+    ) -> None:
+        """
+        `World.end_step()` of the lanes `live`: collisions between
+        aircraft, bullet hits and scoring, crashes into targets and the
+        ground, then removing what was destroyed, match by match only
+        where something was.
+
+        :param live: lanes being stepped (np.ndarray)
+        :param dt: time step (float)
+        :param profiler: profiler timing the phases (Profiler)
+        :return: None
+        """
+        if len(live) == 0:
+            return
+        alive = self.engine.active[self.rows[live]]
+        with profiler.phase("collision"):
+            # aircraft in `World.agents_all` of their match
+            listed = alive.copy()
+            if self.config.COLLISION:
+                listed &= ~self.collide_aircraft(live, alive)
+            self.move_bullets(live, dt, listed)
+            if self.config.COLLISION:
+                crashed = self.crashes(live, alive)
+            else:
+                crashed = np.zeros_like(alive)
+
+        with profiler.phase("cleanup"):
+            destroyed = alive & (~listed | crashed)
+            for i in np.flatnonzero(destroyed.any(axis=1)).tolist():
+                aircraft = self.aircraft[live[i]]
+                self.worlds[live[i]].remove_agents([
+                    aircraft[column]
+                    for column in np.flatnonzero(destroyed[i]).tolist()
+                ])
+            for k in live.tolist():
+                self.worlds[k].time += dt
+
+    def collide_aircraft(
+        self,
+        live: np.ndarray,
+        alive: np.ndarray
+    ) -> np.ndarray:
+        """
+        :param live: lanes being stepped (np.ndarray)
+        :param alive: True for the aircraft that are alive, shape (L, N)
+         (np.ndarray)
+        :return: True for the aircraft closer than COLLISION_DISTANCE to
+         another aircraft of their match, shape (L, N) (np.ndarray)
+        """
+        return utils.hit_detection_agents(
+            self.engine.center[self.rows[live]],
+            alive,
+            self.config.COLLISION_DISTANCE
+        )
+
+    def move_bullets(
+        self,
+        live: np.ndarray,
+        dt: float,
+        listed: np.ndarray = None
+    ) -> None:
+        """
+        Moves the bullets, then resolves their hits in the order they
+        were fired: an aircraft that is hit is taken off `listed`, a
+        target that is hit is removed and scores for the team of the
+        shooter if the shooter was listed. Bullets only hit aircraft
+        if COLLISION, and only aircraft of other sides unless
+        FRIENDLY_FIRE.
+
+        :param live: lanes being stepped (np.ndarray)
+        :param dt: time step (float)
+        :param listed: True for the aircraft that can be hit, shape
+         (L, N), updated in place; the aircraft that are alive if None
+         (np.ndarray)
+        :return: None
+        """
+        config = self.config
+        engine = self.engine
+        pool = self.bullet_pool
+        rows = self.rows[live]
+        if listed is None:
+            listed = engine.active[rows]
+
+        pool.step(dt)
+        n = pool.count
+        if n == 0:
+            return
+        owners = pool.owner[:n]
+        shooters = set(rows[listed].tolist())
+        if config.COLLISION:
+            victim_slots = np.nonzero(listed)
+            victims = rows[victim_slots]
+        else:
+            victims = np.zeros(0, dtype=np.intp)
+        present = np.nonzero(self.target_present[live])
+        hits = collision.bullet_hits(
+            pool.centers(),
+            owners,
+            victims,
+            engine.center[victims],
+            self.target_boxes[live][present],
+            pool.size,
+            config.SCREEN_WIDTH,
+            sides=None if config.FRIENDLY_FIRE else self.side,
+            lanes=(self.lane[owners], self.lane[victims], live[present[0]]),
+            sequence=pool.sequence[:n]
+        )
+        if not hits:
+            return
+        for bullet, victim, struck in hits:
+            if victim >= 0:
+                listed[victim_slots[0][victim], victim_slots[1][victim]] = (
+                    False
+                )
+                continue
+            i, j = present[0][struck], present[1][struck]
+            k = live[i]
+            world = self.worlds[k]
+            world.targets.remove(self.targets[k][j])
+            self.target_present[k, j] = False
+            shooter = int(owners[bullet])
+            if shooter in shooters:
+                world.team_table.scores[engine.team[shooter]] += 1
+        pool.retire(np.array([hit[0] for hit in hits], dtype=int))
+
+    def crashes(self, live: np.ndarray, alive: np.ndarray) -> np.ndarray:
+        """
+        :param live: lanes being stepped (np.ndarray)
+        :param alive: True for the aircraft that are alive, shape (L, N)
+         (np.ndarray)
+        :return: True for the aircraft that crashed into the ground or
+         into a target, shape (L, N) (np.ndarray)
+        """
+        engine = self.engine
+        rows = self.rows[live]
+        centers = engine.center[rows]
+
+        # `Aircraft.bottom` of every aircraft; the aircraft itself
+        # decides where it matters
+        pitch = np.radians(engine.pitch[rows])
+        size = self.plane_size[live]
+        bottom = centers[..., 1] + (
+            size[..., 0] * np.abs(np.sin(pitch)) +
+            size[..., 1] * np.abs(np.cos(pitch))
+        ) / 2
+        elevation = self.config.GROUND["COLL_ELEVATION"]
+        crashed = np.zeros_like(alive)
+        for i, column in zip(*np.nonzero(
+                alive & (bottom >= elevation - 1e-6)
+        )):
+            agent = self.aircraft[live[i]][column]
+            crashed[i, column] = agent.bottom >= elevation
+
+        return crashed | utils.hit_collision_agents(
+            centers,
+            alive,
+            self.target_boxes[live][..., :2],
+            self.target_present[live]
+        )